@@ -0,0 +1,260 @@
+"""Local JSON scoring API on asyncio, no extra dependencies.
+
+    GET  /rubric           thresholds.json categories
+    GET  /rankings         every stored country, ranked (see compare.py)
+    POST /score            {"country": "France"} or {"inputs": {...}, "name": "..."}
+    POST /score/batch      {"items": [{"country": ...} | {"inputs": ..., "name": ...}, ...]}
+
+Concurrent /score requests are coalesced: requests arriving within
+``--batch-window`` ms are scored together in one vectorized engine call.
+
+    python api.py --port 8502
+"""
+import argparse
+import asyncio
+import json
+from http import HTTPStatus
+
+from compare import score_all
+from countries import get_store, parse_record
+from rubric import get_rubric
+from scoring import readiness_label
+
+MAX_BODY = 16 * 1024 * 1024
+
+
+class HTTPError(Exception):
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _plain(obj):
+    """Rubric mapping proxies / tuples to JSON-serializable dicts and lists."""
+    if hasattr(obj, "items"):
+        return {k: _plain(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_plain(v) for v in obj]
+    return obj
+
+
+def score_records(records, rubric=None):
+    """Score a list of input dicts in one engine pass; one result dict each.
+
+    Without ``rubric`` the current one is resolved here, so executor calls
+    keep the thresholds.json stat / reload off the event loop too.
+    """
+    arrays = (rubric or get_rubric()).arrays
+    scores, cats, overall = arrays.score(records)
+    results = []
+    for i in range(len(records)):
+        label, _ = readiness_label(overall[i])
+        results.append({
+            "overall": round(float(overall[i]), 3),
+            "label": label,
+            "categories": {c: round(float(v), 3) for c, v in zip(arrays.categories, cats[i])},
+            "metrics": {mkey: float(s) for (_, mkey), s in zip(arrays.metrics, scores[i])},
+        })
+    return results
+
+
+def _parse_inputs(inputs):
+    return parse_record(inputs, get_rubric())
+
+
+class Batcher:
+    """Coalesces concurrent scoring calls into one vectorized call."""
+
+    def __init__(self, window=0.002, max_batch=4096):
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = []
+        self._flush_handle = None
+
+    async def score(self, record):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((record, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if pending:
+            asyncio.get_running_loop().create_task(self._run(pending))
+
+    async def _run(self, pending):
+        records = [r for r, _ in pending]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(None, score_records, records)
+        except Exception as exc:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
+
+
+async def _reply(writer, status, payload, keep_alive):
+    data = json.dumps(payload).encode("utf-8")
+    writer.write(
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(data)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+    )
+    await writer.drain()
+
+
+
+async def _reject(reader, writer, status, message, linger=1.0):
+    """Reply and close after a line the stream could not read.
+
+    The rest of the request is still unread; it is drained for up to
+    ``linger`` seconds first, since closing with it buffered resets the
+    connection and the client may never see the reply.
+    """
+    await _reply(writer, status, {"error": message}, False)
+    writer.write_eof()
+    try:
+        await asyncio.wait_for(_discard(reader), linger)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def _discard(reader):
+    while await reader.read(64 * 1024):
+        pass
+
+
+class ScoringAPI:
+
+    def __init__(self, store=None, batch_window=0.002):
+        self.store = store or get_store()
+        self.batcher = Batcher(batch_window)
+
+    async def _resolve(self, item):
+        if not isinstance(item, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "expected a JSON object")
+        if "inputs" in item:
+            if not isinstance(item["inputs"], dict):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "'inputs' must be an object")
+            try:
+                record = await asyncio.get_running_loop().run_in_executor(None, _parse_inputs, item["inputs"])
+            except (TypeError, ValueError) as exc:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, f"invalid input: {exc}")
+            return item.get("name"), record
+        country = item.get("country")
+        if not country:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "give either 'country' or 'inputs'")
+        if not isinstance(country, str):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'country' must be a string")
+        # SQLite reads block; keep them off the event loop like the scoring work.
+        record = await asyncio.get_running_loop().run_in_executor(None, self.store.get, country)
+        if not record:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"unknown country: {country}")
+        return country, record
+
+    async def handle(self, method, path, body):
+        if method == "GET" and path == "/rubric":
+            rubric = await asyncio.get_running_loop().run_in_executor(None, get_rubric)
+            return {"digest": rubric.digest, "categories": _plain(rubric.categories)}
+        if method == "GET" and path == "/rankings":
+            matrix = await asyncio.get_running_loop().run_in_executor(None, score_all, self.store)
+            return {"rankings": matrix.leaderboard()}
+        if method == "POST" and path == "/score":
+            name, record = await self._resolve(body)
+            return {"name": name, **await self.batcher.score(record)}
+        if method == "POST" and path == "/score/batch":
+            items = body.get("items") if isinstance(body, dict) else None
+            if not isinstance(items, list):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "expected {'items': [...]}")
+            resolved = await asyncio.gather(*(self._resolve(item) for item in items))
+            records = [r for _, r in resolved]
+            results = await asyncio.get_running_loop().run_in_executor(None, score_records, records)
+            return {"results": [{"name": n, **res} for (n, _), res in zip(resolved, results)]}
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"no route for {method} {path}")
+
+    async def serve_client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await reader.readline()
+                except ValueError:  # longer than the stream limit
+                    await _reject(reader, writer, HTTPStatus.BAD_REQUEST, "request line too long")
+                    break
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+                headers = {}
+                try:
+                    while True:
+                        line = await reader.readline()
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        name, _, value = line.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                except ValueError:
+                    await _reject(reader, writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "header line too long")
+                    break
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                try:
+                    length = headers.get("content-length", "0")
+                    if not (length.isascii() and length.isdigit()):
+                        keep_alive = False  # the body cannot be skipped without a length
+                        raise HTTPError(HTTPStatus.BAD_REQUEST, f"invalid Content-Length: {length!r}")
+                    length = int(length)
+                    if length > MAX_BODY:
+                        keep_alive = False  # body left unread
+                        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "request body too large")
+                    raw = await reader.readexactly(length) if length else b""
+                    try:
+                        body = json.loads(raw) if raw else {}
+                    except ValueError:
+                        raise HTTPError(HTTPStatus.BAD_REQUEST, "invalid JSON body")
+                    status, payload = HTTPStatus.OK, await self.handle(method, target.split("?")[0], body)
+                except HTTPError as exc:
+                    status, payload = exc.status, {"error": str(exc)}
+                except Exception as exc:
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(exc)}
+
+                await _reply(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host="127.0.0.1", port=8502, batch_window=0.002):
+    api = ScoringAPI(batch_window=batch_window)
+    server = await asyncio.start_server(api.serve_client, host, port)
+    print(f"Scoring API on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the scoring engine over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--batch-window", type=float, default=2.0, help="coalescing window in milliseconds")
+    args = parser.parse_args(argv)
+    asyncio.run(serve(args.host, args.port, args.batch_window / 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,441 +1,248 @@
-import json
+import os
+
 import streamlit as st
 import pandas as pd
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import reports
+from assets import style_tag
+from cache import NARRATIVES, RESULTS, cache_stats
+from compare import score_all
+from countries import get_store
+from instrument import (
+    METRICS, RerunTimer, SessionProfiler, metrics_text, serve_metrics, stop_leftover_profilers, timed, write_textfile,
+)
+from pareto import COUNT_LIMIT, build_frontier
+from pathfinder import find_path
+from rubric import get_rubric
+from scenarios import ScenarioStore, diff, materialize, score_scenarios
+from scoring import DEFAULT_SELECT, TIERS, ScoringState, input_digest
+from session import SessionBudget, session_report
+from timeseries import score_history
 
 st.set_page_config(page_title="Country Launch Scoring", layout="wide")
 
-with open("thresholds.json") as f:
-    RUBRIC = json.load(f)["categories"]
-    
-DEFAULT_SELECT = ["Very weak","Weak","Moderate","Strong","Excellent"]
-
-# Pre-populated country data extracted from your CSVs
-COUNTRY_DATA = {
-    "Singapore": {
-        "GDP per capita": 72794.0,
-        "Gini coefficient": 0.37,
-        "Disposable income": 3500.0,
-        "Retail investor penetration": 28.0,
-        "Islamic robo competitors": "Moderate competition",
-        "Conventional robo penetration": 2500.0,
-        "Digital maturity": "Excellent",
-        "Shariah-compliant instruments": "Strong range (21–50)",
-        "Sukuk & mutual funds": "Strong",
-        "Real estate crowdfunding": "Moderate",
-        "Ethical commodities": "Excellent",
-        "Clarity for Islamic Finance": "Weak",
-        "Licensing process": "Weak",
-        "Regulatory stability": "Excellent",
-        "KYC providers": "Excellent",
-        "Physical setup cost": "Low",
-        "Brokers & custodians": "Weak",
-        "Talent pool": 0.85,
-        "Ethical investing culture": "Weak",
-        "Shariah finance attitudes": "Excellent",
-        "Attitude towards Muslims": "Mixed/neutral",
-        "Digital adoption": "Mixed"
-    },
-    "India": {
-        "GDP per capita": 2600.0,
-        "Gini coefficient": 0.25,
-        "Disposable income": 800.0,
-        "Retail investor penetration": 6.0,
-        "Islamic robo competitors": "None present",
-        "Conventional robo penetration": 16.0,
-        "Digital maturity": "Excellent",
-        "Shariah-compliant instruments": "None available",
-        "Sukuk & mutual funds": "Very weak",
-        "Real estate crowdfunding": "Moderate",
-        "Ethical commodities": "Moderate",
-        "Clarity for Islamic Finance": "Very weak",
-        "Licensing process": "Strong",
-        "Regulatory stability": "Moderate",
-        "KYC providers": "Strong",
-        "Physical setup cost": "Low",
-        "Brokers & custodians": "Excellent",
-        "Talent pool": 1.0,
-        "Ethical investing culture": "Very weak",
-        "Shariah finance attitudes": "Very weak",
-        "Attitude towards Muslims": "Very negative",
-        "Digital adoption": "Mixed"
-    },
-    "France": {
-        "GDP per capita": 39117.0,
-        "Gini coefficient": 0.3,
-        "Disposable income": 3000.0,
-        "Retail investor penetration": 24.0,
-        "Islamic robo competitors": "None present",
-        "Conventional robo penetration": 4200.0,
-        "Digital maturity": "Excellent",
-        "Shariah-compliant instruments": "Extensive opportunities (50+)",
-        "Sukuk & mutual funds": "Excellent",
-        "Real estate crowdfunding": "Excellent",
-        "Ethical commodities": "Excellent",
-        "Clarity for Islamic Finance": "Moderate",
-        "Licensing process": "Strong",
-        "Regulatory stability": "Excellent",
-        "KYC providers": "Excellent",
-        "Physical setup cost": "Very high",
-        "Brokers & custodians": "Weak",
-        "Talent pool": 0.5,
-        "Ethical investing culture": "Strong",
-        "Shariah finance attitudes": "Weak",
-        "Attitude towards Muslims": "Negative",
-        "Digital adoption": "Digital-leaning"
-    },
-    "Netherlands": {
-        "GDP per capita": 52000.0,
-        "Gini coefficient": 0.29,
-        "Disposable income": 3000.0,
-        "Retail investor penetration": 82.0,
-        "Islamic robo competitors": "Sparse presence",
-        "Conventional robo penetration": 277.0,
-        "Digital maturity": "Excellent",
-        "Shariah-compliant instruments": "Strong range (21–50)",
-        "Sukuk & mutual funds": "Moderate",
-        "Real estate crowdfunding": "Moderate",
-        "Ethical commodities": "Moderate",
-        "Clarity for Islamic Finance": "Strong",
-        "Licensing process": "Excellent",
-        "Regulatory stability": "Excellent",
-        "KYC providers": "Excellent",
-        "Physical setup cost": "Very low",
-        "Brokers & custodians": "Excellent",
-        "Talent pool": 1.0,
-        "Ethical investing culture": "Excellent",
-        "Shariah finance attitudes": "Weak",
-        "Attitude towards Muslims": "Negative",
-        "Digital adoption": "Digital-first"
-    },
-    "Canada": {
-        "GDP per capita": 54283.0,
-        "Gini coefficient": 0.31,
-        "Disposable income": 2400.0,
-        "Retail investor penetration": 25.0,
-        "Islamic robo competitors": "Sparse presence",
-        "Conventional robo penetration": 450.0,
-        "Digital maturity": "Excellent",
-        "Shariah-compliant instruments": "Moderate range (6–20)",
-        "Sukuk & mutual funds": "Moderate",
-        "Real estate crowdfunding": "Weak",
-        "Ethical commodities": "Excellent",
-        "Clarity for Islamic Finance": "Strong",
-        "Licensing process": "Weak",
-        "Regulatory stability": "Excellent",
-        "KYC providers": "Excellent",
-        "Physical setup cost": "Moderate",
-        "Brokers & custodians": "Moderate",
-        "Talent pool": 1.0,
-        "Ethical investing culture": "Excellent",
-        "Shariah finance attitudes": "Excellent",
-        "Attitude towards Muslims": "Negative",
-        "Digital adoption": "Digital-leaning"
-    },
-    "Brunei": {
-        "GDP per capita": 29600.0,
-        "Gini coefficient": 0.63,
-        "Disposable income": 1200.0,
-        "Retail investor penetration": 2.0,
-        "Islamic robo competitors": "None present",
-        "Conventional robo penetration": 10.0,
-        "Digital maturity": "Moderate",
-        "Shariah-compliant instruments": "Extensive opportunities (50+)",
-        "Sukuk & mutual funds": "Moderate",
-        "Real estate crowdfunding": "Weak",
-        "Ethical commodities": "Weak",
-        "Clarity for Islamic Finance": "Excellent",
-        "Licensing process": "Strong",
-        "Regulatory stability": "Excellent",
-        "KYC providers": "Moderate",
-        "Physical setup cost": "Very low",
-        "Brokers & custodians": "Moderate",
-        "Talent pool": 0.5,
-        "Ethical investing culture": "Weak",
-        "Shariah finance attitudes": "Excellent",
-        "Attitude towards Muslims": "Very positive",
-        "Digital adoption": "Branch-leaning"
-    },
-    "Custom (Manual Entry)": {}
-}
-
-@st.cache_data
-def load_thresholds():
-    with open("thresholds.json", "r") as f:
-        return json.load(f)
-
-def score_numeric(value, breaks, scores, direction):
-    if value is None:
-        return 3, "N/A → neutral 3"
-    
-    if direction == "higher_better":
-        for b, s in zip(reversed(breaks), reversed(scores)):
-            if value >= b:
-                return s, f"{value} ≥ {b} → {s}"
-        return scores[0], f"{value} < {breaks[0]} → {scores[0]}"
-    elif direction == "lower_better":
-        for b, s in zip(breaks, scores):
-            if value <= b:
-                return s, f"{value} ≤ {b} → {s}"
-        return scores[-1], f"{value} > {breaks[-1]} → {scores[-1]}"
-
-def score_select(val, custom_options, reverse=False):
-    options = custom_options or DEFAULT_SELECT
-    try:
-        idx = options.index(val)
-    except ValueError:
-        idx = 2
-    score = (5 - idx) if reverse else (idx + 1)
-    return score, f"{val} → {score}"
-
-def readiness_label(score):
-    if score >= 4.5: return "Launch-ready (Excellent)", "#10b981"
-    elif score >= 3.8: return "Strong candidate (Good)", "#3b82f6"
-    elif score >= 3.0: return "Conditional (Needs fixes)", "#f59e0b"
-    else: return "High risk (Major issues)", "#ef4444"
-
-def narrative(selected_country, category_scores, overall):
-    sorted_cats = sorted(category_scores.items(), key=lambda x: x[1], reverse=True)
-    top3, bot3 = sorted_cats[:3], sorted_cats[-3:]
-    label, _ = readiness_label(overall)
-    lines = [f"**Market Assessment: {selected_country}**", "", f"Launch Readiness: {overall:.2f}/5 → **{label}**", ""]
-    lines.append("**Top-scoring categories:**")
-    lines += [f"- {c}: {v:.2f}" for c, v in top3]
-    lines.append("")
-    lines.append("**Lowest-scoring categories:**")
-    lines += [f"- {c}: {v:.2f}" for c, v in bot3]
-    return "\n".join(lines)
-
-# Clean, professional styling with proper contrast
-st.markdown('''
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600&display=swap');
-    
-    * {
-        font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif !important;
-        font-weight: 300 !important;
-    }
-    
-    /* Main content area */
-    .main {
-        background-color: #ffffff;
-        padding: 2rem;
-    }
-    
-    .stApp {
-        background-color: #f8f9fa;
-    }
-    
-    /* Headings - light weight, minimalist */
-    h1 {
-        font-weight: 300 !important;
-        color: #1a1a1a !important;
-        font-size: 2rem;
-        margin-bottom: 0.5rem;
-        letter-spacing: -0.02em;
-    }
-    
-    h2, h3 {
-        font-weight: 300 !important;
-        color: #1a1a1a !important;
-        margin-top: 2rem;
-        margin-bottom: 1rem;
-        letter-spacing: -0.01em;
-    }
-    
-    /* Labels - light weight */
-    .stSelectbox label, .stNumberInput label {
-        font-weight: 400 !important;
-        color: #1a1a1a !important;
-        font-size: 0.9rem !important;
-    }
-    
-    /* Input fields */
-    div[data-baseweb="select"] > div {
-        border-radius: 8px;
-        border: 1px solid #d1d5db;
-        background-color: #ffffff !important;
-    }
-    
-    div[data-baseweb="select"] > div:hover {
-        border-color: #9ca3af;
-    }
-    
-    /* Fix dropdown menu background and text */
-    div[role="listbox"] {
-        background-color: #ffffff !important;
-    }
-    
-    div[role="option"] {
-        background-color: #ffffff !important;
-        color: #1a1a1a !important;
-    }
-    
-    div[role="option"]:hover {
-        background-color: #f3f4f6 !important;
-        color: #1a1a1a !important;
-    }
-    
-    /* Selected option text in the dropdown */
-    div[data-baseweb="select"] span {
-        color: #1a1a1a !important;
-    }
-    
-    /* Dropdown arrow */
-    div[data-baseweb="select"] svg {
-        color: #6b7280 !important;
-    }
-    
-    .stNumberInput input {
-        border-radius: 8px;
-        border: 1px solid #d1d5db;
-        background-color: #ffffff !important;
-        color: #1a1a1a !important;
-        font-weight: 300 !important;
-    }
-    
-    .stNumberInput input:focus {
-        border-color: #6366f1;
-        box-shadow: 0 0 0 3px rgba(99, 102, 241, 0.1);
-    }
-    
-    /* Buttons - keep medium weight for readability */
-    .stButton > button {
-        border-radius: 8px;
-        background: linear-gradient(135deg, #6366f1 0%, #8b5cf6 100%);
-        color: white !important;
-        border: none;
-        padding: 0.6rem 1.5rem;
-        font-weight: 400 !important;
-        font-size: 0.95rem;
-        transition: all 0.2s;
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-1px);
-        box-shadow: 0 4px 12px rgba(99, 102, 241, 0.3);
-    }
-    
-    /* Caption text - light weight for minimalism */
-    .stMarkdown p, p[data-testid="stMarkdownContainer"] {
-        color: #6b7280 !important;
-        font-size: 0.875rem;
-        line-height: 1.5;
-        font-weight: 300 !important;
-    }
-    
-    /* Bold text in markdown - medium weight */
-    .stMarkdown strong {
-        color: #1a1a1a !important;
-        font-weight: 500 !important;
-    }
-    
-    /* Info boxes */
-    .stAlert {
-        border-radius: 8px;
-        font-weight: 300 !important;
-    }
-    
-    /* Data tables */
-    .stDataFrame {
-        border-radius: 8px;
-    }
-    
-    .stDataFrame td, .stDataFrame th {
-        font-weight: 300 !important;
-    }
-    
-    /* Divider */
-    hr {
-        border: none;
-        border-top: 1px solid #e5e7eb;
-        margin: 2rem 0;
-    }
-    
-    /* Download buttons */
-    .stDownloadButton > button {
-        border-radius: 8px;
-        background-color: #ffffff;
-        color: #1a1a1a !important;
-        border: 1px solid #d1d5db;
-        padding: 0.5rem 1.2rem;
-        font-weight: 400 !important;
-        font-size: 0.9rem;
-    }
-    
-    .stDownloadButton > button:hover {
-        border-color: #9ca3af;
-        background-color: #f9fafb;
-    }
-    
-    /* Sidebar styling */
-    [data-testid="stSidebar"] {
-        background-color: #f8f9fa;
-        border-right: 1px solid #e5e7eb;
-    }
-    
-    [data-testid="stSidebar"] h2 {
-        font-size: 1rem;
-        font-weight: 400 !important;
-        color: #1a1a1a !important;
-    }
-    
-    [data-testid="stSidebar"] p {
-        color: #4b5563 !important;
-        font-weight: 300 !important;
-    }
-    
-    [data-testid="stSidebar"] .stMarkdown {
-        color: #4b5563 !important;
-        font-weight: 300 !important;
-    }
-    
-    /* Metric widget */
-    [data-testid="stMetricValue"] {
-        color: #1a1a1a !important;
-        font-weight: 300 !important;
-    }
-    
-    [data-testid="stMetricLabel"] {
-        color: #6b7280 !important;
-        font-weight: 300 !important;
-    }
-</style>
-''', unsafe_allow_html=True)
-
-st.markdown("""
-    <style>
-    div[data-baseweb="select"] > div {
-        background-color: white !important;
-        color: black !important;
-        font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif !important;
-        font-weight: 400 !important;
-    }
-    div[data-baseweb="select"] div {
-        color: black !important;
-    }
-    div[data-baseweb="select"] span {
-        color: black !important;
-    }
-    ul[role="listbox"] {
-        background-color: white !important;
-        color: black !important;
-        font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif !important;
-    }
-    section[data-testid="stSidebar"] * {
-        font-family: 'Helvetica Neue', Helvetica, Arial, sans-serif !important;
-        color: black !important;
-    }
-    </style>
-""", unsafe_allow_html=True)
-
-
-
-thresholds = load_thresholds()
+# Stage timings for this rerun; ?debug=1 (or APP_DEBUG=1) shows them in the sidebar
+timer = RerunTimer()
+debug = st.query_params.get("debug") == "1" or os.environ.get("APP_DEBUG") == "1"
+# A rerun that raised or stopped before finish_rerun() leaves its profiler enabled
+stop_leftover_profilers()
+profiler = st.session_state.get("profiler")
+if profiler is not None:
+    profiler.start()
+
+
+@st.cache_resource
+def metrics_server():
+    port = os.environ.get("METRICS_PORT")
+    return serve_metrics(int(port)) if port else None
+
+
+metrics_server()
+
+# Compiled once per process; recompiled on the next rerun if thresholds.json changes
+with timer.stage("rubric_load"):
+    COMPILED_RUBRIC = get_rubric()
+RUBRIC = COMPILED_RUBRIC.categories
+
+# Widget state for the last few countries only; others are kept as compact snapshots
+ctx = get_script_run_ctx()
+session_id = ctx.session_id if ctx is not None else "local"
+session_budget = SessionBudget(st.session_state, RUBRIC, shared=[COMPILED_RUBRIC.scorers])
+active_country = None  # the country whose widgets render in this rerun
+
+
+@st.cache_resource
+def country_store():
+    return get_store()
+
+
+@st.cache_resource
+def scenario_store():
+    return ScenarioStore()
+
+
+CUSTOM_ENTRY = "Custom (Manual Entry)"
+store = country_store()
+
+
+def toggle_profiling():
+    if st.session_state.profile_session:
+        st.session_state.profiler = SessionProfiler()
+    else:
+        st.session_state.pop("profiler", None)
+
+
+def render_debug_panel():
+    with st.sidebar.expander("Performance", expanded=True):
+        process = METRICS.summary()
+        rows = [
+            {"Stage": stage, "This rerun (ms)": round(seconds * 1000, 2),
+             "Mean (ms)": round(process[stage][1] * 1000, 2) if stage in process else None,
+             "Count": process[stage][0] if stage in process else 0}
+            for stage, seconds in [*timer.timings.items(), ("rerun", timer.total)]
+        ]
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        st.checkbox("Profile this session", key="profile_session", on_change=toggle_profiling)
+        if profiler is not None:
+            if profiler.error:
+                st.warning(f"Profiling unavailable: {profiler.error}")
+            st.caption(f"cProfile over {profiler.reruns} reruns")
+            st.code(profiler.report(), language=None)
+            st.download_button("Download profile (.prof)", profiler.dump, file_name="session.prof")
+        st.dataframe(pd.DataFrame(cache_stats()).T, use_container_width=True)
+        usage = session_budget.usage()
+        st.caption(f"Session state: {sum(usage.values()) / 1024:.0f} KiB in {len(usage)} keys, "
+                   f"{len(session_budget.countries)} countries resident")
+        largest = sorted(usage.items(), key=lambda item: item[1], reverse=True)[:10]
+        st.dataframe(pd.DataFrame(largest, columns=["Key", "Bytes"]), use_container_width=True, hide_index=True)
+        st.dataframe(pd.DataFrame(session_report()), use_container_width=True, hide_index=True)
+        st.download_button("Download metrics", metrics_text, file_name="metrics.prom")
+
+
+def finish_rerun():
+    """Close this rerun's timings; call before anything that ends the script (st.stop / st.rerun)."""
+    timer.finish()
+    with timer.stage("session_budget"):
+        session_budget.report(session_id, session_budget.enforce(active_country))
+    if profiler is not None:
+        profiler.stop()
+    if os.environ.get("METRICS_FILE"):
+        write_textfile(os.environ["METRICS_FILE"])
+    if debug:
+        render_debug_panel()
+
+
+with timer.stage("css"):
+    # One minified stylesheet, built once per process but sent on every rerun: Streamlit drops
+    # elements a rerun does not send again. Fonts are bundled; nothing comes from the network.
+    st.html(style_tag())
+
 
 st.title("Country Launch Scoring")
 st.markdown("<p style='color: #6b7280; font-size: 1rem; margin-top: -0.5rem;'>Assess market readiness for Shariah/Ethical robo-advisory services</p>", unsafe_allow_html=True)
 st.markdown("")
 
+view = st.sidebar.radio("View", ["Single country", "Compare countries", "Trade-offs", "Trends"], key="view_mode")
+
+
+def render_comparison():
+    rubric = get_rubric()
+    matrix = score_all(store, rubric)
+    if not matrix.countries:
+        st.info("No countries in the data store.")
+        return
+
+    st.subheader(f"Leaderboard ({len(matrix.countries)} markets)")
+    sort_by = st.selectbox("Sort by", ["Overall"] + matrix.categories, key="compare_sort")
+    board = pd.DataFrame(matrix.leaderboard()).sort_values(sort_by, ascending=False, kind="stable")
+    st.dataframe(board, use_container_width=True, hide_index=True)
+
+    st.subheader("Category breakdown")
+    st.bar_chart(board.set_index("Country")[matrix.categories])
+
+    with st.expander("Metric scores"):
+        st.dataframe(pd.DataFrame(matrix.metric_rows(rubric.labels)), use_container_width=True, hide_index=True)
+
+
+def render_trends():
+    series = score_history(store, get_rubric())
+    if not series.countries:
+        st.info("No countries in the data store.")
+        return
+
+    st.subheader("Readiness over time")
+    table = series.overall_table()
+    default = [c for c in series.countries if len(table[c]) > 1][:5] or series.countries[:1]
+    chosen = st.multiselect("Countries", series.countries, default=default, key="trend_countries")
+    if chosen:
+        st.line_chart(pd.DataFrame({c: table[c] for c in chosen}).sort_index())
+
+    movers = series.movers()
+    if movers:
+        st.subheader("Largest moves in the latest vintage")
+        st.dataframe(pd.DataFrame(movers), use_container_width=True, hide_index=True)
+
+    detail = st.selectbox("Country detail", series.countries, key="trend_detail")
+    versions, _, cat_scores = series.trend(detail)
+    st.line_chart(pd.DataFrame(cat_scores, index=versions, columns=series.categories))
+    changes = series.changes(detail)
+    if changes:
+        st.dataframe(pd.DataFrame(changes[::-1]), use_container_width=True, hide_index=True)
+    else:
+        st.caption(f"Only one vintage stored for {detail}.")
+
+
+def render_frontier():
+    rubric = get_rubric()
+    categories = list(rubric.arrays.categories)
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        chosen = st.multiselect("Categories to trade off", categories, default=categories, key="pareto_categories")
+    with col2:
+        st.write("")
+        with_scenarios = st.checkbox("Include saved scenarios", value=True, key="pareto_scenarios")
+    if not chosen:
+        st.info("Choose at least one category.")
+        return
+    frontier = build_frontier(store, rubric, scenario_store() if with_scenarios else None, chosen)
+    if not frontier.names:
+        st.info("No countries in the data store.")
+        return
+
+    st.subheader("Pareto frontier")
+    st.caption(f"{int(frontier.optimal.sum())} of {len(frontier.names)} are Pareto-optimal: nothing else scores "
+               "at least as well in every chosen category and better in one.")
+    if not frontier.counted:
+        st.caption(f"Dominance counts are only computed for up to {COUNT_LIMIT:,} rows.")
+    table = pd.DataFrame(frontier.table())
+    col1, col2, col3 = st.columns([1, 2, 2])
+    with col1:
+        st.write("")
+        optimal_only = st.checkbox("Pareto-optimal only", key="pareto_only")
+    with col2:
+        text = st.text_input("Filter countries", key="pareto_filter")
+    with col3:
+        min_overall = st.slider("Minimum overall", 0.0, 5.0, 0.0, 0.1, key="pareto_min_overall")
+    shown = table[table["Overall"] >= min_overall]
+    if optimal_only:
+        shown = shown[shown["Pareto-optimal"]]
+    if text.strip():
+        shown = shown[shown["Country"].str.contains(text.strip(), case=False, regex=False)]
+    st.dataframe(shown, use_container_width=True, hide_index=True)
+
+    st.subheader("Nearest alternative markets")
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        target = st.selectbox("Market", frontier.names, key="pareto_target",
+                              format_func=lambda name: name[0] if name[1] is None else f"{name[0]} — {name[1]}")
+    with col2:
+        k = st.slider("Alternatives", 1, 20, 5, key="pareto_k")
+    st.dataframe(pd.DataFrame(frontier.nearest(target, k)), use_container_width=True, hide_index=True)
+
+
+if view != "Single country":
+    # Country widgets do not render in the other views; keep their values for the way back
+    session_budget.capture()
+
+if view == "Compare countries":
+    with timer.stage("compare"):
+        render_comparison()
+    finish_rerun()
+    st.stop()
+
+if view == "Trade-offs":
+    with timer.stage("trade_offs"):
+        render_frontier()
+    finish_rerun()
+    st.stop()
+
+if view == "Trends":
+    with timer.stage("trends"):
+        render_trends()
+    finish_rerun()
+    st.stop()
+
 # Initialize session state for country if not exists
 if 'selected_country' not in st.session_state:
     st.session_state.selected_country = "Singapore"
@@ -445,26 +252,27 @@ col1, col2 = st.columns([2, 3])
 with col1:
     country = st.selectbox(
         "Select Jurisdiction",
-        options=list(COUNTRY_DATA.keys()) + ["Custom (Manual Entry)"],
+        options=store.names() + [CUSTOM_ENTRY],
         key='country_selector',
         help="Select a pre-populated country or choose 'Custom (Manual Entry)' to enter manually"
     )
 
 # If user chooses Custom, show text input box
-if country == "Custom (Manual Entry)":
+if country == CUSTOM_ENTRY:
     manual_name = st.text_input("Enter Country Name Manually")
     if manual_name.strip():
         st.session_state.selected_country = manual_name.strip()
     else:
-        st.session_state.selected_country = "Custom (Manual Entry)"
+        st.session_state.selected_country = CUSTOM_ENTRY
 else:
     st.session_state.selected_country = country
 
-# Get pre-populated data
-if st.session_state.selected_country in COUNTRY_DATA:
-    selected_data = COUNTRY_DATA[st.session_state.selected_country]
-else:
-    selected_data = {}
+active_country = country
+session_budget.activate(country)
+
+# Get pre-populated data (loaded lazily, one country at a time)
+with timer.stage("country_data"):
+    selected_data = store.get(st.session_state.selected_country)
 
 # You can use this everywhere below
 current_country = st.session_state.selected_country
@@ -473,30 +281,40 @@ st.write(f"Current country: {current_country}")
 
 st.sidebar.header("Category Weights")
 st.sidebar.markdown("*Total should equal 1.00*")
-total_cat_weight = sum(cat_cfg["weight"] for cat_cfg in thresholds["categories"].values())
+total_cat_weight = sum(cat_cfg["weight"] for cat_cfg in RUBRIC.values())
 st.sidebar.metric("Total Weight", f"{total_cat_weight:.2f}")
 st.sidebar.markdown("---")
-for cat_name, cat_cfg in thresholds["categories"].items():
+for cat_name, cat_cfg in RUBRIC.items():
     st.sidebar.markdown(f"**{cat_name}**: {cat_cfg['weight']:.2f}")
 
-if selected_data and country != "Custom (Manual Entry)":
+if selected_data and country != CUSTOM_ENTRY:
     st.info(f"✓ Pre-populated data loaded for **{country}**. You can modify any field below.")
 
 st.markdown("---")
 
-cat_scores, cat_breakdown = {}, {}
+# Scores survive reruns; only metrics whose widget value changed are rescored
+state_key = f"scoring_state_{country}"
+if state_key not in st.session_state or st.session_state[state_key].rubric is not RUBRIC:
+    st.session_state[state_key] = ScoringState(RUBRIC)
+scoring_state = st.session_state[state_key]
 
-for cat, cdef in RUBRIC.items():
+
+# A widget change inside a category reruns only that category's fragment
+@st.fragment
+def render_category(cat, cdef):
+    with timer.stage(f"category: {cat}"):
+        render_category_inputs(cat, cdef)
+
+
+def render_category_inputs(cat, cdef):
     st.subheader(cat)
-    total, metrics = 0.0, {}
+    captions = {}
     
     for mkey, mdef in cdef["metrics"].items():
         label = mdef.get("label", mkey)
-        weight = mdef["weight"]
         
         if mdef.get("custom"):
             options = mdef.get("options", DEFAULT_SELECT)
-            reverse = mdef.get("reverse_options", False)
             
             # Get pre-populated value or default to middle option
             default_val = selected_data.get(mkey, options[2])
@@ -504,24 +322,36 @@ for cat, cdef in RUBRIC.items():
                 default_val = options[2]
             default_idx = options.index(default_val)
             
-            val = st.selectbox(label, options, index=default_idx, key=f"sel_{country}_{cat}_{mkey}")
-            score, why = score_select(val, options, reverse)
-            raw = val
+            # A value already in session state (e.g. a loaded scenario) wins over the default
+            key = f"sel_{country}_{cat}_{mkey}"
+            if key in st.session_state:
+                val = st.selectbox(label, options, key=key)
+            else:
+                val = st.selectbox(label, options, index=default_idx, key=key)
         else:
             # Get pre-populated numeric value or default to 0
             default_num = selected_data.get(mkey, 0.0)
-            val = st.number_input(label, value=float(default_num), key=f"num_{country}_{cat}_{mkey}")
-            score, why = score_numeric(val, mdef["breaks"], mdef["scores"], mdef["direction"])
-            raw = val
-            
-        st.caption(f"_{mdef['reason']}_ → Score: **{score}** ({why}) • Weight: {weight:.2f}")
-        total += score * weight
-        metrics[mkey] = {"label": label, "input": raw, "score": score, "weight": weight, "reason": mdef["reason"]}
+            key = f"num_{country}_{cat}_{mkey}"
+            if key in st.session_state:
+                val = st.number_input(label, key=key)
+            else:
+                val = st.number_input(label, value=float(default_num), key=key)
+        scoring_state.set(cat, mkey, val)
+        captions[mkey] = st.empty()
     
-    cat_scores[cat] = round(total, 3)
-    cat_breakdown[cat] = {"weight": cdef["weight"], "score": round(total, 3), "metrics": metrics}
+    for mkey, m in scoring_state.metrics[cat].items():
+        captions[mkey].caption(f"_{m['reason']}_ → Score: **{m['score']}** ({m['why']}) • Weight: {m['weight']:.2f}")
     st.markdown("")
 
+
+for cat, cdef in RUBRIC.items():
+    render_category(cat, cdef)
+
+# One scoring result per input state, shared by the readiness card and the reports
+with timer.stage("scoring_result"):
+    # Sessions looking at the same inputs share one result object
+    result = RESULTS.get((COMPILED_RUBRIC.digest, input_digest(scoring_state.inputs)), scoring_state.result)
+
 st.markdown("---")
 
 col1, col2, col3 = st.columns([1, 1, 2])
@@ -531,110 +361,148 @@ with col2:
     compute_csv = st.button("Generate CSV Reports", use_container_width=True)
 
 if compute_readiness:
-    overall = sum([cat_scores[c] * RUBRIC[c]["weight"] for c in RUBRIC.keys()])
-    label, color = readiness_label(overall)
-    
-    st.session_state['launch_readiness'] = {
-        'overall': overall,
-        'label': label,
-        'color': color,
-        'narrative': narrative(current_country, cat_scores, overall)
-    }
+    with timer.stage("readiness"):
+        st.session_state['launch_readiness'] = {
+            'country': country,
+            'result': result,
+            'narrative': NARRATIVES.get(
+                (COMPILED_RUBRIC.digest, result.input_digest, current_country),
+                lambda: result.narrative(current_country)
+            )
+        }
 
 if 'launch_readiness' in st.session_state:
     lr = st.session_state['launch_readiness']
+    lr_result = lr['result']
     st.markdown(f"""
-    <div style='background: linear-gradient(135deg, {lr['color']}15 0%, {lr['color']}05 100%); 
-                padding: 1.5rem; border-radius: 12px; border-left: 4px solid {lr['color']};
+    <div style='background: linear-gradient(135deg, {lr_result.color}15 0%, {lr_result.color}05 100%); 
+                padding: 1.5rem; border-radius: 12px; border-left: 4px solid {lr_result.color};
                 margin: 1.5rem 0;'>
-        <h2 style='color: {lr['color']}; margin: 0 0 0.5rem 0; font-size: 1.5rem;'>
-            Launch Readiness: {lr['overall']:.2f}/5
+        <h2 style='color: {lr_result.color}; margin: 0 0 0.5rem 0; font-size: 1.5rem;'>
+            Launch Readiness: {lr_result.overall:.2f}/5
         </h2>
         <p style='color: #4a4a4a; margin: 0; font-size: 1.1rem; font-weight: 500;'>
-            {lr['label']}
+            {lr_result.label}
         </p>
     </div>
     """, unsafe_allow_html=True)
     st.markdown(lr['narrative'])
 
 if compute_csv:
-    rows = []
-    category_rows = []
-    overall = 0.0
-
-    for cat_name, cat_cfg in thresholds["categories"].items():
-        cat_weight = cat_cfg["weight"]
-        cat_score_weighted_sum = 0.0
-        cat_weight_sum = 0.0
-        
-        for mkey, mdef in cat_cfg["metrics"].items():
-            label = mdef.get("label", mkey)
-            weight = mdef["weight"]
-            
-            if mdef.get("custom"):
-                val = st.session_state.get(f"sel_{country}_{cat_name}_{mkey}")
-                options = mdef.get("options", DEFAULT_SELECT)
-                reverse = mdef.get("reverse_options", False)
-                score, rationale = score_select(val, options, reverse)
-            else:
-                val = st.session_state.get(f"num_{country}_{cat_name}_{mkey}")
-                score, rationale = score_numeric(val, mdef["breaks"], mdef["scores"], mdef["direction"])
-            
-            rows.append({
-                "Category": cat_name,
-                "Metric": label,
-                "Input": val if val is not None else "N/A",
-                "Score": score,
-                "Sub-weight": weight,
-                "Weighted (metric)": round(score * weight, 3),
-                "Rationale": rationale
-            })
-            cat_score_weighted_sum += score * weight
-            cat_weight_sum += weight
-
-        cat_avg_weighted = cat_score_weighted_sum / cat_weight_sum if cat_weight_sum > 0 else 0
-        category_rows.append({
-            "Category": cat_name,
-            "Category weight": cat_weight,
-            "Category score (weighted sub-metrics)": round(cat_avg_weighted, 3),
-            "Contribution to overall": round(cat_avg_weighted * cat_weight, 3)
-        })
-        overall += cat_avg_weighted * cat_weight
-
-    st.session_state['csv_results'] = {
-        'rows': rows,
-        'category_rows': category_rows,
-        'overall': overall
-    }
+    st.session_state['csv_results'] = {'country': country, 'result': result}
 
 if 'csv_results' in st.session_state:
-    csv = st.session_state['csv_results']
+    csv_result = st.session_state['csv_results']['result']
+    with timer.stage("report_build"):
+        metrics_df, categories_df = reports.frames(csv_result, COMPILED_RUBRIC.digest)
     
     st.markdown("### Metric-level Results")
-    st.dataframe(pd.DataFrame(csv['rows']), use_container_width=True)
+    st.dataframe(metrics_df, use_container_width=True)
 
     st.markdown("### Category-level Results")
-    st.dataframe(pd.DataFrame(csv['category_rows']), use_container_width=True)
+    st.dataframe(categories_df, use_container_width=True)
 
     st.markdown("### Overall Score")
-    st.metric("Final Score", f"{csv['overall']:.3f} / 5", f"{csv['overall']/5*100:.1f}%")
+    st.metric("Final Score", f"{csv_result.overall:.3f} / 5", f"{csv_result.overall/5*100:.1f}%")
 
     safe_country_name = current_country.replace(" ", "_").replace("/", "_").replace("(", "").replace(")", "")
+    export_format = st.radio("Export format", list(reports.FORMATS), horizontal=True, key="export_format")
+    ext, mime = reports.FORMATS[export_format]
     
-    col1, col2 = st.columns(2)
+    # Files are encoded only when a download is clicked, then cached by input state
+    col1, col2, col3 = st.columns(3)
     with col1:
         st.download_button(
-            "Download Metric Results (CSV)",
-            pd.DataFrame(csv['rows']).to_csv(index=False).encode("utf-8"),
-            file_name=f"{safe_country_name}_metrics.csv",
-            mime="text/csv",
+            f"Download Metric Results ({export_format})",
+            timed("export", lambda: reports.export(csv_result, COMPILED_RUBRIC.digest, "metrics", ext)),
+            file_name=f"{safe_country_name}_metrics.{ext}",
+            mime=mime,
             use_container_width=True
         )
     with col2:
         st.download_button(
-            "Download Category Results (CSV)",
-            pd.DataFrame(csv['category_rows']).to_csv(index=False).encode("utf-8"),
-            file_name=f"{safe_country_name}_categories.csv",
-            mime="text/csv",
+            f"Download Category Results ({export_format})",
+            timed("export", lambda: reports.export(csv_result, COMPILED_RUBRIC.digest, "categories", ext)),
+            file_name=f"{safe_country_name}_categories.{ext}",
+            mime=mime,
             use_container_width=True
         )
+    with col3:
+        if reports.excel_available():
+            st.download_button(
+                "Download All Countries (Excel)",
+                timed("export", lambda: reports.workbook(store, COMPILED_RUBRIC)),
+                file_name="all_countries.xlsx",
+                mime=reports.EXCEL_MIME,
+                use_container_width=True
+            )
+
+
+def load_scenario(scenario_name):
+    # Runs before the next rerun renders the widgets, so their keys can still be set
+    values = materialize(selected_data, scenario_store().overrides(current_country, scenario_name))
+    for cat, cdef in RUBRIC.items():
+        for mkey, mdef in cdef["metrics"].items():
+            if mkey not in values:
+                continue
+            if mdef.get("custom"):
+                if values[mkey] in mdef.get("options", DEFAULT_SELECT):
+                    st.session_state[f"sel_{country}_{cat}_{mkey}"] = values[mkey]
+            else:
+                st.session_state[f"num_{country}_{cat}_{mkey}"] = float(values[mkey])
+
+
+st.markdown("---")
+with st.expander("Path to a higher tier"), timer.stage("path_to_tier"):
+    # Nearest tier first; the bottom tier has no cut-off to reach
+    higher_tiers = [label for cutoff, label, _ in reversed(TIERS[:-1]) if cutoff > result.overall]
+    if not higher_tiers:
+        st.success("Already in the top tier.")
+    else:
+        target_tier = st.selectbox("Target tier", higher_tiers, key="path_target")
+        path = find_path(scoring_state.inputs, target_tier, COMPILED_RUBRIC)
+        if path is None:
+            st.warning("Not reachable by improving the entered inputs.")
+        else:
+            st.markdown(f"**{len(path['steps'])} changes** lift the score from {path['overall']:.2f} to {path['reached']:.2f}.")
+            st.dataframe(pd.DataFrame([
+                {"Metric": step["label"], "Current": str(step["from"]), "Change to": step["to"],
+                 "Score": f"{step['score'][0]:g} → {step['score'][1]:g}", "Overall +": round(step["gain"], 3)}
+                for step in path["steps"]
+            ]), use_container_width=True, hide_index=True)
+
+with st.expander("Scenarios"), timer.stage("scenarios"):
+    scenarios = scenario_store()
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        scenario_name = st.text_input("Scenario name", key="scenario_name")
+    with col2:
+        st.write("")
+        if st.button("Save current inputs", use_container_width=True) and scenario_name.strip():
+            overrides = diff(selected_data, scoring_state.inputs)
+            scenarios.save(current_country, scenario_name.strip(), overrides)
+            st.success(f"Saved '{scenario_name.strip()}' ({len(overrides)} overridden metrics)")
+
+    saved = scenarios.overrides(current_country)
+    if saved:
+        names, _, scenario_cats, scenario_overall = score_scenarios(selected_data, saved, COMPILED_RUBRIC)
+        table = pd.DataFrame(scenario_cats.round(3), columns=list(RUBRIC))
+        table.insert(0, "Overall", scenario_overall.round(3))
+        table.insert(0, "Overrides", [0] + [len(o) for o in saved.values()])
+        table.insert(0, "Scenario", names)
+        st.dataframe(table, use_container_width=True, hide_index=True)
+
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            chosen = st.selectbox("Saved scenario", list(saved), key="scenario_choice")
+        with col2:
+            st.write("")
+            st.button("Load", on_click=load_scenario, args=(chosen,), use_container_width=True)
+        with col3:
+            st.write("")
+            if st.button("Delete", use_container_width=True):
+                scenarios.delete(current_country, chosen)
+                finish_rerun()
+                st.rerun()
+
+finish_rerun()
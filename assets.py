@@ -0,0 +1,103 @@
+"""The app's static styling: one stylesheet, minified once per process.
+
+``static/app.css`` is the only stylesheet. It is minified on first use and
+rebuilt only when the file changes. The app still sends it on every rerun
+(about 3 KB), since Streamlit removes elements a rerun does not send
+again. Fonts are never fetched from the network: an ``@font-face`` rule is
+emitted for each entry in ``FONT_FACES`` whose file exists in
+``static/fonts`` (Inter is bundled), and text otherwise falls back to the
+system font stack. ``font-display: swap`` means a missing or slow font
+never blocks rendering. ``static/`` is also served by Streamlit at
+``/app/static`` (see .streamlit/config.toml).
+
+``python assets.py`` prints the sizes and fails if the stylesheet refers
+to anything outside the app (an ``@import`` or a remote URL).
+"""
+import argparse
+import os
+import re
+import sys
+import threading
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STYLESHEET = os.path.join(STATIC_DIR, "app.css")
+FONTS_DIR = os.path.join(STATIC_DIR, "fonts")
+
+# (family, file in static/fonts, weight range, style); Inter 4 variable fonts, SIL OFL (static/fonts/OFL.txt)
+FONT_FACES = [
+    ("Inter", "InterVariable.woff2", "100 900", "normal"),
+    ("Inter", "InterVariable-Italic.woff2", "100 900", "italic"),
+]
+
+EXTERNAL = re.compile(r"@import|(?:https?:)?//[\w.-]+\.\w+", re.IGNORECASE)
+
+_lock = threading.Lock()
+_built = {}  # path -> (mtime_ns, fonts present, minified css)
+
+
+def minify(css):
+    """Drop comments and collapse whitespace; values and selectors are otherwise kept as written."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r"\s*:\s*", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+def font_faces(fonts_dir=FONTS_DIR):
+    """@font-face rules for the bundled font files that are present."""
+    rules = []
+    for family, filename, weight, style in FONT_FACES:
+        if os.path.exists(os.path.join(fonts_dir, filename)):
+            rules.append(
+                f"@font-face{{font-family:'{family}';src:url('app/static/fonts/{filename}') format('woff2');"
+                f"font-weight:{weight};font-style:{style};font-display:swap}}"
+            )
+    return "".join(rules)
+
+
+def stylesheet(path=STYLESHEET, fonts_dir=FONTS_DIR):
+    """Minified CSS; rebuilt only when the stylesheet or the set of font files changes."""
+    mtime = os.stat(path).st_mtime_ns
+    fonts = font_faces(fonts_dir)
+    built = _built.get(path)
+    if built is not None and built[:2] == (mtime, fonts):
+        return built[2]
+    with _lock:
+        with open(path, encoding="utf-8") as f:
+            css = fonts + minify(f.read())
+        _built[path] = (mtime, fonts, css)
+    return css
+
+
+def style_tag(path=STYLESHEET):
+    """The stylesheet as a ``<style>`` element, for ``st.html``."""
+    return f"<style>{stylesheet(path)}</style>"
+
+
+def external_references(css):
+    return EXTERNAL.findall(css)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check and size the app stylesheet.")
+    parser.add_argument("--out", help="also write the minified stylesheet here")
+    args = parser.parse_args(argv)
+
+    with open(STYLESHEET, encoding="utf-8") as f:
+        source = f.read()
+    css = stylesheet()
+    fonts = [name for _, name, _, _ in FONT_FACES if os.path.exists(os.path.join(FONTS_DIR, name))]
+    print(f"{STYLESHEET}: {len(source.encode())} bytes, minified {len(css.encode())} bytes")
+    print(f"bundled fonts: {', '.join(fonts) or 'none (system font stack)'}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(css)
+    external = external_references(css)
+    if external:
+        print(f"external references: {', '.join(external)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""Headless batch scorer.
+
+Streams country rows from CSV or JSONL (file or stdin), scores each with
+the same logic as the app's CSV reports and streams metric-level and
+category-level rows out as they are produced. Memory stays bounded by
+``--chunk-size`` x in-flight chunks, whatever the input size. A row with
+a bad cell (e.g. "N/A" for a number, or an answer that is not one of the
+metric's options) is skipped and reported on stderr; ``--strict`` stops
+at the first one instead.
+
+    python batch.py scenarios.csv --metrics-out metrics.csv --categories-out cats.jsonl
+    cat scenarios.jsonl | python batch.py - --format jsonl --workers 8
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import islice
+
+from columnar import ResultTable
+from countries import parse_record
+from rubric import get_rubric
+from scoring import THRESHOLDS_PATH
+
+ID_COLUMNS = ("Country", "country", "id")
+
+
+def _open_in(path):
+    if path == "-":
+        return sys.stdin
+    return open(path, newline="", encoding="utf-8-sig")
+
+
+def _open_out(path):
+    if path == "-":
+        return sys.stdout
+    return open(path, "w", newline="", encoding="utf-8")
+
+
+def _detect_format(path, fmt):
+    if fmt:
+        return fmt
+    return "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def iter_rows(f, fmt):
+    """Yield ("row N", {column: cell}) per CSV row or ("line N", text) per JSONL line, one at a time.
+
+    JSONL lines are decoded by ``score_rows``, so a malformed line is one
+    skipped row rather than the end of the run.
+    """
+    if fmt == "jsonl":
+        for n, line in enumerate(f, 1):
+            if line.strip():
+                yield f"line {n}", line
+    else:
+        for n, row in enumerate(csv.DictReader(f), 1):
+            yield f"row {n}", row
+
+
+def _decode(raw):
+    """A raw row as {column: cell}; ValueError for a JSONL line that is not a JSON object."""
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError as exc:
+            raise ValueError(f"invalid JSON: {exc}") from None
+    if not isinstance(raw, dict):
+        raise ValueError(f"expected a JSON object, got {type(raw).__name__}")
+    return raw
+
+
+def _row_id(row, label):
+    for col in ID_COLUMNS:
+        if row.get(col) not in (None, ""):
+            return str(row[col])
+    return label
+
+
+def score_rows(rows, thresholds_path=THRESHOLDS_PATH, strict=False):
+    """Score a chunk of (label, raw row) pairs from ``iter_rows``; returns (ResultTable, [(id, error)] of skipped rows).
+
+    Report rows are built as they are written. With ``strict`` the first
+    row that fails to parse raises ValueError instead of being skipped.
+    """
+    rubric = get_rubric(thresholds_path)
+    records, errors = [], []
+    for label, raw in rows:
+        row_id = label
+        try:
+            row = _decode(raw)
+            row_id = _row_id(row, label)
+            records.append((row_id, parse_record(row, rubric, skip=ID_COLUMNS)))
+        except (TypeError, ValueError) as exc:
+            if strict:
+                raise ValueError(f"{row_id}: {exc}") from None
+            errors.append((row_id, str(exc)))
+    return ResultTable.from_records(records, rubric), errors
+
+
+def _score_chunk(rows, thresholds_path, strict):
+    """Process-pool task: only the result arrays go back; the parent reattaches the rubric metadata."""
+    table, errors = score_rows(rows, thresholds_path, strict)
+    return table.to_arrays(), errors
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def score_stream(rows, chunk_size=1000, workers=1, thresholds_path=THRESHOLDS_PATH, strict=False):
+    """Yield scored chunks as (ResultTable, skipped rows) in input order.
+
+    With ``workers > 1`` chunks are scored in a process pool, keeping at
+    most ``2 * workers`` chunks in flight so input is never read ahead
+    without bound.
+    """
+    chunks = _chunks(rows, chunk_size)
+    if workers <= 1:
+        for chunk in chunks:
+            yield score_rows(chunk, thresholds_path, strict)
+        return
+
+    rubric = get_rubric(thresholds_path)
+
+    def result(future):
+        arrays, errors = future.result()
+        return ResultTable.from_arrays(arrays, rubric), errors
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_score_chunk, chunk, thresholds_path, strict))
+            if len(pending) >= 2 * workers:
+                yield result(pending.popleft())
+        while pending:
+            yield result(pending.popleft())
+
+
+class RowWriter:
+    """Incremental CSV/JSONL writer; CSV headers come from the first row."""
+
+    def __init__(self, f, fmt):
+        self.f = f
+        self.fmt = fmt
+        self._csv = None
+
+    def write(self, rows):
+        if self.fmt == "jsonl":
+            for row in rows:
+                self.f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        else:
+            for row in rows:
+                if self._csv is None:
+                    self._csv = csv.DictWriter(self.f, fieldnames=list(row))
+                    self._csv.writeheader()
+                self._csv.writerow(row)
+        self.f.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score country input rows against thresholds.json.")
+    parser.add_argument("input", help="CSV or JSONL file, or - for stdin")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="input format (default: from extension, else csv)")
+    parser.add_argument("--metrics-out", default="-", help="metric-level rows (default: stdout)")
+    parser.add_argument("--categories-out", help="category-level rows")
+    parser.add_argument("--out-format", choices=["csv", "jsonl"], help="output format (default: from extension, else csv)")
+    parser.add_argument("--thresholds", default=THRESHOLDS_PATH)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=1, help="process pool size (0 = all cores)")
+    parser.add_argument("--strict", action="store_true",
+                        help="stop at the first row with a bad cell (default: skip it and report it on stderr)")
+    args = parser.parse_args(argv)
+
+    # Fail fast on a broken rubric before reading any input.
+    get_rubric(args.thresholds)
+    workers = args.workers or os.cpu_count() or 1
+
+    with ExitStack() as stack:
+        writers = []
+        for path in (args.metrics_out, args.categories_out):
+            if not path:
+                writers.append(None)
+                continue
+            f = _open_out(path)
+            if f is not sys.stdout:
+                stack.enter_context(f)
+            writers.append(RowWriter(f, _detect_format(path, args.out_format)))
+        metrics_w, categories_w = writers
+
+        f = _open_in(args.input)
+        if f is not sys.stdin:
+            stack.enter_context(f)
+        rows = iter_rows(f, _detect_format(args.input, args.format))
+        skipped = 0
+        try:
+            for table, errors in score_stream(rows, args.chunk_size, workers, args.thresholds, args.strict):
+                if metrics_w:
+                    metrics_w.write(table.metric_rows())
+                if categories_w:
+                    categories_w.write(table.category_rows(overall=True))
+                for row_id, error in errors:
+                    print(f"skipped {row_id}: {error}", file=sys.stderr)
+                skipped += len(errors)
+        except ValueError as exc:
+            if not args.strict:
+                raise
+            sys.exit(f"error: {exc}")
+        if skipped:
+            print(f"{skipped} row(s) skipped", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
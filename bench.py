@@ -0,0 +1,243 @@
+"""Scoring micro-benchmarks with a JSON history and regression check.
+
+Each run times single-value scoring, full-rubric scoring for one country,
+batch scoring and Pareto skylines over synthetic universes, CSV report
+generation and rubric loading, checks that the engine and columnar tables
+give exactly the per-value scores (edge cases included), appends the
+results to ``--history`` and compares them with the previous run. Exits
+non-zero on a regression or a mismatch.
+
+    python bench.py                     # 1k / 100k / 1M universes
+    python bench.py --sizes 1000 --threshold 0.2
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+
+import numpy as np
+
+from columnar import ResultTable
+from countries import BUILTIN_COUNTRIES, coerce_input
+from pareto import skyline
+from rubric import get_rubric, reload_rubric
+from scoring import THRESHOLDS_PATH, report_rows, score_metric, score_numeric, score_only, score_rubric, score_select
+
+HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_history.json")
+
+
+def measure(fn, repeat=5, min_time=0.2):
+    """Median and best seconds per call of ``fn`` over ``repeat`` timing runs."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange() if min_time else (1, None)
+    runs = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {"median": statistics.median(runs), "min": min(runs), "calls": number}
+
+
+def synthetic_universe(arrays, n, seed=0):
+    """Encoded (n, metrics) inputs: numeric values spread around each metric's breaks."""
+    rng = np.random.default_rng(seed)
+    X = np.empty((n, len(arrays.metrics)))
+    for j in range(len(arrays.metrics)):
+        if arrays.is_select[j]:
+            X[:, j] = rng.integers(0, len(arrays.options[j]), size=n)
+        else:
+            b = arrays.column_breaks[j]
+            X[:, j] = rng.uniform(b[0] - (b[-1] - b[0]) / 2, b[-1] * 1.5, size=n)
+            # Land exactly on the breaks too, the boundary cases that matter.
+            on_break = rng.random(n) < 0.2
+            X[on_break, j] = rng.choice(b, size=on_break.sum())
+    X[rng.random(X.shape) < 0.02] = np.nan
+    X[:, arrays.is_select] = np.nan_to_num(X[:, arrays.is_select])
+    return X
+
+
+def decode(arrays, X):
+    """Encoded rows back to {metric key: input} records for the per-value scorers."""
+    records = []
+    for row in X:
+        record = {}
+        for j, (_, mkey) in enumerate(arrays.metrics):
+            if arrays.is_select[j]:
+                record[mkey] = arrays.options[j][int(row[j])]
+            elif not np.isnan(row[j]):
+                record[mkey] = float(row[j])
+        records.append(record)
+    return records
+
+
+def edge_records(arrays, n, seed=1):
+    """Raw input records with the edge cases: exact break values, None, NaN (float and text), unknown answers."""
+    X = synthetic_universe(arrays, n, seed)
+    rng = np.random.default_rng(seed + 1)
+    records = []
+    for row, u in zip(X, rng.random(X.shape)):
+        record = {}
+        for j, (_, mkey) in enumerate(arrays.metrics):
+            if arrays.is_select[j]:
+                val = None if u[j] < 0.02 else "Not an option" if u[j] < 0.04 else arrays.options[j][int(row[j])]
+            else:
+                val = None if np.isnan(row[j]) else float(row[j])
+                val = float("nan") if u[j] < 0.02 else "nan" if u[j] < 0.04 else None if u[j] < 0.06 else val
+            record[mkey] = val
+        records.append(record)
+    return records
+
+
+def check_identical(rubric, n=20_000):
+    """True if the engine and the columnar tables match the per-value scorers for every cell.
+
+    Numeric cells go through ``coerce_input``, as CSV / JSON input does;
+    unknown answers are kept, and every path falls back to the middle option.
+    """
+    arrays = rubric.arrays
+    records = []
+    for raw in edge_records(arrays, n):
+        records.append({mkey: val if mkey in rubric.option_index else coerce_input(mkey, val, rubric)
+                        for mkey, val in raw.items()})
+    fast = arrays.score_matrix(arrays.encode(records))
+    table = ResultTable.from_records(enumerate(records), rubric)
+    for i, record in enumerate(records):
+        for j, (cat, mkey) in enumerate(arrays.metrics):
+            val = record.get(mkey)
+            score, _ = score_metric(rubric.categories[cat]["metrics"][mkey], val)
+            got = {"engine": fast[i, j], "scorer": rubric.scorers[mkey].score(val), "columnar": table.score(i, j)}
+            for path, other in got.items():
+                if other != score:
+                    print(f"mismatch: {mkey}={val!r}: {path} {other} vs {score}", file=sys.stderr)
+                    return False
+    return True
+
+
+def _csv_bytes(rows):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue().encode("utf-8")
+
+
+def run(sizes, thresholds_path=THRESHOLDS_PATH):
+    rubric = get_rubric(thresholds_path)
+    arrays = rubric.arrays
+    cdef = next(iter(rubric.categories.values()))
+    numeric = next(m for m in cdef["metrics"].values() if not m.get("custom"))
+    select = next(m for c in rubric.categories.values() for m in c["metrics"].values() if m.get("custom"))
+    country = BUILTIN_COUNTRIES["Singapore"]
+
+    results = {
+        "score_numeric": measure(lambda: score_numeric(12345.0, numeric["breaks"], numeric["scores"], numeric["direction"])),
+        "score_select": measure(lambda: score_select(select["options"][3], select["options"], select.get("reverse_options", False))),
+        "score_rubric_one_country": measure(lambda: score_rubric(rubric.categories, country)),
+        "score_only_one_country": measure(lambda: score_only(rubric.categories, country)),
+        "engine_one_country": measure(lambda: arrays.score([country])),
+        "report_rows_one_country": measure(lambda: report_rows(rubric.categories, country)),
+        "csv_export_one_country": measure(lambda: [_csv_bytes(r) for r in report_rows(rubric.categories, country)[:2]]),
+        "rubric_load": measure(lambda: reload_rubric(thresholds_path).arrays, repeat=5),
+    }
+    reload_rubric(thresholds_path)
+
+    for n in sizes:
+        X = synthetic_universe(arrays, n)
+        repeat = 5 if n <= 100_000 else 3
+        results[f"batch_score_{n}"] = measure(lambda: arrays.overall(arrays.category_scores(arrays.score_matrix(X))),
+                                              repeat=repeat, min_time=0 if n > 100_000 else 0.2)
+        if n <= 100_000:
+            C = arrays.category_scores(arrays.score_matrix(X))
+            results[f"skyline_{n}"] = measure(lambda: skyline(C), repeat=3, min_time=0)
+        if n <= 1000:
+            records = decode(arrays, X)
+            results[f"per_value_score_{n}"] = measure(lambda: [score_rubric(rubric.categories, r) for r in records])
+            results[f"encode_{n}"] = measure(lambda: arrays.encode(records))
+            results[f"result_table_{n}"] = measure(lambda: ResultTable.from_records(enumerate(records), rubric))
+    return results
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def load_history(path=HISTORY_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_history(history, path=HISTORY_PATH):
+    with open(path, "w") as f:
+        json.dump(history, f, indent=2)
+
+
+def compare(current, previous, threshold=0.1):
+    """(name, previous, current, ratio) for benchmarks slower than 1 + threshold.
+
+    Compares best-of-repeat times, which are far less noisy than medians on
+    a shared machine.
+    """
+    regressions = []
+    for name, res in current.items():
+        before = previous.get(name)
+        if not before:
+            continue
+        ratio = res["min"] / before["min"] if before["min"] else float("inf")
+        if ratio > 1 + threshold:
+            regressions.append((name, before["min"], res["min"], ratio))
+    return regressions
+
+
+def _fmt(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scoring paths and track regressions.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100_000, 1_000_000])
+    parser.add_argument("--history", default=HISTORY_PATH)
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown before flagging (0.1 = 10%%)")
+    parser.add_argument("--no-save", action="store_true", help="compare without appending to the history")
+    parser.add_argument("--thresholds", default=THRESHOLDS_PATH)
+    args = parser.parse_args(argv)
+
+    rubric = get_rubric(args.thresholds)
+    identical = check_identical(rubric)
+    results = run(args.sizes, args.thresholds)
+
+    for name, res in results.items():
+        print(f"{name:<32}{_fmt(res['median']):>14}")
+    print(f"{'engine matches per-value scorers':<32}{'yes' if identical else 'NO':>14}")
+
+    history = load_history(args.history)
+    regressions = compare(results, history[-1]["results"], args.threshold) if history else []
+    for name, before, after, ratio in regressions:
+        print(f"REGRESSION {name}: {_fmt(before)} -> {_fmt(after)} ({ratio:.2f}x)")
+
+    if not args.no_save:
+        history.append({
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "rubric": rubric.digest,
+            "identical": identical,
+            "results": results,
+        })
+        save_history(history, args.history)
+
+    return 1 if regressions or not identical else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
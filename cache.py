@@ -0,0 +1,140 @@
+"""Process-wide LRU caches for scoring results, narratives and report bytes.
+
+Keys start with the rubric digest and the input digest, so a hit is only
+possible for exactly the same rubric and inputs. Every cache counts hits,
+misses and evictions. Caches created with ``persist=True`` also write
+their values to ``RESULT_CACHE_DIR`` (when set), bounded by
+``max_disk_bytes``, so a restarted process starts warm.
+"""
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+CACHE_DIR = os.environ.get("RESULT_CACHE_DIR")
+
+_registry = {}  # name -> ResultCache
+
+
+class ResultCache:
+
+    def __init__(self, name, max_entries=256, persist=False, max_disk_bytes=256 * 1024 * 1024, cache_dir=CACHE_DIR):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_dir = os.path.join(cache_dir, name) if persist and cache_dir else None
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._disk_bytes = None
+        self.hits = self.misses = self.disk_hits = self.evictions = 0
+        _registry[name] = self
+
+    def get(self, key, build):
+        """Cached value for ``key``, calling ``build()`` on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        value = self._read(key)
+        if value is not None:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            value = build()
+            with self._lock:
+                self.misses += 1
+            self._write(key, value)
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, hashlib.sha256(repr(key).encode("utf-8")).hexdigest() + ".pickle")
+
+    def _read(self, key):
+        if self.disk_dir is None:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                stored_key, value = pickle.load(f)
+        except Exception:  # missing or unreadable: rebuild
+            return None
+        return value if stored_key == key else None
+
+    def _write(self, key, value):
+        if self.disk_dir is None:
+            return
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            with open(tmp, "wb") as f:
+                pickle.dump((key, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+            self._trim(os.path.getsize(path))
+        except (OSError, pickle.PicklingError):
+            pass
+
+    def _trim(self, added):
+        """Delete the oldest files once the directory exceeds max_disk_bytes."""
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += added
+                if self._disk_bytes <= self.max_disk_bytes:
+                    return
+            files = []
+            for entry in os.scandir(self.disk_dir):
+                if entry.name.endswith(".pickle"):
+                    st = entry.stat()
+                    files.append((st.st_mtime, st.st_size, entry.path))
+            files.sort()
+            total = sum(size for _, size, _ in files)
+            for _, size, path in files:
+                if total <= self.max_disk_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                self.evictions += 1
+            self._disk_bytes = total
+
+
+# Shared by every session: full results per input state and readiness narratives.
+RESULTS = ResultCache("results", max_entries=1024)
+NARRATIVES = ResultCache("narratives", max_entries=1024, persist=True)
+
+
+def cache_stats():
+    """{cache name: stats} for every cache in the process."""
+    return {name: cache.stats() for name, cache in _registry.items()}
+
+
+def prometheus_text(prefix="launch_scoring_cache"):
+    lines = []
+    for field in ("hits", "disk_hits", "misses", "evictions"):
+        lines += [f"# TYPE {prefix}_{field}_total counter"]
+        lines += [f'{prefix}_{field}_total{{cache="{name}"}} {s[field]}' for name, s in cache_stats().items()]
+    lines += [f"# TYPE {prefix}_entries gauge"]
+    lines += [f'{prefix}_entries{{cache="{name}"}} {s["entries"]}' for name, s in cache_stats().items()]
+    return "\n".join(lines) + "\n"
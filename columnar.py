@@ -0,0 +1,231 @@
+"""Compact columnar inputs and results for large batches of records.
+
+A country record is a dict of metric keys to mixed float/str values, and
+its report rows repeat the category, label and rationale of every metric.
+At millions of country-scenario rows that is gigabytes. Here:
+
+- metric keys are column indices, in the engine's (rubric) order;
+- qualitative answers are int8 codes into the metric's ``options``
+  (-1 when missing) and numeric inputs float64 (NaN when missing);
+- a scored table keeps only each cell's int8 position in its metric's
+  score table, plus float64 category and overall scores.
+
+Categories, labels, weights and score tables are metadata shared through
+the compiled rubric; ``to_arrays`` / ``from_arrays`` move a table between
+processes without it. Report rows, identical to ``ScoreResult.rows`` and
+``category_rows``, and their rationales are built only when written out.
+Category and overall scores are summed column by column in rubric order,
+so they match the per-record scorers to the last bit.
+"""
+import numpy as np
+
+from rubric import get_rubric
+from scoring import DEFAULT_SELECT, FALLBACK_OPTION, NEUTRAL_SCORE
+
+
+class Columns:
+    """Shared per-rubric metadata: column order, split into qualitative and numeric slots."""
+
+    def __init__(self, rubric):
+        arrays = rubric.arrays
+        self.rubric = rubric
+        self.arrays = arrays
+        self.select_cols = np.flatnonzero(arrays.is_select)
+        self.numeric_cols = np.flatnonzero(~arrays.is_select)
+        # metric key -> (is qualitative, slot in codes / values)
+        self.slots = {}
+        for slot, col in enumerate(self.select_cols):
+            self.slots[arrays.metrics[col][1]] = (True, slot)
+        for slot, col in enumerate(self.numeric_cols):
+            self.slots[arrays.metrics[col][1]] = (False, slot)
+        self.tables, self.weights = [], []
+        for cat, mkey in arrays.metrics:
+            mdef = rubric.categories[cat]["metrics"][mkey]
+            if mdef.get("custom"):
+                n = len(mdef.get("options", DEFAULT_SELECT))
+                self.tables.append([(5 - i) if mdef.get("reverse_options", False) else (i + 1) for i in range(n)])
+            else:
+                self.tables.append(list(mdef["scores"]))
+            self.weights.append(mdef["weight"])
+
+
+_columns = {}  # rubric digest -> Columns
+
+
+def columns_for(rubric=None):
+    rubric = rubric or get_rubric()
+    cols = _columns.get(rubric.digest)
+    if cols is None or cols.rubric is not rubric:
+        cols = _columns[rubric.digest] = Columns(rubric)
+    return cols
+
+
+class InputTable:
+    """Input records as an int8 code matrix (qualitative) and a float64 matrix (numeric)."""
+
+    def __init__(self, columns, ids, codes, values):
+        self.columns = columns
+        self.ids = ids
+        self.codes = codes
+        self.values = values
+
+    @classmethod
+    def from_records(cls, records, rubric=None):
+        """From {id: record} or (id, record) pairs; unknown metric keys are ignored.
+
+        An answer that is not one of the metric's options is stored like a
+        missing one (code -1) and scores the fallback option, as in the engine.
+        """
+        cols = columns_for(rubric)
+        items = list(records.items() if isinstance(records, dict) else records)
+        codes = np.full((len(items), len(cols.select_cols)), -1, dtype=np.int8)
+        values = np.full((len(items), len(cols.numeric_cols)), np.nan)
+        option_index = cols.rubric.option_index
+        for r, (_, record) in enumerate(items):
+            for mkey, val in record.items():
+                slot = cols.slots.get(mkey)
+                if slot is None or val is None:
+                    continue
+                if slot[0]:
+                    codes[r, slot[1]] = option_index[mkey].get(val, -1)
+                else:
+                    values[r, slot[1]] = val
+        return cls(cols, [row_id for row_id, _ in items], codes, values)
+
+    def to_arrays(self):
+        """(ids, codes, values): the table without its column metadata, e.g. to return from a worker."""
+        return self.ids, self.codes, self.values
+
+    @classmethod
+    def from_arrays(cls, arrays, rubric=None):
+        return cls(columns_for(rubric), *arrays)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.values.nbytes
+
+    def matrix(self):
+        """Float matrix in the engine's encoding (missing answers fall back like ``CompiledRubric.encode``)."""
+        cols = self.columns
+        X = np.empty((len(self), len(cols.arrays.metrics)))
+        X[:, cols.select_cols] = np.where(self.codes < 0, FALLBACK_OPTION, self.codes)
+        X[:, cols.numeric_cols] = self.values
+        return X
+
+    def value(self, row, col):
+        """Input of one cell as the scorers see it: the option, the float or None."""
+        is_select, slot = self.columns.slots[self.columns.arrays.metrics[col][1]]
+        if is_select:
+            code = self.codes[row, slot]
+            return self.columns.arrays.options[col][code] if code >= 0 else None
+        val = self.values[row, slot]
+        return None if np.isnan(val) else float(val)
+
+    def record(self, row):
+        """{metric key: value} for one row, without missing inputs."""
+        out = {}
+        for col, (_, mkey) in enumerate(self.columns.arrays.metrics):
+            val = self.value(row, col)
+            if val is not None:
+                out[mkey] = val
+        return out
+
+
+class ResultTable:
+    """Scores of an InputTable: score-table positions per cell, category and overall scores per row."""
+
+    def __init__(self, inputs):
+        cols = inputs.columns
+        arrays = cols.arrays
+        self.inputs = inputs
+        idx = arrays.index_matrix(inputs.matrix())
+        self.positions = idx.astype(np.int8)
+
+        # Sequential sums in rubric order, as category_score / overall_score do per record.
+        n = len(inputs)
+        weighted = np.zeros((n, len(arrays.categories)))
+        weight_sum = [0.0] * len(arrays.categories)
+        for col, ci in enumerate(arrays.cat_index):
+            table = np.asarray(cols.tables[col], dtype=float)
+            scores = np.where(idx[:, col] >= 0, table[np.maximum(idx[:, col], 0)], NEUTRAL_SCORE)
+            weighted[:, ci] += scores * cols.weights[col]
+            weight_sum[ci] += cols.weights[col]
+        self.cat_scores = np.zeros_like(weighted)
+        for ci, total in enumerate(weight_sum):
+            if total > 0:
+                self.cat_scores[:, ci] = weighted[:, ci] / total
+        self.overall = np.zeros(n)
+        for ci, w in enumerate(arrays.category_weights.tolist()):
+            self.overall += self.cat_scores[:, ci] * w
+
+    @classmethod
+    def from_records(cls, records, rubric=None):
+        return cls(InputTable.from_records(records, rubric))
+
+    def to_arrays(self):
+        """Input and score arrays without the column metadata; ``from_arrays`` reattaches it."""
+        return self.inputs.to_arrays() + (self.positions, self.cat_scores, self.overall)
+
+    @classmethod
+    def from_arrays(cls, arrays, rubric=None):
+        table = cls.__new__(cls)
+        table.inputs = InputTable.from_arrays(arrays[:3], rubric)
+        table.positions, table.cat_scores, table.overall = arrays[3:]
+        return table
+
+    def __len__(self):
+        return len(self.inputs)
+
+    @property
+    def ids(self):
+        return self.inputs.ids
+
+    @property
+    def nbytes(self):
+        return self.inputs.nbytes + self.positions.nbytes + self.cat_scores.nbytes + self.overall.nbytes
+
+    def score(self, row, col):
+        pos = self.positions[row, col]
+        return self.inputs.columns.tables[col][pos] if pos >= 0 else NEUTRAL_SCORE
+
+    def metric_rows(self, id_column="Country"):
+        """Metric-level report rows for every record, generated one at a time."""
+        cols = self.inputs.columns
+        arrays = cols.arrays
+        scorers = cols.rubric.scorers
+        for row, row_id in enumerate(self.ids):
+            for col, (cat, mkey) in enumerate(arrays.metrics):
+                val = self.inputs.value(row, col)
+                score = self.score(row, col)
+                weight = cols.weights[col]
+                yield {
+                    id_column: row_id,
+                    "Category": cat,
+                    "Metric": arrays.labels[col],
+                    "Input": val if val is not None else "N/A",
+                    "Score": score,
+                    "Sub-weight": weight,
+                    "Weighted (metric)": round(score * weight, 3),
+                    "Rationale": scorers[mkey].why(val),
+                }
+
+    def category_rows(self, id_column="Country", overall=False):
+        """Category-level report rows; ``overall`` adds an "Overall score" column."""
+        arrays = self.inputs.columns.arrays
+        weights = arrays.category_weights.tolist()
+        for row, row_id in enumerate(self.ids):
+            for ci, cat in enumerate(arrays.categories):
+                score = float(self.cat_scores[row, ci])
+                out = {
+                    id_column: row_id,
+                    "Category": cat,
+                    "Category weight": weights[ci],
+                    "Category score (weighted sub-metrics)": round(score, 3),
+                    "Contribution to overall": round(score * weights[ci], 3),
+                }
+                if overall:
+                    out["Overall score"] = round(float(self.overall[row]), 3)
+                yield out
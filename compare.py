@@ -0,0 +1,61 @@
+"""Score every country in a store at once for side-by-side comparison.
+
+The countries x metrics score matrix is computed with the vectorized
+engine and cached until either the rubric or the stored data changes.
+"""
+import threading
+
+import numpy as np
+
+from rubric import get_rubric
+
+_lock = threading.Lock()
+_cache = {}  # (rubric digest, store fingerprint) -> ScoreMatrix
+
+
+class ScoreMatrix:
+    """Metric, category and overall scores for a set of countries."""
+
+    def __init__(self, countries, rubric, records=None):
+        arrays = rubric.arrays
+        self.countries = list(countries)
+        self.categories = list(arrays.categories)
+        self.metrics = [mkey for _, mkey in arrays.metrics]
+        self.inputs = records
+        X = arrays.encode([records[c] for c in self.countries])
+        self.scores = arrays.score_matrix(X)
+        self.cat_scores = arrays.category_scores(self.scores)
+        self.overall = arrays.overall(self.cat_scores)
+        self.rank = (-self.overall).argsort(kind="stable").argsort(kind="stable") + 1
+
+    def leaderboard(self):
+        """Rows sorted by overall score: rank, country, overall, then one column per category."""
+        rows = []
+        for i in np.argsort(self.rank):
+            row = {"Rank": int(self.rank[i]), "Country": self.countries[i], "Overall": round(float(self.overall[i]), 3)}
+            row.update({cat: round(float(v), 3) for cat, v in zip(self.categories, self.cat_scores[i])})
+            rows.append(row)
+        return rows
+
+    def metric_rows(self, labels=None):
+        """One row per country with every metric score, columns labelled by ``labels``."""
+        labels = labels or {}
+        return [
+            {"Country": country, **{labels.get(m, m): float(s) for m, s in zip(self.metrics, self.scores[i])}}
+            for i, country in enumerate(self.countries)
+        ]
+
+
+def score_all(store, rubric=None):
+    """Score every country in ``store``; cached per (rubric, data) state."""
+    rubric = rubric or get_rubric()
+    key = (rubric.digest, store.fingerprint())
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+    with _lock:
+        records = store.get_all()
+        result = ScoreMatrix(list(records), rubric, records)
+        _cache.clear()
+        _cache[key] = result
+    return result
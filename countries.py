@@ -0,0 +1,489 @@
+"""Country input data stores.
+
+``MemoryStore`` serves the built-in snapshot below; ``SQLiteStore`` keeps
+one row per (country, dataset version, metric) so a session loads only the
+country it looks at. ``get_store()`` picks SQLite when a database exists.
+Versions are as-of dates (e.g. "2025Q4" or "2025-12-31"); every country
+can have one record per version, see timeseries.py.
+
+    python countries.py import data.csv --version 2025Q4
+    python countries.py import history.csv      # with an "As of" column
+"""
+import argparse
+import csv
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from rubric import get_rubric
+
+DB_PATH = os.environ.get("COUNTRY_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "countries.db"))
+# Versions compare as strings (e.g. "2025Q4"); the built-in snapshot sorts first
+BUILTIN_VERSION = "0-builtin"
+
+# Pre-populated country data extracted from your CSVs
+BUILTIN_COUNTRIES = {
+    "Singapore": {
+        "GDP per capita": 72794.0,
+        "Gini coefficient": 0.37,
+        "Disposable income": 3500.0,
+        "Retail investor penetration": 28.0,
+        "Islamic robo competitors": "Moderate competition",
+        "Conventional robo penetration": 2500.0,
+        "Digital maturity": "Excellent",
+        "Shariah-compliant instruments": "Strong range (21–50)",
+        "Sukuk & mutual funds": "Strong",
+        "Real estate crowdfunding": "Moderate",
+        "Ethical commodities": "Excellent",
+        "Clarity for Islamic Finance": "Weak",
+        "Licensing process": "Weak",
+        "Regulatory stability": "Excellent",
+        "KYC providers": "Excellent",
+        "Physical setup cost": "Low",
+        "Brokers & custodians": "Weak",
+        "Talent pool": 0.85,
+        "Ethical investing culture": "Weak",
+        "Shariah finance attitudes": "Excellent",
+        "Attitude towards Muslims": "Mixed/neutral",
+        "Digital adoption": "Mixed"
+    },
+    "India": {
+        "GDP per capita": 2600.0,
+        "Gini coefficient": 0.25,
+        "Disposable income": 800.0,
+        "Retail investor penetration": 6.0,
+        "Islamic robo competitors": "None present",
+        "Conventional robo penetration": 16.0,
+        "Digital maturity": "Excellent",
+        "Shariah-compliant instruments": "None available",
+        "Sukuk & mutual funds": "Very weak",
+        "Real estate crowdfunding": "Moderate",
+        "Ethical commodities": "Moderate",
+        "Clarity for Islamic Finance": "Very weak",
+        "Licensing process": "Strong",
+        "Regulatory stability": "Moderate",
+        "KYC providers": "Strong",
+        "Physical setup cost": "Low",
+        "Brokers & custodians": "Excellent",
+        "Talent pool": 1.0,
+        "Ethical investing culture": "Very weak",
+        "Shariah finance attitudes": "Very weak",
+        "Attitude towards Muslims": "Very negative",
+        "Digital adoption": "Mixed"
+    },
+    "France": {
+        "GDP per capita": 39117.0,
+        "Gini coefficient": 0.3,
+        "Disposable income": 3000.0,
+        "Retail investor penetration": 24.0,
+        "Islamic robo competitors": "None present",
+        "Conventional robo penetration": 4200.0,
+        "Digital maturity": "Excellent",
+        "Shariah-compliant instruments": "Extensive opportunities (50+)",
+        "Sukuk & mutual funds": "Excellent",
+        "Real estate crowdfunding": "Excellent",
+        "Ethical commodities": "Excellent",
+        "Clarity for Islamic Finance": "Moderate",
+        "Licensing process": "Strong",
+        "Regulatory stability": "Excellent",
+        "KYC providers": "Excellent",
+        "Physical setup cost": "Very high",
+        "Brokers & custodians": "Weak",
+        "Talent pool": 0.5,
+        "Ethical investing culture": "Strong",
+        "Shariah finance attitudes": "Weak",
+        "Attitude towards Muslims": "Negative",
+        "Digital adoption": "Digital-leaning"
+    },
+    "Netherlands": {
+        "GDP per capita": 52000.0,
+        "Gini coefficient": 0.29,
+        "Disposable income": 3000.0,
+        "Retail investor penetration": 82.0,
+        "Islamic robo competitors": "Sparse presence",
+        "Conventional robo penetration": 277.0,
+        "Digital maturity": "Excellent",
+        "Shariah-compliant instruments": "Strong range (21–50)",
+        "Sukuk & mutual funds": "Moderate",
+        "Real estate crowdfunding": "Moderate",
+        "Ethical commodities": "Moderate",
+        "Clarity for Islamic Finance": "Strong",
+        "Licensing process": "Excellent",
+        "Regulatory stability": "Excellent",
+        "KYC providers": "Excellent",
+        "Physical setup cost": "Very low",
+        "Brokers & custodians": "Excellent",
+        "Talent pool": 1.0,
+        "Ethical investing culture": "Excellent",
+        "Shariah finance attitudes": "Weak",
+        "Attitude towards Muslims": "Negative",
+        "Digital adoption": "Digital-first"
+    },
+    "Canada": {
+        "GDP per capita": 54283.0,
+        "Gini coefficient": 0.31,
+        "Disposable income": 2400.0,
+        "Retail investor penetration": 25.0,
+        "Islamic robo competitors": "Sparse presence",
+        "Conventional robo penetration": 450.0,
+        "Digital maturity": "Excellent",
+        "Shariah-compliant instruments": "Moderate range (6–20)",
+        "Sukuk & mutual funds": "Moderate",
+        "Real estate crowdfunding": "Weak",
+        "Ethical commodities": "Excellent",
+        "Clarity for Islamic Finance": "Strong",
+        "Licensing process": "Weak",
+        "Regulatory stability": "Excellent",
+        "KYC providers": "Excellent",
+        "Physical setup cost": "Moderate",
+        "Brokers & custodians": "Moderate",
+        "Talent pool": 1.0,
+        "Ethical investing culture": "Excellent",
+        "Shariah finance attitudes": "Excellent",
+        "Attitude towards Muslims": "Negative",
+        "Digital adoption": "Digital-leaning"
+    },
+    "Brunei": {
+        "GDP per capita": 29600.0,
+        "Gini coefficient": 0.63,
+        "Disposable income": 1200.0,
+        "Retail investor penetration": 2.0,
+        "Islamic robo competitors": "None present",
+        "Conventional robo penetration": 10.0,
+        "Digital maturity": "Moderate",
+        "Shariah-compliant instruments": "Extensive opportunities (50+)",
+        "Sukuk & mutual funds": "Moderate",
+        "Real estate crowdfunding": "Weak",
+        "Ethical commodities": "Weak",
+        "Clarity for Islamic Finance": "Excellent",
+        "Licensing process": "Strong",
+        "Regulatory stability": "Excellent",
+        "KYC providers": "Moderate",
+        "Physical setup cost": "Very low",
+        "Brokers & custodians": "Moderate",
+        "Talent pool": 0.5,
+        "Ethical investing culture": "Weak",
+        "Shariah finance attitudes": "Excellent",
+        "Attitude towards Muslims": "Very positive",
+        "Digital adoption": "Branch-leaning"
+    },
+}
+
+
+class CountryStore(ABC):
+    """Interface every country data backend implements."""
+
+    @abstractmethod
+    def names(self):
+        """Every stored country."""
+
+    @abstractmethod
+    def versions(self, country=None):
+        """Sorted versions stored for ``country``, or for any country."""
+
+    @abstractmethod
+    def get(self, country, version=None):
+        """Inputs for one country ({metric key: value}); latest version by default."""
+
+    @abstractmethod
+    def put(self, country, record, version):
+        """Store one country's inputs as of ``version``."""
+
+    def put_many(self, records, version):
+        for country, record in records.items():
+            self.put(country, record, version)
+
+    def get_all(self, version=None):
+        """{country: inputs} for every country, latest version of each by default."""
+        return {country: self.get(country, version) for country in self.names()}
+
+    def history(self):
+        """(country, version, inputs) for every stored record, ordered by country then version."""
+        for country in sorted(self.names()):
+            for version in self.versions(country):
+                yield country, version, self.get(country, version)
+
+    @abstractmethod
+    def fingerprint(self):
+        """Changes whenever stored data changes; used as a cache key."""
+
+
+class MemoryStore(CountryStore):
+
+    def __init__(self, data=None, version=BUILTIN_VERSION):
+        self._data = {}  # country -> {version: record}
+        self._changes = 0
+        for country, record in (data or {}).items():
+            self.put(country, record, version)
+
+    def names(self):
+        return list(self._data)
+
+    def versions(self, country=None):
+        if country is not None:
+            return sorted(self._data.get(country, {}))
+        return sorted({v for per in self._data.values() for v in per})
+
+    def get(self, country, version=None):
+        per = self._data.get(country)
+        if not per:
+            return {}
+        if version is None:
+            version = max(per)
+        return dict(per.get(version, {}))
+
+    def put(self, country, record, version):
+        self._data.setdefault(country, {})[version] = dict(record)
+        self._changes += 1
+
+    def fingerprint(self):
+        return (id(self), self._changes)
+
+
+class SQLiteStore(CountryStore):
+    """One row per (country, version, metric), indexed by country and version."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS country_inputs (
+            country TEXT NOT NULL,
+            version TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            value,
+            PRIMARY KEY (country, version, metric)
+        );
+        CREATE INDEX IF NOT EXISTS idx_country_inputs_version ON country_inputs (version, country);
+    """
+
+    def __init__(self, path=DB_PATH, cache_size=32):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(self.SCHEMA)
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()  # (country, version) -> record, LRU
+        self._cache_size = cache_size
+
+    def _query(self, sql, args=()):
+        with self._lock:
+            return self._conn.execute(sql, args).fetchall()
+
+    def names(self):
+        return [r[0] for r in self._query("SELECT DISTINCT country FROM country_inputs ORDER BY country")]
+
+    def versions(self, country=None):
+        if country is not None:
+            rows = self._query("SELECT DISTINCT version FROM country_inputs WHERE country = ? ORDER BY version", (country,))
+        else:
+            rows = self._query("SELECT DISTINCT version FROM country_inputs ORDER BY version")
+        return [r[0] for r in rows]
+
+    def get(self, country, version=None):
+        if version is None:
+            rows = self._query("SELECT MAX(version) FROM country_inputs WHERE country = ?", (country,))
+            version = rows[0][0]
+            if version is None:
+                return {}
+        key = (country, version)
+        # The LRU is shared by every thread using this store: look up, insert and evict under the lock.
+        with self._lock:
+            record = self._cache.get(key)
+            if record is not None:
+                self._cache.move_to_end(key)
+                return dict(record)
+            rows = self._conn.execute(
+                "SELECT metric, value FROM country_inputs WHERE country = ? AND version = ?", (country, version)
+            ).fetchall()
+            record = dict(rows)
+            self._cache[key] = record
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return dict(record)
+
+    def get_all(self, version=None):
+        if version is not None:
+            rows = self._query("SELECT country, metric, value FROM country_inputs WHERE version = ?", (version,))
+        else:
+            rows = self._query("""
+                SELECT c.country, c.metric, c.value FROM country_inputs c
+                JOIN (SELECT country, MAX(version) AS version FROM country_inputs GROUP BY country) latest
+                ON c.country = latest.country AND c.version = latest.version
+            """)
+        records = {}
+        for country, metric, value in rows:
+            records.setdefault(country, {})[metric] = value
+        return records
+
+    def history(self, chunk=50_000):
+        # Paged by primary key, each page a short query on the shared connection, so a long
+        # history never sits in memory as SQL rows and no read transaction is held open
+        # between yields (a concurrent import would otherwise fail with "database is
+        # locked"). Versions imported after the read starts are left out; a version that is
+        # re-imported meanwhile may show up partly old, partly new.
+        last = self._query("SELECT MAX(version) FROM country_inputs")[0][0]
+        if last is None:
+            return
+        sql = "SELECT country, version, metric, value FROM country_inputs WHERE version <= ?"
+        order = " ORDER BY country, version, metric LIMIT ?"
+        rows = self._query(sql + order, (last, chunk))
+        key, record = None, {}
+        while rows:
+            for country, version, metric, value in rows:
+                if (country, version) != key:
+                    if key is not None:
+                        yield key[0], key[1], record
+                    key, record = (country, version), {}
+                record[metric] = value
+            after = rows[-1][:3]
+            rows = self._query(sql + " AND (country, version, metric) > (?, ?, ?)" + order, (last, *after, chunk))
+        if key is not None:
+            yield key[0], key[1], record
+
+    def fingerprint(self):
+        # total_changes covers writes through this connection, the file stat
+        # covers writes from other processes (e.g. a CSV import).
+        st = os.stat(self.path)
+        return (self.path, st.st_mtime_ns, st.st_size, self._conn.total_changes)
+
+    def put(self, country, record, version):
+        self.put_many({country: record}, version)
+
+    def put_many(self, records, version):
+        rows = [(c, version, k, v) for c, record in records.items() for k, v in record.items()]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO country_inputs VALUES (?, ?, ?, ?)", rows)
+            for c in records:
+                self._cache.pop((c, version), None)
+
+
+def resolve_metric(header, rubric):
+    """Map a column header (metric key or label) to a metric key, or None."""
+    header = header.strip()
+    if header in rubric.metric_defs:
+        return header
+    return rubric.label_keys.get(header)
+
+
+def _number(mkey, value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{mkey}: expected a number, got {value!r}") from None
+    return None if value != value else value
+
+
+def coerce_input(mkey, value, rubric):
+    """CSV/JSON cells to input values: numeric metrics become floats, blanks and NaN None.
+
+    NaN means missing, as in the engine's encoding, so every scorer gives
+    it the neutral score. Qualitative answers must be one of the metric's
+    options; the scorers would otherwise silently fall back to the middle
+    option.
+    """
+    custom = rubric.metric_defs[mkey][1].get("custom")
+    if isinstance(value, str):
+        value = value.strip()
+        if value == "":
+            return None
+        if not custom:
+            return _number(mkey, value.replace(",", ""))
+    elif value is not None and not custom:
+        return _number(mkey, value)
+    if value is not None and value not in rubric.option_index[mkey]:
+        raise ValueError(f"{mkey}: unknown answer {value!r}, expected one of {', '.join(rubric.option_index[mkey])}")
+    return value
+
+
+def parse_record(row, rubric, skip=()):
+    """Wide row ({header: cell}) to a {metric key: value} record; unknown columns are ignored."""
+    record = {}
+    for header, value in row.items():
+        if header in skip or header is None:
+            continue
+        mkey = resolve_metric(header, rubric)
+        if mkey is None:
+            continue
+        value = coerce_input(mkey, value, rubric)
+        if value is not None:
+            record[mkey] = value
+    return record
+
+
+def read_csv(path, rubric=None, version=None):
+    """Read country inputs from a CSV as {version: {country: inputs}}.
+
+    Two layouts are accepted: wide (a ``Country`` column plus one column
+    per metric, headed by metric key or label) and long (``Country``,
+    ``Metric``, ``Value`` columns). An ``As of`` (or ``Version``) column
+    lets one file hold several vintages; otherwise every row belongs to
+    ``version``.
+    """
+    rubric = rubric or get_rubric()
+    vintages = {}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        fields = {h.strip().lower(): h for h in reader.fieldnames or []}
+        if "country" not in fields:
+            raise ValueError(f"{path}: missing a Country column")
+        country_col = fields["country"]
+        version_col = fields.get("as of") or fields.get("version")
+        if version_col is None and version is None:
+            raise ValueError(f"{path}: no As of column, give a version")
+        skip = (country_col, version_col)
+        long_layout = "metric" in fields and "value" in fields
+        for row in reader:
+            row_version = ((row[version_col] or "").strip() or version) if version_col else version
+            records = vintages.setdefault(row_version, {})
+            record = records.setdefault(row[country_col].strip(), {})
+            try:
+                if long_layout:
+                    record.update(parse_record({row[fields["metric"]]: row[fields["value"]]}, rubric))
+                else:
+                    record.update(parse_record(row, rubric, skip=skip))
+            except ValueError as exc:
+                # An import is all or nothing; say which row to fix.
+                raise ValueError(f"{path}, line {reader.line_num} ({row[country_col].strip()}): {exc}") from None
+    if None in vintages:
+        raise ValueError(f"{path}: rows without an As of value, give a version")
+    return vintages
+
+
+def import_csv(store, path, version=None):
+    """Store every vintage in a CSV; returns the number of (country, version) records."""
+    vintages = read_csv(path, version=version)
+    for v, records in vintages.items():
+        store.put_many(records, v)
+    return sum(len(records) for records in vintages.values())
+
+
+def get_store(path=DB_PATH):
+    if os.path.exists(path):
+        return SQLiteStore(path)
+    return MemoryStore(BUILTIN_COUNTRIES)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the country input database.")
+    parser.add_argument("--db", default=DB_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="bulk import CSV files")
+    imp.add_argument("csv", nargs="+")
+    imp.add_argument("--version", help="as-of version for rows without an As of column, e.g. 2025Q4")
+    sub.add_parser("seed", help="load the built-in snapshot")
+    sub.add_parser("list", help="list countries and versions")
+    args = parser.parse_args(argv)
+
+    store = SQLiteStore(args.db)
+    if args.command == "import":
+        for path in args.csv:
+            print(f"{path}: {import_csv(store, path, args.version)} country records")
+    elif args.command == "seed":
+        store.put_many(BUILTIN_COUNTRIES, BUILTIN_VERSION)
+    else:
+        for country in store.names():
+            print(f"{country}: {', '.join(store.versions(country))}")
+
+
+if __name__ == "__main__":
+    main()
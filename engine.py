@@ -0,0 +1,168 @@
+"""Headless, vectorized scoring engine for the thresholds.json rubric.
+
+The rubric is compiled once into NumPy arrays so that a whole
+countries x metrics matrix can be scored in a single pass. Boundary rules
+match the per-value scorers in scoring.py exactly:
+
+- higher_better: value >= breaks[i] lands in scores[i + 1]
+  (np.searchsorted(breaks, value, side="right"))
+- lower_better: value <= breaks[i] lands in scores[i]
+  (np.searchsorted(breaks, value, side="left"))
+- qualitative: option index i scores i + 1 (5 - i when reverse_options),
+  unknown answers fall back to index 2
+- missing numeric values (None / NaN) score a neutral 3, here and in the
+  per-value scorers alike
+"""
+import numpy as np
+
+from scoring import DEFAULT_SELECT, FALLBACK_OPTION, NEUTRAL_SCORE, THRESHOLDS_PATH, load_rubric
+
+
+class CompiledRubric:
+    """Array form of a rubric: one column per metric, in rubric order."""
+
+    def __init__(self, rubric):
+        self.categories = list(rubric.keys())
+        self.metrics = []      # (category, metric key) per column
+        self.labels = []
+        self.options = []      # option list for qualitative columns, None for numeric
+        self.option_index = []  # {answer: index} for qualitative columns
+        cat_index, metric_weights, is_select, higher = [], [], [], []
+        breaks, tables = [], []
+
+        for ci, (cat, cdef) in enumerate(rubric.items()):
+            for mkey, mdef in cdef["metrics"].items():
+                self.metrics.append((cat, mkey))
+                self.labels.append(mdef.get("label", mkey))
+                cat_index.append(ci)
+                metric_weights.append(mdef["weight"])
+                if mdef.get("custom"):
+                    options = mdef.get("options", DEFAULT_SELECT)
+                    reverse = mdef.get("reverse_options", False)
+                    self.options.append(list(options))
+                    self.option_index.append({o: i for i, o in enumerate(options)})
+                    is_select.append(True)
+                    higher.append(True)
+                    breaks.append([])
+                    tables.append([(5 - i) if reverse else (i + 1) for i in range(len(options))])
+                else:
+                    self.options.append(None)
+                    self.option_index.append(None)
+                    is_select.append(False)
+                    higher.append(mdef["direction"] == "higher_better")
+                    breaks.append(list(mdef["breaks"]))
+                    tables.append(list(mdef["scores"]))
+
+        n = len(self.metrics)
+        self.columns = {m: i for i, m in enumerate(self.metrics)}
+        self.key_columns = {mkey: i for i, (_, mkey) in enumerate(self.metrics)}
+        self.cat_index = np.array(cat_index, dtype=np.intp)
+        self.metric_weights = np.array(metric_weights, dtype=float)
+        self.category_weights = np.array([rubric[c]["weight"] for c in self.categories], dtype=float)
+        self.is_select = np.array(is_select, dtype=bool)
+        self.higher_better = np.array(higher, dtype=bool)
+
+        self.column_breaks = [np.array(b, dtype=float) for b in breaks]
+        self.column_scores = [np.array(t, dtype=float) for t in tables]
+        self.sides = ["right" if h else "left" for h in higher]
+
+        # Score tables padded with the last real entry; the index never reaches padding.
+        depth = max(len(t) for t in tables)
+        self.score_table = np.zeros((n, depth))
+        for i, t in enumerate(tables):
+            self.score_table[i, :len(t)] = t
+            self.score_table[i, len(t):] = t[-1]
+
+        # metrics x categories membership, for category subtotals via matmul.
+        self.membership = np.zeros((n, len(self.categories)))
+        self.membership[np.arange(n), self.cat_index] = 1.0
+
+    def encode(self, records):
+        """Turn country dicts into a float matrix of numeric values / option indices."""
+        X = np.full((len(records), len(self.metrics)), np.nan)
+        for r, record in enumerate(records):
+            for j, (_, mkey) in enumerate(self.metrics):
+                val = record.get(mkey)
+                index = self.option_index[j]
+                if index is not None:
+                    X[r, j] = index.get(val, FALLBACK_OPTION)
+                elif val is not None:
+                    X[r, j] = float(val)  # NaN stays NaN: missing
+        return X
+
+    def score_matrix(self, X, columns=None):
+        """Score an encoded (..., metrics) array, one vectorized pass per column.
+
+        Usually countries x metrics; extra leading axes (e.g. samples) are
+        scored the same way. With ``columns``, the last axis of ``X`` holds
+        only those metric columns.
+        """
+        cols = range(len(self.metrics)) if columns is None else columns
+        X = np.asarray(X, dtype=float)
+        scores = np.empty(X.shape)
+        for j, col in enumerate(cols):
+            x = X[..., j]
+            table = self.column_scores[col]
+            if self.is_select[col]:
+                idx = np.nan_to_num(x, nan=FALLBACK_OPTION).astype(np.intp)
+                np.clip(idx, 0, len(table) - 1, out=idx)
+                scores[..., j] = table[idx]
+            else:
+                scores[..., j] = table[np.searchsorted(self.column_breaks[col], x, side=self.sides[col])]
+                scores[..., j][np.isnan(x)] = NEUTRAL_SCORE
+        return scores
+
+    def index_matrix(self, X):
+        """Position of each encoded value in its column's score table; -1 where a numeric value is missing."""
+        X = np.asarray(X, dtype=float)
+        idx = np.empty(X.shape, dtype=np.intp)
+        for col in range(len(self.metrics)):
+            x = X[..., col]
+            table = self.column_scores[col]
+            if self.is_select[col]:
+                i = np.nan_to_num(x, nan=FALLBACK_OPTION).astype(np.intp)
+                idx[..., col] = np.clip(i, 0, len(table) - 1)
+            else:
+                idx[..., col] = np.searchsorted(self.column_breaks[col], x, side=self.sides[col])
+                idx[..., col][np.isnan(x)] = -1
+        return idx
+
+    def category_scores(self, scores, metric_weights=None):
+        """Weighted mean of metric scores per category, as in scoring.category_score.
+
+        ``metric_weights`` may be a single (metrics,) vector or a
+        (scenarios, metrics) matrix, giving a (scenarios, countries, categories)
+        result.
+        """
+        w = self.metric_weights if metric_weights is None else np.asarray(metric_weights, dtype=float)
+        weight_sums = w @ self.membership
+        safe = np.where(weight_sums > 0, weight_sums, 1.0)
+        if w.ndim == 1:
+            return np.where(weight_sums > 0, (scores * w) @ self.membership / safe, 0.0)
+        sums = np.einsum("cm,sm,mk->sck", scores, w, self.membership)
+        return np.where(weight_sums[:, None, :] > 0, sums / safe[:, None, :], 0.0)
+
+    def effective_weights(self, metric_weights=None, category_weights=None):
+        """Per-metric weight on the overall score: metric share of its category x category weight."""
+        mw = self.metric_weights if metric_weights is None else np.asarray(metric_weights, dtype=float)
+        cw = self.category_weights if category_weights is None else np.asarray(category_weights, dtype=float)
+        sums = (mw @ self.membership)[..., self.cat_index]
+        return np.divide(mw, sums, out=np.zeros_like(mw), where=sums > 0) * cw[..., self.cat_index]
+
+    def overall(self, cat_scores, category_weights=None):
+        w = self.category_weights if category_weights is None else np.asarray(category_weights, dtype=float)
+        if w.ndim == 1:
+            return cat_scores @ w
+        if cat_scores.ndim == 2:
+            return np.einsum("ck,sk->sc", cat_scores, w)
+        return np.einsum("sck,sk->sc", cat_scores, w)
+
+    def score(self, records, metric_weights=None, category_weights=None):
+        """Score country dicts; returns (metric scores, category scores, overall)."""
+        scores = self.score_matrix(self.encode(records))
+        cats = self.category_scores(scores, metric_weights)
+        return scores, cats, self.overall(cats, category_weights)
+
+
+def compile_rubric(rubric=None, path=THRESHOLDS_PATH):
+    return CompiledRubric(rubric if rubric is not None else load_rubric(path))
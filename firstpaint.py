@@ -0,0 +1,172 @@
+"""Startup and first-paint timing for the Streamlit app.
+
+A new session shows nothing until the first script run has sent its
+elements, and stays non-interactive until that run ends, so the first
+run bounds both first paint and time-to-interactive. Every sample runs
+in a fresh interpreter, so imports, rubric compilation and stylesheet
+building count:
+
+- first run: interpreter up to the end of the first script run
+- rerun: median of further reruns in the same process
+- style bytes: ``<style>`` markup sent by the first run
+- external: URLs and ``@import`` in the markup of the first run, which
+  an offline browser would wait on; must be empty
+
+``--server`` also starts ``streamlit run`` and times how long it takes
+until the health check answers and the page is served.
+
+    python firstpaint.py --runs 5
+    python firstpaint.py --json after.json --compare before.json
+    git worktree add /tmp/before HEAD~1 && python firstpaint.py --app /tmp/before/app.py --json before.json
+"""
+import time
+
+START = time.perf_counter()
+
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import urllib.request
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+EXTERNAL = re.compile(r"@import[^;]*|https?://[^\s'\")]+", re.IGNORECASE)
+STYLE = re.compile(r"<style>.*?</style>", re.S | re.IGNORECASE)
+
+
+def _child(app, reruns):
+    """Runs inside the fresh interpreter; prints one JSON sample."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(app, default_timeout=60).run()
+    first = time.perf_counter() - START
+    if at.exception:
+        raise SystemExit(f"{app}: {at.exception[0].message}")
+    markup = [m.value for m in at.markdown] + [node.proto.body for node in at.get("html")]
+    times = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+    print(json.dumps({
+        "first_run": first,
+        "rerun": statistics.median(times) if times else None,
+        "style_bytes": sum(len(s.encode("utf-8")) for m in markup for s in STYLE.findall(m)),
+        "markup_bytes": sum(len(m.encode("utf-8")) for m in markup),
+        "external": sorted({ref for m in markup for ref in EXTERNAL.findall(m)}),
+    }))
+
+
+def sample(app, reruns=5):
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", app, "--reruns", str(reruns)],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(app)),
+    )
+    if out.returncode:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "child failed")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def server_startup(app, timeout=60.0):
+    """(seconds until /_stcore/health answers, seconds to serve the page) for ``streamlit run``."""
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", app, "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=os.path.dirname(os.path.abspath(app)),
+    )
+    try:
+        while True:
+            if proc.poll() is not None or time.perf_counter() - start > timeout:
+                raise RuntimeError("streamlit did not start")
+            try:
+                with urllib.request.urlopen(f"{base}/_stcore/health", timeout=1) as r:
+                    if r.status == 200:
+                        break
+            except OSError:
+                time.sleep(0.05)
+        ready = time.perf_counter() - start
+        page_start = time.perf_counter()
+        with urllib.request.urlopen(base + "/", timeout=10) as r:
+            r.read()
+        return ready, time.perf_counter() - page_start
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def summarize(samples):
+    def med(key):
+        values = [s[key] for s in samples if s[key] is not None]
+        return statistics.median(values) if values else None
+    return {
+        "first_run": med("first_run"),
+        "first_run_min": min(s["first_run"] for s in samples),
+        "rerun": med("rerun"),
+        "style_bytes": samples[0]["style_bytes"],
+        "markup_bytes": samples[0]["markup_bytes"],
+        "external": samples[0]["external"],
+    }
+
+
+def format_summary(summary, previous=None):
+    lines = []
+    for key, unit in (("first_run", "ms"), ("first_run_min", "ms"), ("rerun", "ms"), ("server_ready", "ms"),
+                      ("page", "ms"), ("style_bytes", "B"), ("markup_bytes", "B")):
+        value = summary.get(key)
+        if value is None:
+            continue
+        shown = value * 1000 if unit == "ms" else value
+        line = f"{key:<16}{shown:>10.1f} {unit}" if unit == "ms" else f"{key:<16}{shown:>10d} {unit}"
+        if previous and previous.get(key):
+            line += f"   ({(value - previous[key]) / previous[key]:+.1%} vs before)"
+        lines.append(line)
+    lines.append(f"{'external':<16}{', '.join(summary['external']) or 'none'}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the app's first script run, reruns and server startup.")
+    parser.add_argument("--app", default=APP)
+    parser.add_argument("--runs", type=int, default=5, help="fresh-interpreter samples")
+    parser.add_argument("--reruns", type=int, default=5, help="reruns timed per sample")
+    parser.add_argument("--server", action="store_true", help="also time `streamlit run` until it serves the page")
+    parser.add_argument("--json", help="write the summary here")
+    parser.add_argument("--compare", help="summary JSON of an earlier run to compare with")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child(args.child, args.reruns)
+        return
+
+    app = os.path.abspath(args.app)
+    summary = summarize([sample(app, args.reruns) for _ in range(args.runs)])
+    if args.server:
+        summary["server_ready"], summary["page"] = server_startup(app)
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    print(format_summary(summary, previous))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+    if summary["external"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
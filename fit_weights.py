@@ -0,0 +1,189 @@
+"""Fit rubric weights to historical launch outcomes.
+
+The outcomes file is a CSV with a ``Country`` column, an ``Outcome``
+column (any number where higher is better: 1/0 success, revenue, a
+post-launch rating, ...) and optionally a ``Version`` column naming the
+stored data version the launch decision was made on (latest otherwise).
+
+Weights are fitted to maximise the correlation between the overall score
+and the outcome. Category weights and each category's metric weights stay
+non-negative and sum to 1. Metric scores do not depend on the weights, so
+every country is scored once; a candidate weighting then costs a single
+matmul, and each round of the search scores thousands of candidates drawn
+from Dirichlet distributions around the current best (a cross-entropy
+search). K-fold cross-validation, grouped by country, compares the fitted
+weights with those in thresholds.json on held-out launches.
+
+    python fit_weights.py outcomes.csv --folds 5 --write fitted.json
+"""
+import argparse
+import csv
+import json
+import sys
+
+import numpy as np
+
+from countries import get_store
+from rubric import get_rubric
+from scoring import THRESHOLDS_PATH
+from sensitivity import sample_weights
+
+
+def load_outcomes(path):
+    """[(country, version or None, outcome)] from an outcomes CSV."""
+    rows = []
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for line, row in enumerate(csv.DictReader(f), 2):
+            try:
+                outcome = float(row["Outcome"])
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"{path}:{line}: expected a numeric Outcome column")
+            rows.append((row["Country"], row.get("Version") or None, outcome))
+    return rows
+
+
+def score_history(store, outcomes, arrays):
+    """(countries, (launches, metrics) metric scores, outcomes) for launches with stored data."""
+    countries, records, y = [], [], []
+    for country, version, outcome in outcomes:
+        record = store.get(country, version)
+        if not record:
+            print(f"skipping {country} ({version or 'latest'}): no stored data", file=sys.stderr)
+            continue
+        countries.append(country)
+        records.append(record)
+        y.append(outcome)
+    return countries, arrays.score_matrix(arrays.encode(records)), np.array(y)
+
+
+def correlation(pred, y):
+    """Pearson correlation of each row of ``pred`` (candidates, launches) with ``y``."""
+    pc = pred - pred.mean(axis=-1, keepdims=True)
+    yc = y - y.mean()
+    denom = np.sqrt((pc ** 2).sum(axis=-1) * (yc ** 2).sum())
+    return np.divide(pc @ yc, denom, out=np.zeros(pc.shape[:-1]), where=denom > 0)
+
+
+def normalized_weights(arrays, category_weights=None, metric_weights=None):
+    """Category weights summing to 1 and metric weights summing to 1 within each category."""
+    cw = arrays.category_weights if category_weights is None else np.asarray(category_weights, dtype=float)
+    mw = arrays.metric_weights if metric_weights is None else np.asarray(metric_weights, dtype=float)
+    sums = (mw @ arrays.membership)[arrays.cat_index]
+    return cw / cw.sum(), np.divide(mw, sums, out=np.zeros_like(mw), where=sums > 0)
+
+
+def fit(arrays, scores, y, candidates=4096, rounds=40, elite=0.05, concentration=50.0, seed=None):
+    """Cross-entropy search for (category weights, metric weights, correlation) on the simplex.
+
+    Each round draws ``candidates`` weightings around the current centre,
+    keeps the best ``elite`` fraction and moves the centre to their mean;
+    the concentration grows as the search narrows. Starts from the
+    rubric's own weights, which are always among the candidates.
+    """
+    rng = np.random.default_rng(seed)
+    cw, mw = normalized_weights(arrays)
+    best = (cw, mw, float(correlation(scores @ arrays.effective_weights(mw, cw), y)))
+    n_elite = max(1, int(candidates * elite))
+    for _ in range(rounds):
+        cat_w, metric_w = sample_weights(arrays, rng, candidates, concentration, cw, mw)
+        cat_w[0], metric_w[0] = cw, mw
+        r = correlation(arrays.effective_weights(metric_w, cat_w) @ scores.T, y)
+        top = np.argpartition(-r, n_elite - 1)[:n_elite]
+        i = top[np.argmax(r[top])]
+        if r[i] > best[2]:
+            best = (cat_w[i].copy(), metric_w[i].copy(), float(r[i]))
+        cw, mw = normalized_weights(arrays, cat_w[top].mean(axis=0), metric_w[top].mean(axis=0))
+        concentration *= 1.15
+    return best
+
+
+def cross_validate(arrays, countries, scores, y, folds=5, seed=None, **fit_args):
+    """Held-out correlation per fold for the fitted and the rubric weights.
+
+    Launches of one country always fall in the same fold.
+    """
+    rng = np.random.default_rng(seed)
+    unique = np.array(sorted(set(countries)))
+    rng.shuffle(unique)
+    fold_of = {c: i % folds for i, c in enumerate(unique)}
+    assignment = np.array([fold_of[c] for c in countries])
+    base_cw, base_mw = normalized_weights(arrays)
+    base_eff = arrays.effective_weights(base_mw, base_cw)
+
+    fitted, baseline = [], []
+    for k in range(min(folds, len(unique))):
+        train, test = assignment != k, assignment == k
+        cw, mw, _ = fit(arrays, scores[train], y[train], seed=rng.integers(2 ** 32), **fit_args)
+        fitted.append(float(correlation(scores[test] @ arrays.effective_weights(mw, cw), y[test])))
+        baseline.append(float(correlation(scores[test] @ base_eff, y[test])))
+    return fitted, baseline
+
+
+def _round_simplex(weights, digits=4):
+    """Round weights summing to 1, putting the rounding residue on the largest one."""
+    rounded = np.round(weights, digits)
+    rounded[np.argmax(rounded)] += round(1.0 - rounded.sum(), digits)
+    return [round(float(w), digits) for w in rounded]
+
+
+def write_rubric(arrays, cw, mw, source=THRESHOLDS_PATH, path="fitted.json"):
+    """Copy of ``source`` with the fitted weights filled in."""
+    with open(source) as f:
+        data = json.load(f)
+    for k, cat in enumerate(arrays.categories):
+        data["categories"][cat]["weight"] = _round_simplex(cw)[k]
+        cols = np.flatnonzero(arrays.cat_index == k)
+        for col, w in zip(cols, _round_simplex(mw[cols])):
+            data["categories"][cat]["metrics"][arrays.metrics[col][1]]["weight"] = w
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def format_report(arrays, cw, mw, r, base_r, fitted_cv=None, baseline_cv=None):
+    base_cw, base_mw = normalized_weights(arrays)
+    lines = [f"In-sample correlation: rubric {base_r:.3f}, fitted {r:.3f}"]
+    if fitted_cv:
+        lines.append(
+            f"Held-out correlation ({len(fitted_cv)} folds): rubric {np.mean(baseline_cv):.3f} "
+            f"± {np.std(baseline_cv):.3f}, fitted {np.mean(fitted_cv):.3f} ± {np.std(fitted_cv):.3f}"
+        )
+    lines += ["", f"{'Weight':<58}{'Rubric':>8}{'Fitted':>8}"]
+    for k, cat in enumerate(arrays.categories):
+        lines.append(f"{cat[:57]:<58}{base_cw[k]:>8.3f}{cw[k]:>8.3f}")
+        for col in np.flatnonzero(arrays.cat_index == k):
+            lines.append(f"  {arrays.metrics[col][1][:55]:<56}{base_mw[col]:>8.3f}{mw[col]:>8.3f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit rubric weights to historical launch outcomes.")
+    parser.add_argument("outcomes", help="CSV with Country, Outcome and optional Version columns")
+    parser.add_argument("--candidates", type=int, default=4096, help="weightings scored per search round")
+    parser.add_argument("--rounds", type=int, default=40)
+    parser.add_argument("--folds", type=int, default=5, help="cross-validation folds (0 disables)")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--thresholds", default=THRESHOLDS_PATH)
+    parser.add_argument("--write", metavar="PATH", help="write a thresholds file with the fitted weights")
+    args = parser.parse_args(argv)
+
+    arrays = get_rubric(args.thresholds).arrays
+    countries, scores, y = score_history(get_store(), load_outcomes(args.outcomes), arrays)
+    if len(set(countries)) < 3:
+        parser.error("need outcomes for at least 3 countries with stored data")
+
+    fit_args = {"candidates": args.candidates, "rounds": args.rounds}
+    fitted_cv = baseline_cv = None
+    if args.folds > 1:
+        fitted_cv, baseline_cv = cross_validate(arrays, countries, scores, y, args.folds, args.seed, **fit_args)
+    cw, mw, r = fit(arrays, scores, y, seed=args.seed, **fit_args)
+    base_cw, base_mw = normalized_weights(arrays)
+    base_r = float(correlation(scores @ arrays.effective_weights(base_mw, base_cw), y))
+    print(format_report(arrays, cw, mw, r, base_r, fitted_cv, baseline_cv))
+    if args.write:
+        write_rubric(arrays, cw, mw, args.thresholds, args.write)
+        print(f"\nWrote {args.write}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""Ingest World Bank-style indicator CSVs into a columnar country panel.
+
+Accepts the World Bank download layout (a few metadata lines, then
+``Country Name, Country Code, Indicator Name, Indicator Code, 1960, ...``),
+either one file per indicator or the full multi-indicator dump. Files are
+split into byte ranges and parsed line by line across a process pool, so
+a large dump is never held in memory. Only indicators in the mapping are
+kept. Each value is scaled into the rubric's unit (e.g. Gini 0-100 to 0-1),
+regional aggregates are dropped and country names are aligned with the
+store.
+
+The result is written as a Parquet panel with one row per (country, year)
+and one float column per metric. ``--load`` also writes it into the
+country store, on top of each country's latest stored record, so
+qualitative answers are kept:
+
+    python ingest.py raw/*.csv --out indicators.parquet
+    python ingest.py raw/*.csv --map extra.json --load latest --version 2025Q4
+    python ingest.py WDIData.csv --load history --workers 8
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from countries import DB_PATH, SQLiteStore
+from rubric import get_rubric
+
+CHUNK_BYTES = 32 * 1024 * 1024
+
+# indicator code -> metric key and the factor that converts to the rubric's unit
+INDICATORS = {
+    "NY.GDP.PCAP.CD": {"metric": "GDP per capita", "scale": 1.0},
+    "SI.POV.GINI": {"metric": "Gini coefficient", "scale": 0.01},
+}
+
+# World Bank regional and income-group aggregates, which are not countries.
+AGGREGATES = frozenset("""
+    AFE AFW ARB CEB CSS EAP EAR EAS ECA ECS EMU EUU FCS HIC HPC IBD IBT IDA IDB IDX INX LAC LCN LDC
+    LIC LMC LMY LTE MEA MIC MNA NAC OED OSS PRE PSS PST SAS SSA SSF SST TEA TEC TLA TMN TSA TSS UMC WLD
+""".split())
+
+# World Bank country names that differ from the store's.
+NAME_ALIASES = {
+    "Brunei Darussalam": "Brunei",
+    "Egypt, Arab Rep.": "Egypt",
+    "Hong Kong SAR, China": "Hong Kong",
+    "Iran, Islamic Rep.": "Iran",
+    "Korea, Rep.": "South Korea",
+    "Kyrgyz Republic": "Kyrgyzstan",
+    "Lao PDR": "Laos",
+    "Russian Federation": "Russia",
+    "Slovak Republic": "Slovakia",
+    "Syrian Arab Republic": "Syria",
+    "Turkiye": "Turkey",
+    "Venezuela, RB": "Venezuela",
+    "Viet Nam": "Vietnam",
+    "Yemen, Rep.": "Yemen",
+}
+
+
+def load_mapping(path=None, rubric=None):
+    """Built-in indicator mapping, extended or overridden by a JSON file of the same shape."""
+    mapping = dict(INDICATORS)
+    if path:
+        with open(path) as f:
+            mapping.update(json.load(f))
+    rubric = rubric or get_rubric()
+    unknown = sorted({m["metric"] for m in mapping.values()} - set(rubric.metric_defs))
+    if unknown:
+        raise ValueError(f"mapping targets unknown metrics: {', '.join(unknown)}")
+    return mapping
+
+
+def _header(path):
+    """(columns, byte offset of the first data line) of a World Bank CSV."""
+    with open(path, "rb") as f:
+        while True:
+            line = f.readline()
+            if not line:
+                raise ValueError(f"{path}: no 'Country Name' header line")
+            row = next(csv.reader([line.decode("utf-8-sig")]), [])
+            if row[:1] == ["Country Name"]:
+                return row, f.tell()
+
+
+def _tasks(paths, chunk_bytes=CHUNK_BYTES):
+    for path in paths:
+        columns, start = _header(path)
+        size = os.path.getsize(path)
+        for lo in range(start, max(size, start + 1), chunk_bytes):
+            yield path, columns, start, lo, min(lo + chunk_bytes, size)
+
+
+def _read_range(path, columns, data_start, start, end, mapping):
+    """(country, year, metric, value) for mapped indicators on the lines that start in [start, end).
+
+    Returns (rows, skipped): a cell that is not a finite number (e.g. the
+    World Bank's "..") is skipped and counted rather than failing the range.
+    """
+    idx = {name: i for i, name in enumerate(columns)}
+    years = [(i, name) for i, name in enumerate(columns) if name.strip().isdigit()]
+    out, skipped = [], 0
+    with open(path, "rb") as f:
+        f.seek(start)
+        if start > data_start:
+            # The line straddling ``start`` belongs to the previous range.
+            f.seek(start - 1)
+            f.readline()
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            row = next(csv.reader([line.decode("utf-8")]), None)
+            if not row or len(row) < len(columns) - 1:
+                continue
+            spec = mapping.get(row[idx["Indicator Code"]])
+            if spec is None or row[idx["Country Code"]] in AGGREGATES:
+                continue
+            country = NAME_ALIASES.get(row[idx["Country Name"]], row[idx["Country Name"]])
+            for i, year in years:
+                cell = row[i].strip() if i < len(row) else ""
+                if not cell:
+                    continue
+                try:
+                    value = float(cell)
+                except ValueError:
+                    value = math.nan
+                if not math.isfinite(value):
+                    skipped += 1
+                    continue
+                out.append((country, year, spec["metric"], value * spec.get("scale", 1.0)))
+    return out, skipped
+
+
+def read_indicators(paths, mapping, workers=1, chunk_bytes=CHUNK_BYTES):
+    """({country: {year: {metric: value}}}, skipped cells) from World Bank CSVs, parsed in byte ranges."""
+    tasks = list(_tasks(paths, chunk_bytes))
+    args = [(path, columns, data_start, lo, hi, mapping) for path, columns, data_start, lo, hi in tasks]
+    if workers > 1 and len(args) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = pool.map(_read_range, *zip(*args))
+            return _merge(parts)
+    return _merge(_read_range(*a) for a in args)
+
+
+def _merge(parts):
+    panel, skipped = {}, 0
+    for part, bad in parts:
+        for country, year, metric, value in part:
+            panel.setdefault(country, {}).setdefault(year, {})[metric] = value
+        skipped += bad
+    return panel, skipped
+
+
+def write_parquet(panel, path, metrics):
+    """Panel as Parquet: dictionary-encoded country, int16 year, one float64 column per metric."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    keys = sorted((c, y) for c, years in panel.items() for y in years)
+    columns = {
+        "country": pa.array([c for c, _ in keys]).dictionary_encode(),
+        "year": pa.array([int(y) for _, y in keys], type=pa.int16()),
+    }
+    for metric in metrics:
+        columns[metric] = pa.array([panel[c][y].get(metric) for c, y in keys], type=pa.float64())
+    pq.write_table(pa.table(columns), path, compression="zstd")
+    return len(keys)
+
+
+def latest_values(years):
+    """Most recent value of every metric across a country's years."""
+    record = {}
+    for year in sorted(years):
+        record.update(years[year])
+    return record
+
+
+def carried_forward(years):
+    """{year: record} where each year carries the last known value of every metric."""
+    out, record = {}, {}
+    for year in sorted(years):
+        record = {**record, **years[year]}
+        out[year] = record
+    return out
+
+
+def load_into_store(store, panel, mode="latest", version=None):
+    """Write the panel into ``store`` over each country's latest record; returns records written."""
+    if mode == "latest":
+        if version is None:
+            raise ValueError("loading the latest values needs a version")
+        records = {c: {**store.get(c), **latest_values(years)} for c, years in panel.items()}
+        store.put_many(records, version)
+        return len(records)
+    by_year, written = {}, 0
+    for country, years in panel.items():
+        base = store.get(country)
+        for year, record in carried_forward(years).items():
+            by_year.setdefault(year, {})[country] = {**base, **record}
+    for year, records in by_year.items():
+        store.put_many(records, year)
+        written += len(records)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest World Bank-style indicator CSVs.")
+    parser.add_argument("csv", nargs="+")
+    parser.add_argument("--map", help="JSON {indicator code: {metric, scale}} added to the built-in mapping")
+    parser.add_argument("--out", default="indicators.parquet", help="Parquet panel to write")
+    parser.add_argument("--load", choices=["latest", "history"],
+                        help="also write into the country store: one --version, or one version per year")
+    parser.add_argument("--version", help="store version for --load latest, e.g. 2025Q4")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite country database")
+    parser.add_argument("--workers", type=int, default=1, help="process pool size (0 = all cores)")
+    args = parser.parse_args(argv)
+    if args.load == "latest" and not args.version:
+        parser.error("--load latest needs --version")
+
+    rubric = get_rubric()
+    mapping = load_mapping(args.map, rubric)
+    panel, skipped = read_indicators(args.csv, mapping, args.workers or os.cpu_count() or 1)
+    metrics = sorted({m["metric"] for m in mapping.values()})
+    rows = write_parquet(panel, args.out, metrics)
+    print(f"{args.out}: {rows} country-years, {len(panel)} countries, {len(metrics)} metrics")
+    if skipped:
+        print(f"{skipped} non-numeric cell(s) skipped", file=sys.stderr)
+    if args.load:
+        store = SQLiteStore(args.db)
+        print(f"loaded {load_into_store(store, panel, args.load, args.version)} country records", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
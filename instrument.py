@@ -0,0 +1,203 @@
+"""Stage timings per rerun, exported as Prometheus text, plus opt-in profiling.
+
+Every timed stage is observed into a process-wide histogram, so the
+metrics describe all sessions served by the process; each session also
+keeps the timings of its own last rerun for the debug panel.
+
+Set ``METRICS_PORT`` to serve ``/metrics`` from the Streamlit process and/or
+``METRICS_FILE`` to rewrite a Prometheus text file after every rerun (the
+node_exporter textfile-collector format).
+"""
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cache
+import session
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+METRIC_NAME = "launch_scoring_stage_seconds"
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class StageMetrics:
+    """Thread-safe histogram of stage durations, keyed by stage name."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._stages = {}  # stage -> [count per bucket..., +Inf count, sum]
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            counts = self._stages.setdefault(stage, [0] * (len(self.buckets) + 1) + [0.0])
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    counts[i] += 1
+            counts[-2] += 1
+            counts[-1] += seconds
+
+    def summary(self):
+        """{stage: (count, mean seconds)}."""
+        with self._lock:
+            return {stage: (c[-2], c[-1] / c[-2]) for stage, c in self._stages.items() if c[-2]}
+
+    def prometheus_text(self, name=METRIC_NAME):
+        with self._lock:
+            stages = {stage: list(c) for stage, c in self._stages.items()}
+        lines = [f"# HELP {name} Time spent per app stage.", f"# TYPE {name} histogram"]
+        for stage, counts in sorted(stages.items()):
+            label = f'stage="{_label(stage)}"'
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f'{name}_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{label},le="+Inf"}} {counts[-2]}')
+            lines.append(f"{name}_count{{{label}}} {counts[-2]}")
+            lines.append(f"{name}_sum{{{label}}} {counts[-1]:.6f}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = StageMetrics()
+
+
+def metrics_text():
+    """Stage timings, result-cache counters and session-state sizes, in Prometheus text format."""
+    return METRICS.prometheus_text() + cache.prometheus_text() + session.prometheus_text()
+
+
+def write_textfile(path):
+    """Atomically replace ``path`` with the current metrics."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(metrics_text())
+    os.replace(tmp, path)
+
+
+def timed(stage, fn, metrics=METRICS):
+    """``fn`` wrapped to observe its duration, for work that runs outside a rerun (e.g. downloads)."""
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            metrics.observe(stage, time.perf_counter() - start)
+    return wrapper
+
+
+class RerunTimer:
+    """Timings of one rerun; every stage is also observed into ``metrics``."""
+
+    def __init__(self, metrics=METRICS):
+        self.metrics = metrics
+        self.started = time.perf_counter()
+        self.timings = {}
+        self.total = None
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed
+            self.metrics.observe(name, elapsed)
+
+    def finish(self):
+        if self.total is None:
+            self.total = time.perf_counter() - self.started
+            self.metrics.observe("rerun", self.total)
+        return self.total
+
+
+_profilers_lock = threading.Lock()
+_profilers = set()  # SessionProfilers currently enabled
+
+
+class SessionProfiler:
+    """cProfile capture accumulated across the reruns of one session."""
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.reruns = 0
+        self.error = None
+        self.thread = None  # script thread of the rerun being profiled
+
+    def start(self):
+        self.stop()  # left running by a rerun that ended early
+        try:
+            self.profile.enable()
+        except ValueError as exc:  # another profiler is already active in this process
+            self.error = str(exc)
+            return False
+        self.error = None
+        self.thread = threading.current_thread()
+        with _profilers_lock:
+            _profilers.add(self)
+        return True
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.profile.disable()
+        self.thread = None
+        self.reruns += 1
+        with _profilers_lock:
+            _profilers.discard(self)
+
+    def report(self, limit=25, sort="cumulative"):
+        out = io.StringIO()
+        try:
+            pstats.Stats(self.profile, stream=out).sort_stats(sort).print_stats(limit)
+        except TypeError:  # nothing captured yet
+            return ""
+        return out.getvalue()
+
+    def dump(self):
+        """Raw pstats data, loadable with pstats / snakeviz."""
+        self.profile.create_stats()
+        return marshal.dumps(self.profile.stats)
+
+
+def stop_leftover_profilers():
+    """Stop profilers whose rerun ended without ``stop()`` (an exception, or st.stop / st.rerun first).
+
+    Call at the start of every rerun; returns how many were stopped.
+    """
+    with _profilers_lock:
+        leftovers = [p for p in _profilers if not p.thread.is_alive()]
+    for p in leftovers:
+        p.stop()
+    return len(leftovers)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        data = metrics_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_metrics(port, host="127.0.0.1"):
+    """Serve /metrics from a daemon thread; returns the server."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics").start()
+    return server
@@ -0,0 +1,241 @@
+"""Pareto frontier, dominance counts and nearest alternatives over category scores.
+
+One weighted overall score hides trade-offs between categories (e.g.
+Market Size against Regulatory Landscape). A country or scenario is
+Pareto-optimal when no other scores at least as high in every chosen
+category and higher in one.
+
+The skyline is a sort-filter pass: rows are sorted by descending score
+sum (ties lexicographically), so a row can only be dominated by rows
+before it, and only by rows already on the skyline. Repeated score rows
+are compared once. Distinct rows are checked in blocks, first against a
+few skyline rows that dominate the most, then against the whole skyline
+found so far, one vectorized comparison per category, so the cost grows
+with rows x skyline size rather than rows squared (about a second for
+300k scenarios). Dominance counts have no such shortcut: every row is
+compared with every other, so they are only computed up to
+``COUNT_LIMIT`` rows (about 0.1 s) and left out of the table above it.
+
+    python pareto.py                        # every stored country
+    python pareto.py --scenarios --nearest Singapore -k 5
+"""
+import argparse
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from compare import score_all
+from countries import get_store
+from rubric import get_rubric
+from scenarios import ScenarioStore, score_scenarios
+
+BLOCK = 1024
+COUNT_LIMIT = 2_000
+PIVOTS = 32
+
+_lock = threading.Lock()
+_cache = OrderedDict()  # (rubric digest, store fingerprint, scenarios fingerprint, categories) -> Frontier
+
+
+def _dominated(points, by):
+    """Rows of ``points`` dominated by some row of ``by``."""
+    out = np.zeros(len(points), dtype=bool)
+    for start in range(0, len(by), 4 * BLOCK):
+        S = by[start:start + 4 * BLOCK]
+        ge = S[None, :, 0] >= points[:, None, 0]
+        gt = S[None, :, 0] > points[:, None, 0]
+        for k in range(1, points.shape[1]):
+            ge &= S[None, :, k] >= points[:, None, k]
+            gt |= S[None, :, k] > points[:, None, k]
+        out |= (ge & gt).any(axis=1)
+    return out
+
+
+def skyline(points, block=BLOCK):
+    """Sorted indices of the Pareto-optimal rows of ``points`` (higher is better in every column)."""
+    P = np.asarray(points, dtype=float)
+    if len(P) == 0:
+        return np.empty(0, dtype=np.intp)
+    keys = [-P[:, k] for k in range(P.shape[1] - 1, -1, -1)] + [-P.sum(axis=1)]
+    order = np.lexsort(keys)
+    # Scores repeat a lot; equal rows are adjacent once sorted and share one fate.
+    S = P[order]
+    group = np.concatenate([[0], np.cumsum((S[1:] != S[:-1]).any(axis=1))])
+    U = S[np.flatnonzero(np.diff(group, prepend=-1))]
+    low = U.min(axis=0)
+    sky = np.empty((0, U.shape[1]))
+    pivots = sky
+    found = []
+    for start in range(0, len(U), block):
+        idx = np.arange(start, min(start + block, len(U)))
+        B = U[idx]
+        if len(sky):
+            # A few skyline rows with the largest dominated volume weed out most of a block cheaply.
+            keep = ~_dominated(B, pivots)
+            idx, B = idx[keep], B[keep]
+            keep = ~_dominated(B, sky)
+            idx, B = idx[keep], B[keep]
+        # Within the block only earlier rows can dominate; any dominator will do.
+        keep = ~_dominated(B, B)
+        if keep.any():
+            sky = np.vstack([sky, B[keep]])
+            found.append(idx[keep])
+            volume = np.prod(sky - low + 1e-9, axis=1)
+            pivots = sky[np.argsort(-volume, kind="stable")[:PIVOTS]]
+    optimal = np.zeros(len(U), dtype=bool)
+    optimal[np.concatenate(found)] = True
+    return np.sort(order[optimal[group]])
+
+
+def dominance_counts(points, rows=None):
+    """(rows each row dominates, rows dominating each row) for ``rows`` (default all) against every row.
+
+    Every requested row is compared with every row, so this is quadratic
+    when ``rows`` covers everything; ``Frontier`` only calls it up to
+    ``COUNT_LIMIT`` rows.
+    """
+    P = np.asarray(points, dtype=float)
+    rows = np.arange(len(P)) if rows is None else np.asarray(rows, dtype=np.intp)
+    dominates = np.zeros(len(rows), dtype=np.int64)
+    dominated_by = np.zeros(len(rows), dtype=np.int64)
+    for start in range(0, len(rows), BLOCK):
+        R = P[rows[start:start + BLOCK]]
+        for other in range(0, len(P), 4 * BLOCK):
+            O = P[other:other + 4 * BLOCK]
+            ge = R[:, None, 0] >= O[None, :, 0]
+            le = R[:, None, 0] <= O[None, :, 0]
+            for k in range(1, P.shape[1]):
+                ge &= R[:, None, k] >= O[None, :, k]
+                le &= R[:, None, k] <= O[None, :, k]
+            equal = ge & le
+            dominates[start:start + BLOCK] += (ge & ~equal).sum(axis=1)
+            dominated_by[start:start + BLOCK] += (le & ~equal).sum(axis=1)
+    return dominates, dominated_by
+
+
+def nearest(points, row, k=5, weights=None):
+    """(indices, distances) of the ``k`` rows closest to ``row``, excluding it.
+
+    Distance is Euclidean over the columns, each squared difference scaled
+    by ``weights`` (e.g. the category weights) when given.
+    """
+    P = np.asarray(points, dtype=float)
+    w = np.ones(P.shape[1]) if weights is None else np.asarray(weights, dtype=float)
+    d = np.sqrt(((P - P[row]) ** 2) @ w)
+    d[row] = np.inf
+    k = min(k, len(P) - 1)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp), np.empty(0)
+    idx = np.argpartition(d, k - 1)[:k]
+    idx = idx[np.argsort(d[idx], kind="stable")]
+    return idx, d[idx]
+
+
+class Frontier:
+    """Category scores of countries (and optionally their saved scenarios) with their Pareto analysis."""
+
+    def __init__(self, names, cat_scores, overall, categories, weights, columns=None):
+        self.names = list(names)  # (country, scenario or None)
+        self.categories = list(categories)
+        self.cat_scores = np.asarray(cat_scores, dtype=float)
+        self.overall = np.asarray(overall, dtype=float)
+        self.weights = np.asarray(weights, dtype=float)
+        self.columns = list(range(len(self.categories))) if columns is None else list(columns)
+        points = self.cat_scores[:, self.columns]
+        self.optimal = np.zeros(len(self.names), dtype=bool)
+        self.optimal[skyline(points)] = True
+        # Counts are quadratic in the rows: all rows get them or none do.
+        self.counted = len(points) <= COUNT_LIMIT
+        self.dominates, self.dominated_by = dominance_counts(points) if self.counted else (None, None)
+
+    def table(self):
+        """One row per country / scenario, Pareto-optimal first, then by overall score.
+
+        "Dominates" / "Dominated by" are only present when ``counted``.
+        """
+        rows = []
+        for i in np.lexsort((-self.overall, ~self.optimal)):
+            country, scenario = self.names[i]
+            row = {"Country": country, "Scenario": scenario or "(base)", "Pareto-optimal": bool(self.optimal[i])}
+            if self.counted:
+                row.update({"Dominates": int(self.dominates[i]), "Dominated by": int(self.dominated_by[i])})
+            row["Overall"] = round(float(self.overall[i]), 3)
+            row.update({cat: round(float(v), 3) for cat, v in zip(self.categories, self.cat_scores[i])})
+            rows.append(row)
+        return rows
+
+    def nearest(self, name, k=5):
+        """Closest alternatives to ``name`` ((country, scenario)) over the chosen categories."""
+        i = self.names.index(name)
+        cols = self.columns
+        idx, dist = nearest(self.cat_scores[:, cols], i, k, self.weights[cols])
+        return [
+            {"Country": self.names[j][0], "Scenario": self.names[j][1] or "(base)", "Distance": round(float(d), 3),
+             "Overall": round(float(self.overall[j]), 3), "Pareto-optimal": bool(self.optimal[j])}
+            for j, d in zip(idx, dist)
+        ]
+
+
+def build_frontier(store, rubric=None, scenarios=None, categories=None):
+    """Frontier over every stored country, plus each country's saved scenarios when ``scenarios`` is given.
+
+    Cached until the rubric, the stored data or the saved scenarios change.
+    """
+    rubric = rubric or get_rubric()
+    key = (rubric.digest, store.fingerprint(), scenarios.fingerprint() if scenarios is not None else None,
+           tuple(categories) if categories is not None else None)
+    frontier = _cache.get(key)
+    if frontier is None:
+        frontier = _build(store, rubric, scenarios, categories)
+        with _lock:
+            _cache[key] = frontier
+            while len(_cache) > 8:
+                _cache.popitem(last=False)
+    return frontier
+
+
+def _build(store, rubric, scenarios, categories):
+    arrays = rubric.arrays
+    matrix = score_all(store, rubric)
+    names = [(c, None) for c in matrix.countries]
+    cat_scores, overall = [matrix.cat_scores], [matrix.overall]
+    if scenarios is not None:
+        records = matrix.inputs
+        for country, saved in scenarios.all_overrides().items():
+            if country not in records or not saved:
+                continue
+            scenario_names, _, cats, total = score_scenarios(records[country], saved, rubric)
+            names += [(country, n) for n in scenario_names[1:]]
+            cat_scores.append(cats[1:])
+            overall.append(total[1:])
+    columns = None if categories is None else [arrays.categories.index(c) for c in categories]
+    return Frontier(names, np.vstack(cat_scores), np.concatenate(overall), arrays.categories,
+                    arrays.category_weights, columns)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pareto-optimal countries and scenarios over category scores.")
+    parser.add_argument("--scenarios", action="store_true", help="include every saved scenario")
+    parser.add_argument("--category", action="append", help="category to compare on (repeatable; default all)")
+    parser.add_argument("--nearest", metavar="COUNTRY", help="list the closest alternatives to a country")
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    frontier = build_frontier(get_store(), scenarios=ScenarioStore() if args.scenarios else None,
+                              categories=args.category)
+    if args.nearest and (args.nearest, None) not in frontier.names:
+        parser.error(f"--nearest: unknown country {args.nearest!r}")
+    print(f"{int(frontier.optimal.sum())} of {len(frontier.names)} Pareto-optimal")
+    for row in frontier.table():
+        if row["Pareto-optimal"]:
+            count = f"  dominates {row['Dominates']}" if frontier.counted else ""
+            print(f"  {row['Country'][:30]:<32}{row['Scenario'][:20]:<22}{row['Overall']:>7.3f}{count}")
+    if args.nearest:
+        print(f"closest to {args.nearest}:")
+        for row in frontier.nearest((args.nearest, None), args.k):
+            print(f"  {row['Country'][:30]:<32}{row['Scenario'][:20]:<22}{row['Distance']:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
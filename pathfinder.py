@@ -0,0 +1,215 @@
+"""Cheapest set of input improvements that lifts a country into a higher tier.
+
+A step moves one metric one level up its score table: the next answer in
+``options`` or across the next numeric break. Each step costs 1 by
+default, or the metric's entry in ``costs``. Because the overall score is
+linear in the metric scores, k steps on metric j are worth
+``effective weight_j x (score after k steps - current score)`` whatever
+else changes. These marginal contributions are precomputed per country,
+and a depth-first branch and bound picks at most one step count per
+metric. Metrics are taken best gain-per-cost first, and a branch is
+pruned when the remaining metrics cannot close the gap or when a
+fractional (ratio-greedy) relaxation of the rest cannot beat the
+cheapest plan found so far.
+
+    python pathfinder.py --country India
+    python pathfinder.py --all --tier "Strong candidate (Good)"
+"""
+import argparse
+import math
+
+import numpy as np
+
+from countries import get_store
+from rubric import get_rubric
+from scoring import NEUTRAL_SCORE, TIERS, readiness_label
+
+EPS = 1e-9
+
+
+def next_tier(overall):
+    """(cutoff, label) of the tier above ``overall``, or None at the top tier."""
+    above = [(cutoff, label) for cutoff, label, _ in TIERS if cutoff > overall + EPS]
+    return above[-1] if above else None
+
+
+def tier_cutoff(label):
+    for cutoff, name, _ in TIERS:
+        if name == label:
+            return cutoff
+    raise ValueError(f"unknown tier: {label!r}")
+
+
+def step_options(arrays, idx, eff_w, costs=None):
+    """Per metric column, [(cost, gain, steps)] for every step count that improves on fewer steps."""
+    costs = costs or {}
+    options = []
+    for col, (_, mkey) in enumerate(arrays.metrics):
+        table = arrays.column_scores[col]
+        current = idx[col]
+        if current < 0 or eff_w[col] <= 0:  # missing input: nothing to step from
+            options.append([])
+            continue
+        direction = 1 if table[-1] >= table[0] else -1
+        unit = costs.get(mkey, 1.0)
+        col_options, best = [], 0.0
+        for k in range(1, len(table)):
+            pos = current + direction * k
+            if not 0 <= pos < len(table):
+                break
+            gain = eff_w[col] * (table[pos] - table[current])
+            if gain > best + EPS:
+                col_options.append((unit * k, gain, k))
+                best = gain
+        options.append(col_options)
+    return options
+
+
+def branch_and_bound(options, gap):
+    """(cost, {column: steps}) of the cheapest choice with total gain >= gap, or None."""
+    if gap <= EPS:
+        return 0.0, {}
+    order = sorted(
+        (col for col, opts in enumerate(options) if opts),
+        key=lambda col: max(g / c for c, g, _ in options[col]),
+        reverse=True,
+    )
+    n = len(order)
+    max_gain = [max(g for _, g, _ in options[col]) for col in order]
+    ratio = [max(g / c for c, g, _ in options[col]) for col in order]
+    suffix_gain = [0.0] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        suffix_gain[i] = suffix_gain[i + 1] + max_gain[i]
+    if suffix_gain[0] < gap - EPS:
+        return None
+
+    best = [math.inf, None]
+    chosen = {}
+
+    def lower_bound(i, need):
+        # Metrics i.. in ratio order, each giving at most its largest gain at
+        # its best gain-per-cost ratio: no real choice can be cheaper.
+        cost = 0.0
+        for j in range(i, n):
+            take = min(need, max_gain[j])
+            cost += take / ratio[j]
+            need -= take
+            if need <= EPS:
+                break
+        return cost
+
+    def search(i, cost, need):
+        if need <= EPS:
+            if cost < best[0] - EPS:
+                best[0], best[1] = cost, dict(chosen)
+            return
+        if i == n or suffix_gain[i] < need - EPS:
+            return
+        if cost + lower_bound(i, need) >= best[0] - EPS:
+            return
+        col = order[i]
+        for c, g, k in sorted(options[col], key=lambda o: o[1], reverse=True):
+            chosen[col] = k
+            search(i + 1, cost + c, need - g)
+            del chosen[col]
+        search(i + 1, cost, need)
+
+    search(0, 0.0, gap)
+    return None if best[1] is None else (best[0], best[1])
+
+
+def _step_value(arrays, col, pos):
+    """Input that lands in score-table position ``pos`` of column ``col``."""
+    if arrays.is_select[col]:
+        return arrays.options[col][pos]
+    breaks = arrays.column_breaks[col]
+    if arrays.higher_better[col]:
+        return f"≥ {breaks[pos - 1]:g}"
+    return f"≤ {breaks[pos]:g}"
+
+
+def find_path(inputs, target=None, rubric=None, costs=None):
+    """Cheapest path for one input record to ``target`` (a tier label; default the next tier up).
+
+    Returns a dict with the current and reached scores, the total cost and
+    one entry per improved metric, or None when the target is out of reach.
+    """
+    rubric = rubric or get_rubric()
+    arrays = rubric.arrays
+    X = arrays.encode([inputs])
+    return _solve(arrays, X[0], arrays.index_matrix(X)[0], arrays.effective_weights(), target, costs)
+
+
+def _solve(arrays, x, idx, eff_w, target, costs):
+    scores = np.array([arrays.column_scores[c][i] if i >= 0 else NEUTRAL_SCORE for c, i in enumerate(idx)])
+    overall = float(scores @ eff_w)
+    if target is None:
+        tier = next_tier(overall)
+        if tier is None:
+            return {"overall": overall, "target": None, "cost": 0.0, "reached": overall, "steps": []}
+        cutoff, target = tier
+    else:
+        cutoff = tier_cutoff(target)
+    solution = branch_and_bound(step_options(arrays, idx, eff_w, costs), cutoff - overall)
+    if solution is None:
+        return None
+    cost, chosen = solution
+    steps, reached = [], overall
+    for col, k in sorted(chosen.items()):
+        table = arrays.column_scores[col]
+        pos = idx[col] + (1 if table[-1] >= table[0] else -1) * k
+        gain = float(eff_w[col] * (table[pos] - table[idx[col]]))
+        reached += gain
+        current = arrays.options[col][idx[col]] if arrays.is_select[col] else float(x[col])
+        steps.append({
+            "metric": arrays.metrics[col][1],
+            "label": arrays.labels[col],
+            "from": current,
+            "to": _step_value(arrays, col, pos),
+            "score": (float(table[idx[col]]), float(table[pos])),
+            "gain": gain,
+        })
+    steps.sort(key=lambda s: s["gain"], reverse=True)
+    return {"overall": overall, "target": target, "cost": cost, "reached": reached, "steps": steps}
+
+
+def find_paths(records, target=None, rubric=None, costs=None):
+    """find_path for {country: inputs}, encoding and indexing every country in one pass."""
+    rubric = rubric or get_rubric()
+    arrays = rubric.arrays
+    names = list(records)
+    X = arrays.encode([records[c] for c in names])
+    idx = arrays.index_matrix(X)
+    eff_w = arrays.effective_weights()
+    return {c: _solve(arrays, X[i], idx[i], eff_w, target, costs) for i, c in enumerate(names)}
+
+
+def format_path(country, path):
+    if path is None:
+        return f"{country}: target tier out of reach"
+    label, _ = readiness_label(path["overall"])
+    if path["target"] is None:
+        return f"{country}: {path['overall']:.2f} already in the top tier"
+    lines = [f"{country}: {path['overall']:.2f} ({label}) -> {path['reached']:.2f} {path['target']}, "
+             f"{len(path['steps'])} metrics, cost {path['cost']:g}"]
+    lines += [f"  {s['label']}: {s['from']} -> {s['to']} (score {s['score'][0]:g} -> {s['score'][1]:g}, "
+              f"+{s['gain']:.3f})" for s in path["steps"]]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cheapest input improvements to reach a higher readiness tier.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--country")
+    target.add_argument("--all", action="store_true", help="every country in the store")
+    parser.add_argument("--tier", help="target tier label (default: the next tier up)")
+    args = parser.parse_args(argv)
+
+    store = get_store()
+    records = store.get_all() if args.all else {args.country: store.get(args.country)}
+    for country, path in find_paths(records, args.tier).items():
+        print(format_path(country, path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Report tables and export files, built lazily and cached by input state.
+
+DataFrames and encoded files are cached per (rubric digest, input digest,
+artifact) in a process-wide cache shared by all sessions (on disk too when
+RESULT_CACHE_DIR is set), so reruns reuse them and nothing is encoded
+until a download is actually requested. Parquet and Arrow IPC use pyarrow;
+the Excel workbook needs openpyxl and is skipped when it is not installed.
+"""
+import importlib.util
+import io
+
+import pandas as pd
+
+from cache import ResultCache
+from columnar import ResultTable
+from scoring import input_digest
+
+FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Arrow IPC": ("arrow", "application/vnd.apache.arrow.file"),
+}
+EXCEL_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+REPORTS = ResultCache("reports", max_entries=128, persist=True)
+
+
+def excel_available():
+    return importlib.util.find_spec("openpyxl") is not None
+
+
+def frames(result, rubric_digest):
+    """(metric-level, category-level) DataFrames for a ScoreResult."""
+    key = (rubric_digest, result.input_digest, "frames")
+    return REPORTS.get(key, lambda: (pd.DataFrame(result.rows()), pd.DataFrame(result.category_rows())))
+
+
+def encode(df, fmt):
+    if fmt == "csv":
+        return df.to_csv(index=False).encode("utf-8")
+    buf = io.BytesIO()
+    if fmt == "parquet":
+        # Mixed numeric/text inputs share one column; store it as text.
+        df.astype({c: str for c in df.columns if df[c].dtype == object}).to_parquet(buf, index=False)
+    elif fmt == "arrow":
+        import pyarrow as pa
+        table = pa.Table.from_pandas(df.astype({c: str for c in df.columns if df[c].dtype == object}), preserve_index=False)
+        with pa.ipc.new_file(buf, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        raise ValueError(f"unknown export format: {fmt}")
+    return buf.getvalue()
+
+
+def export(result, rubric_digest, table, fmt):
+    """Encoded bytes of the "metrics" or "categories" table; cached."""
+    def build():
+        metrics_df, categories_df = frames(result, rubric_digest)
+        return encode(metrics_df if table == "metrics" else categories_df, fmt)
+    return REPORTS.get((rubric_digest, result.input_digest, table, fmt), build)
+
+
+def data_digest(records):
+    """Content hash of {country: inputs}; unlike ``store.fingerprint()`` it stays valid across restarts."""
+    return input_digest({country: input_digest(record) for country, record in records.items()})
+
+
+def workbook(store, rubric):
+    """Excel workbook with a leaderboard plus metric and category sheets for every stored country."""
+    from compare import score_all
+    matrix = score_all(store, rubric)
+
+    def build():
+        table = ResultTable.from_records(matrix.inputs, rubric)
+        buf = io.BytesIO()
+        with pd.ExcelWriter(buf, engine="openpyxl") as writer:
+            pd.DataFrame(matrix.leaderboard()).to_excel(writer, sheet_name="Leaderboard", index=False)
+            pd.DataFrame(table.metric_rows()).to_excel(writer, sheet_name="Metrics", index=False)
+            pd.DataFrame(table.category_rows()).to_excel(writer, sheet_name="Categories", index=False)
+        return buf.getvalue()
+    # Persisted to disk, so keyed on the data itself: a store fingerprint only means something in this process.
+    return REPORTS.get((rubric.digest, data_digest(matrix.inputs), "workbook"), build)
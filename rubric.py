@@ -0,0 +1,254 @@
+"""Validation, compilation and process-wide caching of the immutable rubric.
+
+``get_rubric()`` is cheap to call on every Streamlit rerun: it stats
+thresholds.json and only re-reads the file when its mtime/size changed,
+and only recompiles when the content hash changed. Editing the file is
+therefore picked up on the next rerun without restarting the server.
+
+A rubric is validated once when compiled, and every problem is reported
+together in one RubricError. The compiled rubric (including the engine
+arrays and per-metric scorers) is kept in memory per process. It is not
+persisted: compiling costs about as much as unpickling a saved copy.
+
+    python rubric.py [thresholds.json]     # validate and compile
+"""
+import hashlib
+import json
+import math
+import os
+import sys
+import threading
+from types import MappingProxyType
+
+from scoring import DEFAULT_SELECT, FALLBACK_OPTION, THRESHOLDS_PATH, compile_scorers
+
+WEIGHT_TOLERANCE = 1e-6
+DIRECTIONS = ("higher_better", "lower_better")
+
+_lock = threading.Lock()
+_cache = {}  # abspath -> Rubric
+
+
+class RubricError(ValueError):
+    """Every problem found in a rubric, reported together."""
+
+    def __init__(self, errors, source=None):
+        self.errors = list(errors)
+        self.source = source
+        head = f"{source}: " if source else ""
+        super().__init__(f"{head}{len(self.errors)} rubric error(s)\n" + "\n".join(f"  - {e}" for e in self.errors))
+
+
+def _freeze(obj):
+    if isinstance(obj, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_freeze(v) for v in obj)
+    return obj
+
+
+def _normalize(weights):
+    total = sum(weights.values())
+    return MappingProxyType({k: (w / total if total > 0 else 0.0) for k, w in weights.items()})
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _is_weight(value):
+    return _is_number(value) and value >= 0
+
+
+def _metric_errors(mdef):
+    if not isinstance(mdef, dict):
+        return ["must be an object"]
+    errors = []
+    if not _is_weight(mdef.get("weight")):
+        errors.append(f"weight must be a non-negative number, got {mdef.get('weight')!r}")
+    if not isinstance(mdef.get("reason"), str):
+        errors.append("'reason' must be a string")
+    if "label" in mdef and not isinstance(mdef["label"], str):
+        errors.append("'label' must be a string")
+
+    if mdef.get("custom"):
+        options = mdef.get("options", DEFAULT_SELECT)
+        if not isinstance(options, list) or not all(isinstance(o, str) for o in options):
+            return errors + ["'options' must be a list of strings"]
+        if len(options) <= FALLBACK_OPTION or len(options) > 5:
+            # Option i scores i + 1 and unknown answers fall back to option FALLBACK_OPTION.
+            errors.append(f"expected {FALLBACK_OPTION + 1} to 5 options, got {len(options)}")
+        if len(set(options)) != len(options):
+            errors.append(f"duplicate options in {options}")
+        if not isinstance(mdef.get("reverse_options", False), bool):
+            errors.append("'reverse_options' must be true or false")
+        return errors
+
+    if mdef.get("direction") not in DIRECTIONS:
+        errors.append(f"direction must be one of {', '.join(DIRECTIONS)}, got {mdef.get('direction')!r}")
+    breaks, scores = mdef.get("breaks"), mdef.get("scores")
+    if not isinstance(breaks, list) or not breaks or not all(_is_number(b) for b in breaks):
+        errors.append(f"'breaks' must be a non-empty list of numbers, got {breaks!r}")
+        breaks = None
+    elif any(a > b for a, b in zip(breaks, breaks[1:])):
+        errors.append(f"breaks must be in ascending order, got {breaks}")
+    if not isinstance(scores, list) or not all(_is_number(v) for v in scores):
+        errors.append(f"'scores' must be a list of numbers, got {scores!r}")
+    else:
+        if breaks is not None and len(scores) != len(breaks) + 1:
+            errors.append(f"expected {len(breaks) + 1} scores for {len(breaks)} breaks, got {len(scores)}")
+        if any(not 1 <= v <= 5 for v in scores):
+            errors.append(f"scores must be between 1 and 5, got {scores}")
+    return errors
+
+
+def validate(data):
+    """Every problem in a thresholds.json document, as a list of messages (empty if valid)."""
+    categories = data.get("categories") if isinstance(data, dict) else None
+    if not isinstance(categories, dict) or not categories:
+        return ["'categories' must be a non-empty object"]
+
+    errors, owners, labels = [], {}, {}
+    for cat, cdef in categories.items():
+        if not isinstance(cdef, dict):
+            errors.append(f"{cat}: must be an object")
+            continue
+        if not _is_weight(cdef.get("weight")):
+            errors.append(f"{cat}: weight must be a non-negative number, got {cdef.get('weight')!r}")
+        metrics = cdef.get("metrics")
+        if not isinstance(metrics, dict) or not metrics:
+            errors.append(f"{cat}: 'metrics' must be a non-empty object")
+            continue
+        for mkey, mdef in metrics.items():
+            errors += [f"{cat} / {mkey}: {e}" for e in _metric_errors(mdef)]
+            if mkey in owners:
+                errors.append(f"{cat} / {mkey}: metric key already used in {owners[mkey]}")
+            owners.setdefault(mkey, cat)
+            label = mdef.get("label", mkey) if isinstance(mdef, dict) else mkey
+            if isinstance(label, str) and labels.setdefault(label, mkey) != mkey:
+                errors.append(f"{cat} / {mkey}: label {label!r} already used by {labels[label]}")
+        weights = [m.get("weight") for m in metrics.values() if isinstance(m, dict)]
+        if len(weights) == len(metrics) and all(_is_weight(w) for w in weights):
+            if abs(sum(weights) - 1) > WEIGHT_TOLERANCE:
+                errors.append(f"{cat}: metric weights sum to {sum(weights):.6g}, expected 1")
+
+    weights = [c.get("weight") for c in categories.values() if isinstance(c, dict)]
+    if len(weights) == len(categories) and all(_is_weight(w) for w in weights):
+        if abs(sum(weights) - 1) > WEIGHT_TOLERANCE:
+            errors.append(f"category weights sum to {sum(weights):.6g}, expected 1")
+    return errors
+
+
+class Rubric:
+    """Read-only rubric with lookups precomputed at load time."""
+
+    def __init__(self, data, digest, stat=None):
+        errors = validate(data)
+        if errors:
+            raise RubricError(errors)
+        self.digest = digest
+        self.stat = stat
+        self.categories = _freeze(data["categories"])
+        self.category_weights = MappingProxyType({c: cdef["weight"] for c, cdef in self.categories.items()})
+        self.normalized_category_weights = _normalize(self.category_weights)
+
+        labels, option_index, metric_defs, normalized = {}, {}, {}, {}
+        for cat, cdef in self.categories.items():
+            weights = {}
+            for mkey, mdef in cdef["metrics"].items():
+                labels[mkey] = mdef.get("label", mkey)
+                metric_defs[mkey] = (cat, mdef)
+                weights[mkey] = mdef["weight"]
+                if mdef.get("custom"):
+                    options = mdef.get("options", DEFAULT_SELECT)
+                    option_index[mkey] = MappingProxyType({o: i for i, o in enumerate(options)})
+            normalized[cat] = _normalize(weights)
+
+        self.labels = MappingProxyType(labels)
+        self.label_keys = MappingProxyType({label: mkey for mkey, label in labels.items()})
+        self.option_index = MappingProxyType(option_index)
+        self.metric_defs = MappingProxyType(metric_defs)
+        self.normalized_metric_weights = MappingProxyType(normalized)
+        self.scorers = compile_scorers(self.categories)
+        self._arrays = None
+
+    @property
+    def arrays(self):
+        """NumPy form for batch scoring, built on first use (see engine.py)."""
+        if self._arrays is None:
+            from engine import CompiledRubric
+            self._arrays = CompiledRubric(self.categories)
+        return self._arrays
+
+    def __getitem__(self, cat):
+        return self.categories[cat]
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def compile_file(path, stat=None):
+    """Validated, compiled Rubric for a thresholds file; raises RubricError listing every problem."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    try:
+        data = json.loads(raw)
+    except ValueError as exc:
+        raise RubricError([f"invalid JSON: {exc}"], path) from None
+    try:
+        return Rubric(data, hashlib.sha256(raw).hexdigest(), stat)
+    except RubricError as exc:
+        raise RubricError(exc.errors, path) from None
+
+
+def _load(path, stat):
+    cached = _cache.get(path)
+    if cached is not None:
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        if cached.digest == digest:
+            # Touched but unchanged: keep the compiled object, remember the new stat.
+            cached.stat = stat
+            return cached
+    rubric = compile_file(path, stat)
+    _cache[path] = rubric
+    return rubric
+
+
+def get_rubric(path=THRESHOLDS_PATH):
+    """Return the compiled rubric, recompiling only if the file changed."""
+    path = os.path.abspath(path)
+    stat = _stat_key(path)
+    cached = _cache.get(path)
+    if cached is not None and cached.stat == stat:
+        return cached
+    with _lock:
+        return _load(path, stat)
+
+
+def reload_rubric(path=THRESHOLDS_PATH):
+    """Drop the cached rubric for ``path`` and load it again."""
+    path = os.path.abspath(path)
+    with _lock:
+        _cache.pop(path, None)
+        return _load(path, _stat_key(path))
+
+
+def main(argv=None):
+    paths = (argv if argv is not None else sys.argv[1:]) or [THRESHOLDS_PATH]
+    failed = False
+    for path in paths:
+        try:
+            rubric = compile_file(os.path.abspath(path))
+        except RubricError as exc:
+            print(exc, file=sys.stderr)
+            failed = True
+            continue
+        print(f"{path}: ok, {len(rubric.categories)} categories, {len(rubric.metric_defs)} metrics")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Named what-if scenarios stored as sparse overrides of a country's base inputs.
+
+Only metrics that differ from the base record are stored, so a scenario
+costs a few rows however many exist, and a data refresh of the base
+country flows through to every scenario built on it. Scenarios live in
+their own SQLite file so they persist across sessions and reloads.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from rubric import get_rubric
+
+SCENARIO_DB = os.environ.get(
+    "SCENARIO_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenarios.db")
+)
+
+
+def diff(base, inputs):
+    """Overrides needed to turn ``base`` into ``inputs``."""
+    return {k: v for k, v in inputs.items() if v is not None and base.get(k) != v}
+
+
+def materialize(base, overrides):
+    return {**base, **overrides}
+
+
+class ScenarioStore:
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS scenarios (
+            country TEXT NOT NULL,
+            name TEXT NOT NULL,
+            updated REAL NOT NULL,
+            PRIMARY KEY (country, name)
+        );
+        CREATE TABLE IF NOT EXISTS scenario_overrides (
+            country TEXT NOT NULL,
+            name TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            value,
+            PRIMARY KEY (country, name, metric)
+        );
+    """
+
+    def __init__(self, path=SCENARIO_DB):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(self.SCHEMA)
+        self._lock = threading.Lock()
+
+    def fingerprint(self):
+        """Changes whenever saved scenarios change; used as a cache key."""
+        st = os.stat(self.path)
+        return (self.path, st.st_mtime_ns, st.st_size, self._conn.total_changes)
+
+    def names(self, country):
+        with self._lock:
+            rows = self._conn.execute("SELECT name FROM scenarios WHERE country = ? ORDER BY name", (country,)).fetchall()
+        return [r[0] for r in rows]
+
+    def overrides(self, country, name=None):
+        """{metric: value} for one scenario, or {scenario: {metric: value}} for all of a country's."""
+        with self._lock:
+            if name is not None:
+                rows = self._conn.execute(
+                    "SELECT metric, value FROM scenario_overrides WHERE country = ? AND name = ?", (country, name)
+                ).fetchall()
+                return dict(rows)
+            rows = self._conn.execute(
+                "SELECT s.name, o.metric, o.value FROM scenarios s "
+                "LEFT JOIN scenario_overrides o ON o.country = s.country AND o.name = s.name "
+                "WHERE s.country = ? ORDER BY s.name", (country,)
+            ).fetchall()
+        out = {}
+        for name, metric, value in rows:
+            per = out.setdefault(name, {})
+            if metric is not None:
+                per[metric] = value
+        return out
+
+    def all_overrides(self):
+        """{country: {scenario: {metric: value}}} for every saved scenario."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT s.country, s.name, o.metric, o.value FROM scenarios s "
+                "LEFT JOIN scenario_overrides o ON o.country = s.country AND o.name = s.name "
+                "ORDER BY s.country, s.name"
+            ).fetchall()
+        out = {}
+        for country, name, metric, value in rows:
+            per = out.setdefault(country, {}).setdefault(name, {})
+            if metric is not None:
+                per[metric] = value
+        return out
+
+    def save(self, country, name, overrides):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO scenarios VALUES (?, ?, ?)", (country, name, time.time()))
+            self._conn.execute("DELETE FROM scenario_overrides WHERE country = ? AND name = ?", (country, name))
+            self._conn.executemany(
+                "INSERT INTO scenario_overrides VALUES (?, ?, ?, ?)",
+                [(country, name, k, v) for k, v in overrides.items()],
+            )
+
+    def delete(self, country, name):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM scenarios WHERE country = ? AND name = ?", (country, name))
+            self._conn.execute("DELETE FROM scenario_overrides WHERE country = ? AND name = ?", (country, name))
+
+
+def score_scenarios(base, scenarios, rubric=None):
+    """Score the base record and every scenario in one engine pass.
+
+    ``scenarios`` is {name: overrides}. The base row is encoded once and
+    copied; only overridden cells are re-encoded. Returns
+    (names, metric scores, category scores, overall) with the base first.
+    """
+    arrays = (rubric or get_rubric()).arrays
+    names = ["(base)"] + list(scenarios)
+    X = np.repeat(arrays.encode([base]), len(names), axis=0)
+    for i, overrides in enumerate(scenarios.values(), 1):
+        if overrides:
+            row = arrays.encode([overrides])[0]
+            cols = [arrays.key_columns[k] for k in overrides if k in arrays.key_columns]
+            X[i, cols] = row[cols]
+    scores = arrays.score_matrix(X)
+    cats = arrays.category_scores(scores)
+    return names, scores, cats, arrays.overall(cats)
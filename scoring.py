@@ -0,0 +1,352 @@
+"""Pure scoring logic for the launch readiness rubric.
+
+Nothing here imports Streamlit or pandas, so workers, tests and batch jobs
+can import it cheaply. ``app.py`` is a view over these functions.
+"""
+import hashlib
+import json
+import os
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+THRESHOLDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "thresholds.json")
+
+DEFAULT_SELECT = ["Very weak", "Weak", "Moderate", "Strong", "Excellent"]
+NEUTRAL_SCORE = 3
+FALLBACK_OPTION = 2
+
+
+def load_thresholds(path=THRESHOLDS_PATH):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def load_rubric(path=THRESHOLDS_PATH):
+    return load_thresholds(path)["categories"]
+
+
+def score_numeric(value, breaks, scores, direction):
+    if value is None or value != value:  # NaN is missing, as in engine.encode
+        return NEUTRAL_SCORE, "N/A → neutral 3"
+
+    if direction == "higher_better":
+        for b, s in zip(reversed(breaks), reversed(scores)):
+            if value >= b:
+                return s, f"{value} ≥ {b} → {s}"
+        return scores[0], f"{value} < {breaks[0]} → {scores[0]}"
+    elif direction == "lower_better":
+        for b, s in zip(breaks, scores):
+            if value <= b:
+                return s, f"{value} ≤ {b} → {s}"
+        return scores[-1], f"{value} > {breaks[-1]} → {scores[-1]}"
+
+
+def score_select(val, custom_options, reverse=False):
+    options = custom_options or DEFAULT_SELECT
+    try:
+        idx = options.index(val)
+    except ValueError:
+        idx = FALLBACK_OPTION
+    score = (5 - idx) if reverse else (idx + 1)
+    return score, f"{val} → {score}"
+
+
+def score_metric(mdef, val):
+    if mdef.get("custom"):
+        return score_select(val, mdef.get("options", DEFAULT_SELECT), mdef.get("reverse_options", False))
+    return score_numeric(val, mdef["breaks"], mdef["scores"], mdef["direction"])
+
+
+class MetricScorer:
+    """One metric compiled for repeated scoring.
+
+    ``score`` is a bisect over the breaks (or a dict lookup for qualitative
+    metrics) and never builds a string; ``why`` formats the same rationale
+    as score_numeric / score_select, only when asked for.
+    """
+
+    def __init__(self, mdef):
+        self.custom = bool(mdef.get("custom"))
+        if self.custom:
+            options = mdef.get("options", DEFAULT_SELECT) or DEFAULT_SELECT
+            reverse = mdef.get("reverse_options", False)
+            self.option_scores = {o: (5 - i) if reverse else (i + 1) for i, o in enumerate(options)}
+            self.fallback = (5 - FALLBACK_OPTION) if reverse else (FALLBACK_OPTION + 1)
+        else:
+            if mdef["direction"] not in ("higher_better", "lower_better"):
+                raise ValueError(f"unknown direction: {mdef['direction']!r}")
+            self.breaks = list(mdef["breaks"])
+            self.scores = list(mdef["scores"])
+            self.higher = mdef["direction"] == "higher_better"
+
+    def _index(self, value):
+        if self.higher:
+            return bisect_right(self.breaks, value)
+        return bisect_left(self.breaks, value)
+
+    def score(self, value):
+        if self.custom:
+            return self.option_scores.get(value, self.fallback)
+        if value is None or value != value:
+            return NEUTRAL_SCORE
+        return self.scores[self._index(value)]
+
+    def why(self, value):
+        if self.custom:
+            return f"{value} → {self.score(value)}"
+        if value is None or value != value:
+            return "N/A → neutral 3"
+        idx = self._index(value)
+        s = self.scores[idx]
+        if self.higher:
+            if idx > 0:
+                return f"{value} ≥ {self.breaks[idx - 1]} → {s}"
+            return f"{value} < {self.breaks[0]} → {s}"
+        if idx < len(self.breaks):
+            return f"{value} ≤ {self.breaks[idx]} → {s}"
+        return f"{value} > {self.breaks[-1]} → {s}"
+
+
+_compiled = OrderedDict()  # id(rubric) -> (rubric, {metric key: MetricScorer})
+
+
+def compile_scorers(rubric):
+    """{metric key: MetricScorer} for a rubric's categories mapping, cached per rubric object."""
+    entry = _compiled.get(id(rubric))
+    if entry is not None and entry[0] is rubric:
+        return entry[1]
+    scorers = {mkey: MetricScorer(mdef) for cdef in rubric.values() for mkey, mdef in cdef["metrics"].items()}
+    # Holding the rubric keeps its id from being reused while cached.
+    _compiled[id(rubric)] = (rubric, scorers)
+    if len(_compiled) > 8:
+        _compiled.popitem(last=False)
+    return scorers
+
+
+class MetricResult(dict):
+    """Per-metric result; the "why" rationale is formatted on first access."""
+
+    def __init__(self, scorer, **fields):
+        super().__init__(**fields)
+        self._scorer = scorer
+
+    def __missing__(self, key):
+        if key != "why":
+            raise KeyError(key)
+        why = self["why"] = self._scorer.why(self["input"])
+        return why
+
+
+def metric_result(mkey, mdef, val, scorer=None):
+    scorer = scorer or MetricScorer(mdef)
+    return MetricResult(
+        scorer,
+        label=mdef.get("label", mkey),
+        input=val,
+        score=scorer.score(val),
+        weight=mdef["weight"],
+        reason=mdef["reason"],
+    )
+
+
+def input_digest(inputs):
+    """Stable hash of an input state ({metric key: value})."""
+    payload = json.dumps(sorted(inputs.items()), default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def category_score(metrics):
+    """Weighted mean of a category's metric scores (weights normalized to sum to 1)."""
+    weighted, weight_sum = 0.0, 0.0
+    for m in metrics.values():
+        weighted += m["score"] * m["weight"]
+        weight_sum += m["weight"]
+    return weighted / weight_sum if weight_sum > 0 else 0
+
+
+def score_category(cdef, inputs, scorers=None):
+    """Score every metric of one category; returns (category score, metric breakdown)."""
+    scorers = scorers or {}
+    metrics = {
+        mkey: metric_result(mkey, mdef, inputs.get(mkey), scorers.get(mkey))
+        for mkey, mdef in cdef["metrics"].items()
+    }
+    return category_score(metrics), metrics
+
+
+def overall_score(rubric, cat_scores):
+    return sum([cat_scores[c] * rubric[c]["weight"] for c in rubric.keys()])
+
+
+class ScoreResult:
+    """Scores for one input state, shared by the readiness card, narrative and reports.
+
+    Built once per input state; report rows are derived on first use.
+    """
+
+    def __init__(self, rubric, metrics, cat_scores=None):
+        self.rubric = rubric
+        self.metrics = {cat: dict(metrics[cat]) for cat in rubric}
+        if cat_scores is None:
+            cat_scores = {cat: category_score(self.metrics[cat]) for cat in rubric}
+        self.cat_scores = dict(cat_scores)
+        self.overall = overall_score(rubric, self.cat_scores)
+        self.label, self.color = readiness_label(self.overall)
+        self._rows = None
+        self._category_rows = None
+        self._input_digest = None
+
+    @property
+    def inputs(self):
+        return {mkey: m["input"] for cat in self.rubric for mkey, m in self.metrics[cat].items()}
+
+    @property
+    def input_digest(self):
+        if self._input_digest is None:
+            self._input_digest = input_digest(self.inputs)
+        return self._input_digest
+
+    @property
+    def cat_breakdown(self):
+        return {
+            cat: {"weight": cdef["weight"], "score": round(self.cat_scores[cat], 3), "metrics": self.metrics[cat]}
+            for cat, cdef in self.rubric.items()
+        }
+
+    def narrative(self, selected_country):
+        return narrative(selected_country, self.cat_scores, self.overall)
+
+    def rows(self):
+        """Metric-level report rows."""
+        if self._rows is None:
+            self._rows = [
+                {
+                    "Category": cat,
+                    "Metric": m["label"],
+                    "Input": m["input"] if m["input"] is not None else "N/A",
+                    "Score": m["score"],
+                    "Sub-weight": m["weight"],
+                    "Weighted (metric)": round(m["score"] * m["weight"], 3),
+                    "Rationale": m["why"]
+                }
+                for cat in self.rubric for m in self.metrics[cat].values()
+            ]
+        return self._rows
+
+    def category_rows(self):
+        """Category-level report rows."""
+        if self._category_rows is None:
+            self._category_rows = [
+                {
+                    "Category": cat,
+                    "Category weight": cdef["weight"],
+                    "Category score (weighted sub-metrics)": round(self.cat_scores[cat], 3),
+                    "Contribution to overall": round(self.cat_scores[cat] * cdef["weight"], 3)
+                }
+                for cat, cdef in self.rubric.items()
+            ]
+        return self._category_rows
+
+
+def score_rubric(rubric, inputs):
+    """Score a full set of inputs in one pass."""
+    scorers = compile_scorers(rubric)
+    metrics = {cat: score_category(cdef, inputs, scorers)[1] for cat, cdef in rubric.items()}
+    return ScoreResult(rubric, metrics)
+
+
+def score_only(rubric, inputs):
+    """(category scores, overall) without building per-metric results or rationales.
+
+    The fast path for optimizer and search loops.
+    """
+    scorers = compile_scorers(rubric)
+    cat_scores = {}
+    for cat, cdef in rubric.items():
+        weighted, weight_sum = 0.0, 0.0
+        for mkey, mdef in cdef["metrics"].items():
+            weighted += scorers[mkey].score(inputs.get(mkey)) * mdef["weight"]
+            weight_sum += mdef["weight"]
+        cat_scores[cat] = weighted / weight_sum if weight_sum > 0 else 0
+    return cat_scores, overall_score(rubric, cat_scores)
+
+
+class ScoringState:
+    """Dependency-tracked scores for one set of inputs.
+
+    ``set`` rescores a metric only when its input changed and marks its
+    category dirty; category scores are recomputed lazily, only for dirty
+    categories, and ``result()`` is memoized until an input changes.
+    """
+
+    def __init__(self, rubric):
+        self.rubric = rubric
+        self.scorers = compile_scorers(rubric)
+        self.inputs = {}
+        self.metrics = {cat: {} for cat in rubric}
+        self._totals = {}
+        self._dirty = set(rubric)
+        self._result = None
+
+    def set(self, cat, mkey, val):
+        """Record an input; returns True if the metric had to be rescored."""
+        metrics = self.metrics[cat]
+        if mkey in metrics and self.inputs.get(mkey) == val:
+            return False
+        self.inputs[mkey] = val
+        metrics[mkey] = metric_result(mkey, self.rubric[cat]["metrics"][mkey], val, self.scorers[mkey])
+        self._dirty.add(cat)
+        self._result = None
+        return True
+
+    def update(self, inputs):
+        for cat, cdef in self.rubric.items():
+            for mkey in cdef["metrics"]:
+                self.set(cat, mkey, inputs.get(mkey))
+
+    def category_total(self, cat):
+        if cat in self._dirty:
+            self._totals[cat] = category_score(self.metrics[cat])
+            self._dirty.discard(cat)
+        return self._totals[cat]
+
+    def result(self):
+        if self._result is None:
+            cat_scores = {cat: self.category_total(cat) for cat in self.rubric}
+            self._result = ScoreResult(self.rubric, self.metrics, cat_scores)
+        return self._result
+
+
+def report_rows(rubric, inputs):
+    """Metric- and category-level report rows as exported by the CSV reports."""
+    result = score_rubric(rubric, inputs)
+    return result.rows(), result.category_rows(), result.overall
+
+
+# (minimum overall score, label, color), best tier first
+TIERS = [
+    (4.5, "Launch-ready (Excellent)", "#10b981"),
+    (3.8, "Strong candidate (Good)", "#3b82f6"),
+    (3.0, "Conditional (Needs fixes)", "#f59e0b"),
+    (float("-inf"), "High risk (Major issues)", "#ef4444"),
+]
+
+
+def readiness_label(score):
+    for cutoff, label, color in TIERS:
+        if score >= cutoff:
+            return label, color
+    return TIERS[-1][1], TIERS[-1][2]
+
+
+def narrative(selected_country, category_scores, overall):
+    sorted_cats = sorted(category_scores.items(), key=lambda x: x[1], reverse=True)
+    top3, bot3 = sorted_cats[:3], sorted_cats[-3:]
+    label, _ = readiness_label(overall)
+    lines = [f"**Market Assessment: {selected_country}**", "", f"Launch Readiness: {overall:.2f}/5 → **{label}**", ""]
+    lines.append("**Top-scoring categories:**")
+    lines += [f"- {c}: {v:.2f}" for c, v in top3]
+    lines.append("")
+    lines.append("**Lowest-scoring categories:**")
+    lines += [f"- {c}: {v:.2f}" for c, v in bot3]
+    return "\n".join(lines)
@@ -0,0 +1,200 @@
+"""Monte Carlo sensitivity of country scores to weights and numeric inputs.
+
+Each sample draws category weights and, per category, metric weights from
+Dirichlet distributions centred on thresholds.json (``concentration``
+controls the spread), and multiplies every numeric input by lognormal
+noise (``input_noise`` is the relative standard deviation). Samples are
+scored in batches with the vectorized engine, optionally across a
+process pool.
+
+    python sensitivity.py --samples 100000 --workers 8
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from countries import get_store
+from rubric import get_rubric
+from scoring import THRESHOLDS_PATH
+
+# Elements (samples x countries x numeric metrics) scored per batch; bounds memory.
+BATCH_ELEMENTS = 4_000_000
+
+
+def _dirichlet(rng, weights, concentration, n):
+    alpha = np.maximum(np.asarray(weights, dtype=float), 1e-6) * concentration
+    return rng.dirichlet(alpha, size=n)
+
+
+def sample_weights(arrays, rng, n, concentration=200.0, category_weights=None, metric_weights=None):
+    """Draw (n, categories) category weights and (n, metrics) metric weights.
+
+    Samples are centred on the rubric's weights unless other centres are given.
+    """
+    cw = arrays.category_weights if category_weights is None else np.asarray(category_weights, dtype=float)
+    mw = arrays.metric_weights if metric_weights is None else np.asarray(metric_weights, dtype=float)
+    cat_w = _dirichlet(rng, cw, concentration, n) * cw.sum()
+    metric_w = np.empty((n, len(arrays.metrics)))
+    for k in range(len(arrays.categories)):
+        cols = np.flatnonzero(arrays.cat_index == k)
+        base = mw[cols]
+        metric_w[:, cols] = _dirichlet(rng, base, concentration, n) * base.sum()
+    return cat_w, metric_w
+
+
+def _run_chunk(X, n, seed, concentration, input_noise, thresholds_path):
+    arrays = get_rubric(thresholds_path).arrays
+    rng = np.random.default_rng(seed)
+    num_cols = np.flatnonzero(~arrays.is_select)
+    n_countries = len(X)
+
+    cat_w, metric_w = sample_weights(arrays, rng, n, concentration)
+    if input_noise > 0:
+        noise = np.exp(rng.normal(0.0, input_noise, size=(n, len(num_cols))))
+    else:
+        noise = np.ones((n, len(num_cols)))
+
+    # overall[s, c] = sum_m score[s, c, m] * eff_w[s, m]: both weight levels fold
+    # into one effective weight per metric.
+    eff_w = arrays.effective_weights(metric_w, cat_w)
+    base_scores = arrays.score_matrix(X)
+    if input_noise <= 0:
+        return np.hstack([cat_w, metric_w, noise]), (eff_w @ base_scores.T).astype(np.float32)
+
+    # Only numeric inputs are perturbed: qualitative scores are fixed and
+    # contribute through a single matmul; numeric columns are rescored per sample.
+    sel_cols = np.flatnonzero(arrays.is_select)
+    overall = (eff_w[:, sel_cols] @ base_scores[:, sel_cols].T).astype(np.float32)
+    batch = max(1, BATCH_ELEMENTS // max(1, n_countries * len(num_cols)))
+    for start in range(0, n, batch):
+        stop = min(n, start + batch)
+        Xs = X[None, :, num_cols] * noise[start:stop, None, :]
+        scores = arrays.score_matrix(Xs, num_cols)
+        overall[start:stop] += np.einsum("scm,sm->sc", scores, eff_w[start:stop, num_cols])
+
+    return np.hstack([cat_w, metric_w, noise]), overall
+
+
+def _first_order(params, Y, bins=20, chunk=10_000):
+    """Correlation-ratio estimate of first-order Sobol indices, averaged over countries.
+
+    For each parameter, samples are split into ``bins`` equal-count bins by
+    rank and Var(E[Y | bin]) / Var(Y) is computed per country. Bin sums for
+    all parameters come from one one-hot matmul per chunk of samples.
+    """
+    n, n_params = params.shape
+    bins = max(2, min(bins, n // 10 or 1))
+    ranks = params.argsort(axis=0, kind="stable").argsort(axis=0, kind="stable")
+    bin_of = ranks * bins // n + np.arange(n_params) * bins   # (samples, params) -> column in one-hot
+    counts = np.bincount(bin_of.ravel(), minlength=n_params * bins).astype(float)
+
+    sums = np.zeros((n_params * bins, Y.shape[1]))
+    for start in range(0, n, chunk):
+        stop = min(n, start + chunk)
+        onehot = np.zeros((stop - start, n_params * bins), dtype=Y.dtype)
+        np.put_along_axis(onehot, bin_of[start:stop], 1, axis=1)
+        sums += onehot.T @ Y[start:stop]
+
+    mean = Y.mean(axis=0, dtype=float)
+    var = Y.var(axis=0, dtype=float)
+    bin_means = sums / np.maximum(counts, 1)[:, None]
+    between = (counts[:, None] * (bin_means - mean) ** 2).reshape(n_params, bins, -1).sum(axis=1) / n
+    ratio = np.divide(between, var, out=np.zeros_like(between), where=var > 0)
+    return ratio.mean(axis=1)
+
+
+def analyze(records, samples=10_000, concentration=200.0, input_noise=0.1, level=0.9,
+            seed=None, workers=1, thresholds_path=THRESHOLDS_PATH):
+    """Run the sensitivity analysis for {country: inputs}.
+
+    Returns a dict with the base overall scores, mean/std and confidence
+    interval of each country's overall score, rank distributions, and the
+    first-order contribution of every weight and numeric input.
+    """
+    arrays = get_rubric(thresholds_path).arrays
+    names = list(records)
+    X = arrays.encode([records[c] for c in names])
+    base = arrays.overall(arrays.category_scores(arrays.score_matrix(X)))
+
+    workers = max(1, workers)
+    sizes = [len(a) for a in np.array_split(np.arange(samples), workers) if len(a)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(X, n, s, concentration, input_noise, thresholds_path) for n, s in zip(sizes, seeds)]
+    if len(args) > 1:
+        with ProcessPoolExecutor(max_workers=len(args)) as pool:
+            parts = list(pool.map(_run_chunk, *zip(*args)))
+    else:
+        parts = [_run_chunk(*a) for a in args]
+    params = np.vstack([p for p, _ in parts])
+    Y = np.vstack([y for _, y in parts])
+
+    n_countries = len(names)
+    ranks = (-Y).argsort(axis=1, kind="stable").argsort(axis=1, kind="stable")
+    rank_counts = np.zeros((n_countries, n_countries), dtype=np.int64)
+    for c in range(n_countries):
+        rank_counts[c] = np.bincount(ranks[:, c], minlength=n_countries)
+    base_rank = (-base).argsort(kind="stable").argsort(kind="stable")
+
+    tail = (1 - level) / 2
+    lo, hi = np.quantile(Y, [tail, 1 - tail], axis=0)
+    num_labels = [f"input: {arrays.metrics[j][1]}" for j in np.flatnonzero(~arrays.is_select)]
+    param_names = ([f"category: {c}" for c in arrays.categories]
+                   + [f"metric: {m}" for _, m in arrays.metrics] + num_labels)
+    contributions = _first_order(params, Y)
+    keep = slice(None) if input_noise > 0 else slice(0, len(param_names) - len(num_labels))
+
+    return {
+        "countries": names,
+        "samples": len(Y),
+        "base": base,
+        "mean": Y.mean(axis=0, dtype=float),
+        "std": Y.std(axis=0, dtype=float),
+        "ci": (lo, hi),
+        "level": level,
+        "base_rank": base_rank + 1,
+        "mean_rank": ranks.mean(axis=0) + 1,
+        "rank_stability": rank_counts[np.arange(n_countries), base_rank] / len(Y),
+        "rank_counts": rank_counts,
+        "contributions": dict(zip(param_names[keep], contributions[keep])),
+    }
+
+
+def format_report(result, top=10):
+    lines = [f"{result['samples']} samples, {result['level']:.0%} intervals", ""]
+    lines.append(f"{'Country':<24}{'Base':>7}{'Mean':>7}{'Low':>7}{'High':>7}{'Rank':>6}{'Stable':>8}")
+    lo, hi = result["ci"]
+    order = np.argsort(result["base_rank"])
+    for i in order:
+        lines.append(
+            f"{result['countries'][i][:23]:<24}{result['base'][i]:>7.3f}{result['mean'][i]:>7.3f}"
+            f"{lo[i]:>7.3f}{hi[i]:>7.3f}{result['base_rank'][i]:>6}{result['rank_stability'][i]:>8.1%}"
+        )
+    lines += ["", "Largest first-order contributions:"]
+    ranked = sorted(result["contributions"].items(), key=lambda kv: kv[1], reverse=True)[:top]
+    lines += [f"  {name:<50}{value:>7.3f}" for name, value in ranked]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo sensitivity of launch readiness scores.")
+    parser.add_argument("--samples", type=int, default=10_000)
+    parser.add_argument("--concentration", type=float, default=200.0,
+                        help="Dirichlet concentration; higher means weights stay closer to thresholds.json")
+    parser.add_argument("--input-noise", type=float, default=0.1, help="relative sd of numeric inputs (0 disables)")
+    parser.add_argument("--level", type=float, default=0.9, help="confidence level for score intervals")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int, default=1, help="process pool size (0 = all cores)")
+    parser.add_argument("--thresholds", default=THRESHOLDS_PATH)
+    args = parser.parse_args(argv)
+
+    store = get_store()
+    records = {c: store.get(c) for c in store.names()}
+    result = analyze(records, args.samples, args.concentration, args.input_noise, args.level,
+                     args.seed, args.workers or os.cpu_count() or 1, args.thresholds)
+    print(format_report(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""Bounded per-session state for the Streamlit app.
+
+Streamlit drops the values of widgets that do not render, so switching
+country lost the edits made to the previous one, while every visited
+country's ScoringState stayed in ``st.session_state`` for the life of the
+session. ``SessionBudget`` takes a zlib-compressed JSON snapshot of a
+country's widget values when it stops rendering (unless snapshots are
+off) and writes it back before the widgets render when the country is
+selected again. Only the ``max_countries`` most recently viewed countries
+keep their ScoringState, and results shown for another country are
+dropped on a country change. When the estimated size of the session
+still exceeds ``max_bytes``, every other country, then the snapshots,
+then the shown results are evicted.
+
+Sizes are estimated by walking the stored objects, skipping the shared
+rubric and scorers. The last size of every live session is kept
+process-wide for the debug panel and the Prometheus metrics.
+"""
+import json
+import os
+import sys
+import threading
+import time
+import zlib
+from types import MappingProxyType
+
+MAX_COUNTRIES = int(os.environ.get("SESSION_MAX_COUNTRIES", "3"))
+MAX_BYTES = int(os.environ.get("SESSION_MAX_BYTES", str(4 * 1024 * 1024)))
+SNAPSHOTS = os.environ.get("SESSION_SNAPSHOTS", "1") != "0"
+MAX_SNAPSHOTS = 200
+SESSION_TTL = 3600  # seconds without a rerun before a session is dropped from the report
+
+# Results shown for one country: {"country": ..., ...}
+RESULT_KEYS = ("launch_readiness", "csv_results")
+LRU_KEY = "_session_countries"
+SNAPSHOT_KEY = "_session_snapshots"
+
+_lock = threading.Lock()
+_sessions = {}  # session id -> (bytes, countries, snapshots, last seen)
+
+
+def widget_keys(rubric, country):
+    """Session-state keys of ``country``'s input widgets, with their metric keys."""
+    for cat, cdef in rubric.items():
+        for mkey, mdef in cdef["metrics"].items():
+            prefix = "sel" if mdef.get("custom") else "num"
+            yield f"{prefix}_{country}_{cat}_{mkey}", mkey
+
+
+def pack(values):
+    return zlib.compress(json.dumps(values, separators=(",", ":")).encode("utf-8"), 9)
+
+
+def unpack(blob):
+    return json.loads(zlib.decompress(blob))
+
+
+def estimate_bytes(obj, skip=(), _seen=None):
+    """Approximate deep size of ``obj``; objects whose id is in ``skip`` are not counted."""
+    seen = set(skip) if _seen is None else _seen
+    stack, total = [obj], 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, (type, MappingProxyType)) or callable(obj):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, "__dict__"):
+            stack.append(vars(obj))
+    return total
+
+
+class SessionBudget:
+    """Eviction and accounting for one session's state (a mutable mapping, e.g. ``st.session_state``)."""
+
+    def __init__(self, state, rubric, max_countries=MAX_COUNTRIES, max_bytes=MAX_BYTES,
+                 snapshots=SNAPSHOTS, shared=()):
+        self.state = state
+        self.rubric = rubric
+        self.max_countries = max(1, max_countries)
+        self.max_bytes = max_bytes
+        self.snapshots = snapshots
+        self.skip = {id(rubric), *map(id, shared)}
+        self.evicted = []
+
+    def _lru(self):
+        if LRU_KEY not in self.state:
+            self.state[LRU_KEY] = []
+        return self.state[LRU_KEY]
+
+    def _snapshots(self):
+        if SNAPSHOT_KEY not in self.state:
+            self.state[SNAPSHOT_KEY] = {}
+        return self.state[SNAPSHOT_KEY]
+
+    @property
+    def countries(self):
+        """Countries whose widget state is resident, least recently viewed first."""
+        return list(self.state.get(LRU_KEY, []))
+
+    def activate(self, country):
+        """Mark ``country`` as viewed; call before its widgets render so its snapshot can be restored."""
+        lru = self._lru()
+        for other in lru:
+            if other != country:
+                self.capture(other)
+        if country in lru:
+            lru.remove(country)
+        lru.append(country)
+        for key in RESULT_KEYS:
+            shown = self.state.get(key)
+            if shown is not None and shown.get("country") != country:
+                del self.state[key]
+        self.restore(country)
+        while len(lru) > self.max_countries:
+            self.evict(lru[0])
+
+    def capture(self, country=None):
+        """Snapshot and clear the widget values of ``country`` (default: every resident country)."""
+        for name in ([country] if country is not None else self._lru()):
+            values = {}
+            for key, mkey in widget_keys(self.rubric, name):
+                if key in self.state:
+                    values[mkey] = self.state.pop(key)
+            if self.snapshots and values:
+                snapshots = self._snapshots()
+                snapshots.pop(name, None)
+                snapshots[name] = pack(values)
+                while len(snapshots) > MAX_SNAPSHOTS:
+                    del snapshots[next(iter(snapshots))]
+
+    def evict(self, country):
+        """Drop ``country``'s widget and scoring state, keeping a snapshot of its widget values."""
+        self.capture(country)
+        self.state.pop(f"scoring_state_{country}", None)
+        lru = self._lru()
+        if country in lru:
+            lru.remove(country)
+        self.evicted.append(country)
+
+    def restore(self, country):
+        """Write ``country``'s snapshot back into its widget keys; True if there was one."""
+        blob = self.state.get(SNAPSHOT_KEY, {}).pop(country, None)
+        if blob is None:
+            return False
+        values = unpack(blob)
+        for key, mkey in widget_keys(self.rubric, country):
+            if mkey in values and key not in self.state:
+                self.state[key] = values[mkey]
+        return True
+
+    def usage(self):
+        """{key: estimated bytes} for every session-state entry."""
+        seen = set(self.skip)
+        return {key: estimate_bytes(self.state[key], _seen=seen) for key in list(self.state.keys())}
+
+    def enforce(self, country):
+        """Evict until the session fits ``max_bytes``; returns the final estimate."""
+        total = sum(self.usage().values())
+        steps = [lambda c=c: self.evict(c) for c in list(self._lru()) if c != country]
+        steps.append(lambda: self.state.pop(SNAPSHOT_KEY, None))
+        steps += [lambda k=k: self.state.pop(k, None) for k in RESULT_KEYS]
+        for step in steps:
+            if total <= self.max_bytes:
+                break
+            step()
+            total = sum(self.usage().values())
+        return total
+
+    def report(self, session_id, total=None):
+        """Record this session's size for ``session_report`` and return it."""
+        total = sum(self.usage().values()) if total is None else total
+        now = time.time()
+        with _lock:
+            _sessions[session_id] = (total, len(self._lru()), len(self.state.get(SNAPSHOT_KEY, {})), now)
+            for sid in [sid for sid, entry in _sessions.items() if now - entry[3] > SESSION_TTL]:
+                del _sessions[sid]
+        return total
+
+
+def session_report():
+    """[{session, bytes, countries, snapshots, idle seconds}] for sessions seen within SESSION_TTL."""
+    now = time.time()
+    with _lock:
+        entries = sorted(_sessions.items(), key=lambda item: item[1][0], reverse=True)
+    return [
+        {"session": sid[:8], "bytes": size, "countries": countries, "snapshots": snapshots,
+         "idle seconds": round(now - seen)}
+        for sid, (size, countries, snapshots, seen) in entries if now - seen <= SESSION_TTL
+    ]
+
+
+def prometheus_text(prefix="launch_scoring_session"):
+    sessions = session_report()
+    sizes = [s["bytes"] for s in sessions]
+    return "\n".join([
+        f"# TYPE {prefix}s gauge",
+        f"{prefix}s {len(sessions)}",
+        f"# TYPE {prefix}_state_bytes gauge",
+        f'{prefix}_state_bytes{{stat="total"}} {sum(sizes)}',
+        f'{prefix}_state_bytes{{stat="max"}} {max(sizes, default=0)}',
+    ]) + "\n"
@@ -0,0 +1,97 @@
+import asyncio
+import json
+from http import HTTPStatus
+
+import pytest
+
+from api import HTTPError, ScoringAPI
+from countries import BUILTIN_COUNTRIES, MemoryStore
+from rubric import get_rubric
+from scoring import score_only
+
+
+@pytest.fixture
+def api():
+    return ScoringAPI(store=MemoryStore(BUILTIN_COUNTRIES), batch_window=0.001)
+
+
+def handle(api, method, path, body=None):
+    return asyncio.run(api.handle(method, path, body or {}))
+
+
+def status_of(api, method, path, body=None):
+    with pytest.raises(HTTPError) as exc:
+        handle(api, method, path, body)
+    return exc.value.status
+
+
+def test_score_country_matches_the_scorers(api):
+    result = handle(api, "POST", "/score", {"country": "France"})
+    assert result["name"] == "France"
+    assert result["overall"] == round(score_only(get_rubric().categories, BUILTIN_COUNTRIES["France"])[1], 3)
+
+
+def test_batch_scores_countries_and_inputs(api):
+    result = handle(api, "POST", "/score/batch",
+                    {"items": [{"country": "France"}, {"inputs": {"Gini coefficient": "nan"}, "name": "blank"}]})
+    assert [r["name"] for r in result["results"]] == ["France", "blank"]
+    assert result["results"][1]["overall"] == 3.0
+
+
+@pytest.mark.parametrize("body, status", [
+    ({"country": ["France"]}, HTTPStatus.BAD_REQUEST),
+    ({"country": 5}, HTTPStatus.BAD_REQUEST),
+    ({}, HTTPStatus.BAD_REQUEST),
+    ({"inputs": []}, HTTPStatus.BAD_REQUEST),
+    ({"inputs": {"GDP per capita": "lots"}}, HTTPStatus.BAD_REQUEST),
+    ({"country": "Atlantis"}, HTTPStatus.NOT_FOUND),
+])
+def test_bad_score_requests(api, body, status):
+    assert status_of(api, "POST", "/score", body) == status
+
+
+def test_unknown_route(api):
+    assert status_of(api, "GET", "/nope") == HTTPStatus.NOT_FOUND
+
+
+def test_rubric_and_rankings(api):
+    assert handle(api, "GET", "/rubric")["categories"]
+    assert {r["Country"] for r in handle(api, "GET", "/rankings")["rankings"]} == set(BUILTIN_COUNTRIES)
+
+
+async def exchange(api, request):
+    server = await asyncio.start_server(api.serve_client, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+    return response.decode("latin-1")
+
+
+def post(body, headers=""):
+    data = json.dumps(body).encode()
+    return b"POST /score HTTP/1.1\r\nConnection: close\r\n" + headers.encode() + \
+        b"Content-Length: %d\r\n\r\n" % len(data) + data
+
+
+def test_http_round_trip(api):
+    response = asyncio.run(exchange(api, post({"country": "Canada"})))
+    assert response.startswith("HTTP/1.1 200 OK")
+    assert json.loads(response.split("\r\n\r\n", 1)[1])["name"] == "Canada"
+
+
+@pytest.mark.parametrize("length", ["abc", "-5", "1.5"])
+def test_invalid_content_length_closes_the_connection(api, length):
+    request = f"POST /score HTTP/1.1\r\nContent-Length: {length}\r\n\r\n{{}}GET /rubric HTTP/1.1\r\n\r\n".encode()
+    response = asyncio.run(exchange(api, request))
+    assert response.startswith("HTTP/1.1 400") and response.count("HTTP/1.1 ") == 1
+
+
+def test_oversized_lines_get_an_answer(api):
+    response = asyncio.run(exchange(api, b"GET /rubric HTTP/1.1\r\nX-Big: " + b"a" * 200_000 + b"\r\n\r\n"))
+    assert response.startswith("HTTP/1.1 431")
+    response = asyncio.run(exchange(api, b"GET /" + b"a" * 200_000 + b" HTTP/1.1\r\n\r\n"))
+    assert response.startswith("HTTP/1.1 400")
@@ -0,0 +1,82 @@
+import csv
+import io
+import json
+
+import pytest
+
+from batch import iter_rows, main, score_rows, score_stream
+from countries import BUILTIN_COUNTRIES
+from rubric import get_rubric
+
+NUMERIC = "GDP per capita"
+
+
+@pytest.fixture(scope="module")
+def select_metric():
+    return next(iter(get_rubric().option_index))
+
+
+def csv_rows(rows):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    out.seek(0)
+    return list(iter_rows(out, "csv"))
+
+
+def jsonl_rows(lines):
+    return list(iter_rows(io.StringIO("".join(line + "\n" for line in lines)), "jsonl"))
+
+
+def country_row(name, **changes):
+    return {"Country": name, **BUILTIN_COUNTRIES[name], **changes}
+
+
+def test_bad_csv_cells_skip_only_their_row(select_metric):
+    rows = csv_rows([country_row("France"), country_row("India", **{NUMERIC: "N/A"}),
+                     country_row("Canada", **{select_metric: "Not an option"}), country_row("Brunei")])
+    table, errors = score_rows(rows)
+    assert table.ids == ["France", "Brunei"]
+    assert [row_id for row_id, _ in errors] == ["India", "Canada"]
+    assert "expected a number" in errors[0][1] and "unknown answer" in errors[1][1]
+
+
+def test_blank_numeric_cell_is_missing_not_an_error():
+    table, errors = score_rows(csv_rows([country_row("France", **{NUMERIC: ""})]))
+    assert errors == [] and len(table) == 1
+
+
+def test_bad_jsonl_lines_are_labelled_by_line():
+    lines = [json.dumps(country_row("France")), "{not json", "[1, 2]", json.dumps({"id": "x", NUMERIC: "abc"}),
+             "", json.dumps(country_row("Canada"))]
+    table, errors = score_rows(jsonl_rows(lines))
+    assert table.ids == ["France", "Canada"]
+    assert [row_id for row_id, _ in errors] == ["line 2", "line 3", "x"]
+    assert errors[0][1].startswith("invalid JSON") and "expected a JSON object" in errors[1][1]
+
+
+def test_strict_raises_on_the_first_bad_row():
+    with pytest.raises(ValueError, match="India"):
+        score_rows(csv_rows([country_row("France"), country_row("India", **{NUMERIC: "N/A"})]), strict=True)
+
+
+def test_process_pool_matches_inline():
+    rows = csv_rows([country_row(name) for name in sorted(BUILTIN_COUNTRIES)] * 5)
+    inline = list(score_stream(rows, chunk_size=7))
+    pooled = list(score_stream(rows, chunk_size=7, workers=2))
+    assert [list(t.metric_rows()) for t, _ in pooled] == [list(t.metric_rows()) for t, _ in inline]
+    assert [list(t.category_rows(overall=True)) for t, _ in pooled] == \
+        [list(t.category_rows(overall=True)) for t, _ in inline]
+
+
+def test_main_reports_skipped_rows_and_strict_exits(tmp_path, capsys):
+    path = tmp_path / "in.jsonl"
+    path.write_text(json.dumps(country_row("France")) + "\n{oops\n", encoding="utf-8")
+    out = tmp_path / "metrics.jsonl"
+    main([str(path), "--metrics-out", str(out)])
+    assert "skipped line 2" in capsys.readouterr().err
+    assert {json.loads(line)["Country"] for line in out.read_text(encoding="utf-8").splitlines()} == {"France"}
+    with pytest.raises(SystemExit) as exc:
+        main([str(path), "--metrics-out", str(out), "--strict"])
+    assert "line 2" in str(exc.value.code)
@@ -0,0 +1,72 @@
+import pytest
+
+from countries import BUILTIN_COUNTRIES, CountryStore, MemoryStore, SQLiteStore, coerce_input, parse_record
+from rubric import get_rubric
+
+
+@pytest.fixture(scope="module")
+def rubric():
+    return get_rubric()
+
+
+def fill(store):
+    for i, version in enumerate(["2023", "2024", "2025"]):
+        store.put_many({c: {**r, "GDP per capita": 1000.0 * (i + 1)} for c, r in BUILTIN_COUNTRIES.items()}, version)
+    return store
+
+
+def test_store_is_abstract():
+    with pytest.raises(TypeError):
+        CountryStore()
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 50_000])
+def test_sqlite_history_matches_memory(tmp_path, chunk):
+    sqlite = fill(SQLiteStore(str(tmp_path / "c.db")))
+    assert list(sqlite.history(chunk)) == list(fill(MemoryStore()).history())
+
+
+def test_history_leaves_out_versions_imported_while_reading(tmp_path):
+    path = str(tmp_path / "c.db")
+    rows = fill(SQLiteStore(path)).history(chunk=3)
+    first = next(rows)
+    SQLiteStore(path).put_many({"Atlantis": {"GDP per capita": 1.0}}, "2099")  # a concurrent import commits
+    versions = {first[1]} | {version for _, version, _ in rows}
+    assert versions == {"2023", "2024", "2025"}
+
+
+def test_sqlite_get_returns_the_latest_version_and_copies(tmp_path):
+    store = fill(SQLiteStore(str(tmp_path / "c.db")))
+    record = store.get("France")
+    assert record["GDP per capita"] == 3000.0
+    record["GDP per capita"] = 0
+    assert store.get("France")["GDP per capita"] == 3000.0
+    assert store.get("France", "2023")["GDP per capita"] == 1000.0
+    assert store.get("Atlantis") == {}
+
+
+@pytest.mark.parametrize("value, expected", [("1,234.5", 1234.5), (" 12 ", 12.0), ("", None), ("nan", None),
+                                             (float("nan"), None), (7, 7.0), (None, None)])
+def test_coerce_numeric(rubric, value, expected):
+    assert coerce_input("GDP per capita", value, rubric) == expected
+
+
+@pytest.mark.parametrize("value", ["N/A", "lots", [1]])
+def test_coerce_rejects_non_numbers(rubric, value):
+    with pytest.raises(ValueError, match="expected a number"):
+        coerce_input("GDP per capita", value, rubric)
+
+
+def test_coerce_qualitative(rubric):
+    mkey, options = next(iter(rubric.option_index.items()))
+    option = next(iter(options))
+    assert coerce_input(mkey, f" {option} ", rubric) == option
+    with pytest.raises(ValueError, match="unknown answer"):
+        coerce_input(mkey, "Not an option", rubric)
+
+
+def test_parse_record_maps_labels_and_skips_unknown_columns(rubric):
+    label = rubric.labels["GDP per capita"]
+    record = parse_record({"Country": "X", label: "5000", "Unrelated": "y", "Gini coefficient": ""}, rubric,
+                          skip=("Country",))
+    assert record == {"GDP per capita": 5000.0}
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from pareto import COUNT_LIMIT, Frontier, dominance_counts, main, nearest, skyline
+
+
+def brute_skyline(P):
+    return np.array([j for j in range(len(P)) if not ((P >= P[j]).all(axis=1) & (P > P[j]).any(axis=1)).any()],
+                    dtype=np.intp)
+
+
+def brute_counts(P):
+    dominates = [((P[i] >= P).all(axis=1) & (P[i] != P).any(axis=1)).sum() for i in range(len(P))]
+    dominated_by = [((P[i] <= P).all(axis=1) & (P[i] != P).any(axis=1)).sum() for i in range(len(P))]
+    return np.array(dominates), np.array(dominated_by)
+
+
+def random_points(seed):
+    rng = np.random.default_rng(seed)
+    n, d = int(rng.integers(1, 300)), int(rng.integers(1, 7))
+    # Small integer scores repeat a lot, which is the case the skyline's grouping handles.
+    if seed % 2:
+        return rng.integers(1, 6, size=(n, d)).astype(float), rng
+    return rng.random((n, d)), rng
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_skyline_matches_brute_force(seed):
+    P, rng = random_points(seed)
+    np.testing.assert_array_equal(skyline(P, block=int(rng.integers(1, 64))), brute_skyline(P))
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_dominance_counts_match_brute_force(seed):
+    P, rng = random_points(seed)
+    dominates, dominated_by = brute_counts(P)
+    got = dominance_counts(P)
+    np.testing.assert_array_equal(got[0], dominates)
+    np.testing.assert_array_equal(got[1], dominated_by)
+    rows = rng.choice(len(P), size=int(rng.integers(1, len(P) + 1)), replace=False)
+    got = dominance_counts(P, rows)
+    np.testing.assert_array_equal(got[0], dominates[rows])
+    np.testing.assert_array_equal(got[1], dominated_by[rows])
+
+
+def test_skyline_of_nothing():
+    assert len(skyline(np.empty((0, 3)))) == 0
+
+
+def test_nearest_excludes_the_row_and_applies_weights():
+    P = np.array([[0.0, 0.0], [1.0, 0.0], [0.0, 2.0], [3.0, 3.0]])
+    idx, dist = nearest(P, 0, k=2)
+    assert idx.tolist() == [1, 2]
+    np.testing.assert_allclose(dist, [1.0, 2.0])
+    idx, _ = nearest(P, 0, k=2, weights=[4.0, 0.25])
+    assert idx.tolist() == [2, 1]
+    assert len(nearest(P[:1], 0)[0]) == 0
+
+
+def frontier(points):
+    points = np.asarray(points, dtype=float)
+    names = [(f"C{i}", None) for i in range(len(points))]
+    return Frontier(names, points, points.mean(axis=1), [f"cat{k}" for k in range(points.shape[1])],
+                    np.full(points.shape[1], 1 / points.shape[1]))
+
+
+def test_frontier_table_lists_optimal_rows_first_with_counts():
+    f = frontier([[1, 1], [3, 1], [1, 3], [2, 2], [0, 0]])
+    rows = f.table()
+    assert [r["Pareto-optimal"] for r in rows] == [True, True, True, False, False]
+    assert {r["Country"] for r in rows[:3]} == {"C1", "C2", "C3"}
+    by_name = {r["Country"]: r for r in rows}
+    assert by_name["C4"]["Dominated by"] == 4
+    assert by_name["C3"]["Dominates"] == 2
+
+
+def test_frontier_leaves_counts_out_past_the_limit():
+    f = frontier(np.random.default_rng(0).random((COUNT_LIMIT + 1, 3)))
+    assert not f.counted
+    row = f.table()[0]
+    assert "Dominates" not in row and "Dominated by" not in row
+
+
+def test_main_rejects_an_unknown_nearest_country(monkeypatch):
+    monkeypatch.setattr("pareto.build_frontier", lambda *args, **kwargs: frontier([[1, 2], [2, 1]]))
+    with pytest.raises(SystemExit) as exc:
+        main(["--nearest", "Atlantis"])
+    assert exc.value.code == 2
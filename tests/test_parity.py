@@ -0,0 +1,84 @@
+"""The engine, the columnar tables and the per-value scorers agree on every cell, edge cases included."""
+import numpy as np
+import pytest
+
+from bench import edge_records
+from columnar import InputTable, ResultTable
+from countries import coerce_input
+from rubric import get_rubric
+from scoring import FALLBACK_OPTION, NEUTRAL_SCORE, score_metric, score_only
+
+N = 5_000
+
+
+@pytest.fixture(scope="module")
+def rubric():
+    return get_rubric()
+
+
+@pytest.fixture(scope="module")
+def records(rubric):
+    """Edge-case records as CSV / JSON input reaches the scorers: numeric cells through coerce_input."""
+    return [{mkey: val if mkey in rubric.option_index else coerce_input(mkey, val, rubric) for mkey, val in raw.items()}
+            for raw in edge_records(rubric.arrays, N)]
+
+
+@pytest.fixture(scope="module")
+def expected(rubric, records):
+    arrays = rubric.arrays
+    return np.array([[score_metric(rubric.categories[cat]["metrics"][mkey], record.get(mkey))[0]
+                      for cat, mkey in arrays.metrics] for record in records])
+
+
+def test_edge_records_cover_the_edge_cases(rubric, records):
+    values = [v for record in records for v in record.values()]
+    assert None in values
+    assert "Not an option" in values
+    arrays = rubric.arrays
+    on_break = {b for j, breaks in enumerate(arrays.column_breaks) if not arrays.is_select[j] for b in breaks}
+    assert on_break & set(values)
+
+
+def test_engine_matches_score_metric(rubric, records, expected):
+    arrays = rubric.arrays
+    np.testing.assert_array_equal(arrays.score_matrix(arrays.encode(records)), expected)
+
+
+def test_compiled_scorers_match_score_metric(rubric, records, expected):
+    got = [[rubric.scorers[mkey].score(record.get(mkey)) for _, mkey in rubric.arrays.metrics] for record in records]
+    np.testing.assert_array_equal(np.array(got), expected)
+
+
+def test_columnar_matches_score_metric(rubric, records, expected):
+    table = ResultTable.from_records(enumerate(records), rubric)
+    got = [[table.score(i, j) for j in range(len(rubric.arrays.metrics))] for i in range(len(records))]
+    np.testing.assert_array_equal(np.array(got), expected)
+
+
+def test_columnar_overall_matches_score_only(rubric, records):
+    table = ResultTable.from_records(enumerate(records[:500]), rubric)
+    for i, record in enumerate(records[:500]):
+        assert table.overall[i] == score_only(rubric.categories, record)[1]
+
+
+def test_unknown_answer_is_stored_as_missing_and_falls_back(rubric):
+    mkey = next(iter(rubric.option_index))
+    table = InputTable.from_records({"x": {mkey: "Not an option"}, "y": {}}, rubric)
+    col = table.columns.slots[mkey][1]
+    assert table.codes[:, col].tolist() == [-1, -1]
+    j = [m for _, m in rubric.arrays.metrics].index(mkey)
+    assert table.matrix()[:, j].tolist() == [FALLBACK_OPTION, FALLBACK_OPTION]
+
+
+def test_result_table_round_trips_through_arrays(rubric, records):
+    table = ResultTable.from_records(enumerate(records[:50]), rubric)
+    again = ResultTable.from_arrays(table.to_arrays(), rubric)
+    assert list(again.metric_rows()) == list(table.metric_rows())
+    assert list(again.category_rows(overall=True)) == list(table.category_rows(overall=True))
+
+
+def test_missing_numeric_scores_neutral_in_the_engine(rubric):
+    arrays = rubric.arrays
+    scores = arrays.score_matrix(arrays.encode([{}]))[0]
+    numeric = ~np.asarray(arrays.is_select)
+    assert (scores[numeric] == NEUTRAL_SCORE).all()
@@ -0,0 +1,91 @@
+import itertools
+import math
+
+import numpy as np
+import pytest
+
+from countries import BUILTIN_COUNTRIES
+from pathfinder import EPS, branch_and_bound, find_path, find_paths, next_tier, step_options, tier_cutoff
+from rubric import get_rubric
+from scoring import TIERS
+
+
+def brute_force(options, gap):
+    """Cheapest cost over every choice of at most one option per column, or None."""
+    best = math.inf
+    for choice in itertools.product(*[[None] + opts for opts in options]):
+        picked = [o for o in choice if o is not None]
+        if sum(g for _, g, _ in picked) >= gap - EPS:
+            best = min(best, sum(c for c, _, _ in picked))
+    return None if best == math.inf else best
+
+
+def random_options(rng):
+    options = []
+    for _ in range(int(rng.integers(1, 7))):
+        col, gain = [], 0.0
+        for k in range(1, int(rng.integers(0, 5)) + 1):
+            gain += float(rng.uniform(0.01, 0.5))
+            col.append((float(rng.choice([1.0, 2.0, 0.5])) * k, gain, k))
+        options.append(col)
+    return options
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_branch_and_bound_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    options = random_options(rng)
+    gap = float(rng.uniform(0, 2))
+    expected = brute_force(options, gap)
+    got = branch_and_bound(options, gap)
+    if expected is None:
+        assert got is None
+        return
+    cost, chosen = got
+    assert cost == pytest.approx(expected)
+    picked = [o for col, opts in enumerate(options) for o in opts if chosen.get(col) == o[2]]
+    assert len(picked) == len(chosen)
+    assert sum(g for _, g, _ in picked) >= gap - EPS
+    assert sum(c for c, _, _ in picked) == pytest.approx(cost)
+
+
+def test_no_gap_costs_nothing():
+    assert branch_and_bound([[(1.0, 0.5, 1)]], 0.0) == (0.0, {})
+
+
+def test_tiers():
+    assert next_tier(TIERS[0][0] + 0.1) is None
+    cutoff, label = next_tier(3.5)
+    assert (cutoff, label) == (3.8, TIERS[1][1])
+    assert tier_cutoff(label) == 3.8
+    with pytest.raises(ValueError):
+        tier_cutoff("Nonexistent tier")
+
+
+@pytest.mark.parametrize("country", sorted(BUILTIN_COUNTRIES))
+def test_find_path_reaches_the_next_tier(country):
+    path = find_path(BUILTIN_COUNTRIES[country])
+    if path is None or path["target"] is None:
+        return
+    assert path["reached"] >= tier_cutoff(path["target"]) - EPS
+    assert path["reached"] == pytest.approx(path["overall"] + sum(s["gain"] for s in path["steps"]))
+    assert path["cost"] >= len(path["steps"])  # every step costs 1 by default
+
+
+def test_find_path_cost_matches_brute_force_on_few_metrics():
+    rubric = get_rubric()
+    arrays = rubric.arrays
+    record = BUILTIN_COUNTRIES["India"]
+    X = arrays.encode([record])
+    options = step_options(arrays, arrays.index_matrix(X)[0], arrays.effective_weights())
+    # Brute force over the four most valuable metrics only; the solver gets the same restricted problem.
+    top = sorted((col for col, opts in enumerate(options) if opts), key=lambda col: -options[col][-1][1])[:4]
+    restricted = [opts if col in top else [] for col, opts in enumerate(options)]
+    gap = 0.5 * sum(options[col][-1][1] for col in top)
+    cost, _ = branch_and_bound(restricted, gap)
+    assert cost == pytest.approx(brute_force([options[col] for col in top], gap))
+
+
+def test_find_paths_matches_find_path():
+    records = {c: BUILTIN_COUNTRIES[c] for c in sorted(BUILTIN_COUNTRIES)[:4]}
+    assert find_paths(records) == {c: find_path(r) for c, r in records.items()}
@@ -0,0 +1,102 @@
+import copy
+import json
+import os
+
+import pytest
+
+from rubric import RubricError, compile_file, get_rubric, main, reload_rubric, validate
+from scoring import load_thresholds
+
+
+@pytest.fixture
+def data():
+    return load_thresholds()
+
+
+@pytest.fixture
+def thresholds(tmp_path, data):
+    path = tmp_path / "thresholds.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return str(path)
+
+
+def first_metric(data, custom):
+    for cdef in data["categories"].values():
+        for mdef in cdef["metrics"].values():
+            if bool(mdef.get("custom")) == custom:
+                return mdef
+
+
+def test_shipped_rubric_is_valid(data):
+    assert validate(data) == []
+
+
+@pytest.mark.parametrize("document", [None, [], {}, {"categories": {}}])
+def test_missing_categories(document):
+    assert validate(document) == ["'categories' must be a non-empty object"]
+
+
+def test_every_problem_is_reported_together(data):
+    broken = copy.deepcopy(data)
+    numeric = first_metric(broken, custom=False)
+    numeric["breaks"] = list(reversed(numeric["breaks"]))
+    numeric["direction"] = "sideways"
+    numeric["scores"] = numeric["scores"][:-1]
+    select = first_metric(broken, custom=True)
+    select["options"] = ["Yes", "Yes"]
+    next(iter(broken["categories"].values()))["weight"] = 5
+    errors = validate(broken)
+    for expected in ("ascending", "direction must be", "scores for", "to 5 options", "duplicate options",
+                     "category weights sum"):
+        assert any(expected in e for e in errors), expected
+
+
+def test_duplicate_metric_keys_and_labels_across_categories(data):
+    broken = copy.deepcopy(data)
+    (cat_a, a), (_, b) = list(broken["categories"].items())[:2]
+    mkey, mdef = next(iter(a["metrics"].items()))
+    b["metrics"][mkey] = copy.deepcopy(mdef)
+    errors = validate(broken)
+    assert any(f"already used in {cat_a}" in e for e in errors)
+
+
+def test_compile_file_names_the_file(tmp_path):
+    path = tmp_path / "bad.json"
+    path.write_text("{not json", encoding="utf-8")
+    with pytest.raises(RubricError) as exc:
+        compile_file(str(path))
+    assert exc.value.source == str(path) and "invalid JSON" in exc.value.errors[0]
+    path.write_text(json.dumps({"categories": {}}), encoding="utf-8")
+    with pytest.raises(RubricError):
+        compile_file(str(path))
+
+
+def test_get_rubric_is_cached_until_the_content_changes(thresholds, data):
+    first = get_rubric(thresholds)
+    assert get_rubric(thresholds) is first
+    # Rewritten with the same content: the compiled object is kept.
+    with open(thresholds, "w", encoding="utf-8") as f:
+        f.write(json.dumps(data))
+    os.utime(thresholds, ns=(0, 1))
+    assert get_rubric(thresholds) is first
+    first_metric(data, custom=False)["reason"] = "edited"
+    with open(thresholds, "w", encoding="utf-8") as f:
+        f.write(json.dumps(data))
+    second = get_rubric(thresholds)
+    assert second is not first and second.digest != first.digest
+    assert reload_rubric(thresholds) is not second
+
+
+def test_rubric_is_read_only(thresholds):
+    rubric = get_rubric(thresholds)
+    with pytest.raises(TypeError):
+        rubric.categories["new"] = {}
+
+
+def test_main_validates_every_path(thresholds, tmp_path, capsys):
+    assert main([thresholds]) == 0
+    assert "ok" in capsys.readouterr().out
+    bad = tmp_path / "bad.json"
+    bad.write_text("[]", encoding="utf-8")
+    assert main([thresholds, str(bad)]) == 1
+    assert "rubric error" in capsys.readouterr().err
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from countries import BUILTIN_COUNTRIES
+from rubric import get_rubric
+from scenarios import ScenarioStore, diff, materialize, score_scenarios
+
+BASE = BUILTIN_COUNTRIES["India"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ScenarioStore(str(tmp_path / "scenarios.db"))
+
+
+def test_diff_keeps_only_changed_values_and_materialize_restores_them():
+    edited = {**BASE, "GDP per capita": 50_000.0, "Gini coefficient": None}
+    overrides = diff(BASE, edited)
+    assert overrides == {"GDP per capita": 50_000.0}
+    assert materialize(BASE, overrides) == {**BASE, "GDP per capita": 50_000.0}
+
+
+def test_store_saves_replaces_and_deletes(store):
+    store.save("India", "richer", {"GDP per capita": 50_000.0})
+    store.save("India", "empty", {})
+    store.save("France", "poorer", {"GDP per capita": 1_000.0})
+    assert store.names("India") == ["empty", "richer"]
+    assert store.overrides("India", "richer") == {"GDP per capita": 50_000.0}
+    assert store.overrides("India") == {"empty": {}, "richer": {"GDP per capita": 50_000.0}}
+    store.save("India", "richer", {"Gini coefficient": 0.2})
+    assert store.overrides("India", "richer") == {"Gini coefficient": 0.2}
+    before = store.fingerprint()
+    store.delete("India", "richer")
+    assert store.fingerprint() != before
+    assert store.all_overrides() == {"India": {"empty": {}}, "France": {"poorer": {"GDP per capita": 1_000.0}}}
+
+
+def test_scenarios_score_like_their_materialized_records():
+    rubric = get_rubric()
+    scenarios = {"richer": {"GDP per capita": 50_000.0}, "none": {}, "qualitative": {
+        mkey: next(iter(options)) for mkey, options in list(rubric.option_index.items())[:2]}}
+    names, scores, cats, overall = score_scenarios(BASE, scenarios, rubric)
+    assert names == ["(base)", "richer", "none", "qualitative"]
+    records = [BASE] + [materialize(BASE, o) for o in scenarios.values()]
+    expected_scores, expected_cats, expected_overall = rubric.arrays.score(records)
+    np.testing.assert_array_equal(scores, expected_scores)
+    np.testing.assert_array_equal(cats, expected_cats)
+    np.testing.assert_array_equal(overall, expected_overall)
+    assert overall[1] > overall[0] and overall[2] == overall[0]
@@ -0,0 +1,42 @@
+import math
+
+import numpy as np
+import pytest
+
+from engine import compile_rubric
+from scoring import NEUTRAL_SCORE, MetricScorer, load_rubric, score_metric, score_numeric, score_only
+
+NAN = float("nan")
+HIGHER = {"breaks": [10, 20], "scores": [1, 3, 5], "direction": "higher_better"}
+LOWER = {"breaks": [10, 20], "scores": [5, 3, 1], "direction": "lower_better"}
+
+
+@pytest.fixture(scope="module")
+def rubric():
+    return load_rubric()
+
+
+@pytest.mark.parametrize("mdef", [HIGHER, LOWER])
+@pytest.mark.parametrize("value", [None, NAN, np.nan])
+def test_missing_numeric_is_neutral(mdef, value):
+    scorer = MetricScorer(mdef)
+    assert scorer.score(value) == NEUTRAL_SCORE
+    assert scorer.why(value) == "N/A → neutral 3"
+    assert score_numeric(value, mdef["breaks"], mdef["scores"], mdef["direction"]) == (NEUTRAL_SCORE, "N/A → neutral 3")
+
+
+@pytest.mark.parametrize("mdef", [HIGHER, LOWER])
+@pytest.mark.parametrize("value", [-1, 10, 15, 20, 25, math.inf, -math.inf])
+def test_scorer_matches_score_metric(mdef, value):
+    scorer = MetricScorer(mdef)
+    assert (scorer.score(value), scorer.why(value)) == score_metric(mdef, value)
+
+
+def test_raw_nan_scores_the_same_in_engine_and_scorers(rubric):
+    numeric = [m for cdef in rubric.values() for m, mdef in cdef["metrics"].items() if not mdef.get("custom")]
+    records = [{m: NAN for m in numeric}, {m: None for m in numeric}, {}]
+    compiled = compile_rubric(rubric)
+    _, _, overall = compiled.score(records)
+    for record, total in zip(records, overall):
+        assert total == pytest.approx(score_only(rubric, record)[1])
+    assert overall[0] == overall[1] == overall[2]
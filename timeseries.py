@@ -0,0 +1,174 @@
+"""Readiness over time: every stored vintage of every country, scored in bulk.
+
+Each (country, version) record is one row. Scores are kept as float32
+(scores are small integers, so nothing is lost) and the input records
+themselves are dropped once hashed, so ten years of quarterly snapshots
+for every country stay a few megabytes. When the store changes, only
+records whose inputs hash differently from every previously scored record
+are encoded and scored again; the rest, including unchanged vintages that
+repeat the previous quarter, reuse existing rows.
+
+    python timeseries.py --country Singapore
+"""
+import argparse
+import threading
+
+import numpy as np
+
+from countries import get_store
+from rubric import get_rubric
+from scoring import input_digest
+
+_lock = threading.Lock()
+_cache = {}  # rubric digest -> (store fingerprint, TimeSeries)
+
+
+class TimeSeries:
+    """Metric, category and overall scores per (country, version), ordered by country then version."""
+
+    def __init__(self, rubric, history, previous=None):
+        arrays = rubric.arrays
+        self.categories = list(arrays.categories)
+        self.metrics = [mkey for _, mkey in arrays.metrics]
+        self.labels = dict(rubric.labels)
+
+        known = {}
+        if previous is not None:
+            known = {d: i for i, d in enumerate(previous.digests)}
+        self.keys, self.digests, source = [], [], []
+        pending, pending_records = {}, []
+        for country, version, record in history:
+            digest = input_digest(record)
+            self.keys.append((country, version))
+            self.digests.append(digest)
+            if digest in known:
+                source.append(known[digest])
+            else:
+                if digest not in pending:
+                    pending[digest] = len(pending_records)
+                    pending_records.append(record)
+                source.append(-1 - pending[digest])
+        self.rescored = len(pending_records)
+
+        source = np.array(source, dtype=np.intp)
+        reused = source >= 0
+        self.scores = np.empty((len(self.keys), len(self.metrics)), dtype=np.float32)
+        self.cat_scores = np.empty((len(self.keys), len(self.categories)))
+        if reused.any():
+            self.scores[reused] = previous.scores[source[reused]]
+            self.cat_scores[reused] = previous.cat_scores[source[reused]]
+        if pending_records:
+            fresh = arrays.score_matrix(arrays.encode(pending_records))
+            self.scores[~reused] = fresh[-1 - source[~reused]]
+            self.cat_scores[~reused] = arrays.category_scores(fresh)[-1 - source[~reused]]
+        self.overall = arrays.overall(self.cat_scores)
+
+        # Rows are grouped by country; the first vintage of each has no delta.
+        countries = [c for c, _ in self.keys]
+        self.first = np.array([i == 0 or countries[i] != countries[i - 1] for i in range(len(countries))], dtype=bool)
+        self._rows = {}
+        for i, country in enumerate(countries):
+            start, _ = self._rows.get(country, (i, i))
+            self._rows[country] = (start, i + 1)
+
+    @property
+    def countries(self):
+        return list(self._rows)
+
+    def _slice(self, country):
+        return slice(*self._rows.get(country, (0, 0)))
+
+    def versions(self, country):
+        return [v for _, v in self.keys[self._slice(country)]]
+
+    def trend(self, country):
+        """(versions, overall, (vintages, categories) category scores) for one country."""
+        rows = self._slice(country)
+        return self.versions(country), self.overall[rows], self.cat_scores[rows]
+
+    def _deltas(self, values):
+        d = np.diff(values, axis=0, prepend=values[:1])
+        d[self.first] = np.nan
+        return d
+
+    def changes(self, country):
+        """One row per vintage after the first: overall, category and changed-metric deltas."""
+        rows = self._slice(country)
+        versions = self.versions(country)
+        overall = np.diff(self.overall[rows])
+        cats = np.diff(self.cat_scores[rows], axis=0)
+        metrics = np.diff(self.scores[rows], axis=0)
+        out = []
+        for i in range(len(versions) - 1):
+            moved = np.flatnonzero(metrics[i])
+            # + 0.0 turns -0.0 (a float-noise decrease) into 0.0
+            row = {"As of": versions[i + 1], "Previous": versions[i], "Overall Δ": round(float(overall[i]), 3) + 0.0}
+            row.update({f"{cat} Δ": round(float(v), 3) + 0.0 for cat, v in zip(self.categories, cats[i])})
+            row["Changed metrics"] = ", ".join(
+                f"{self.labels.get(self.metrics[j], self.metrics[j])} ({metrics[i, j]:+.0f})" for j in moved
+            )
+            out.append(row)
+        return out
+
+    def movers(self, top=10):
+        """Countries with the largest overall change between their last two vintages."""
+        delta = self._deltas(self.overall)
+        rows = []
+        for country, (start, stop) in self._rows.items():
+            if stop - start < 2:
+                continue
+            rows.append({
+                "Country": country,
+                "As of": self.keys[stop - 1][1],
+                "Overall": round(float(self.overall[stop - 1]), 3),
+                "Δ": round(float(delta[stop - 1]), 3) + 0.0,
+            })
+        rows.sort(key=lambda r: abs(r["Δ"]), reverse=True)
+        return rows[:top]
+
+    def overall_table(self):
+        """{country: {version: overall}} for charting."""
+        return {
+            country: dict(zip(self.versions(country), self.overall[start:stop].round(3).tolist()))
+            for country, (start, stop) in self._rows.items()
+        }
+
+
+def score_history(store, rubric=None):
+    """TimeSeries for every record in ``store``; rescored incrementally when the store changes."""
+    rubric = rubric or get_rubric()
+    fingerprint = store.fingerprint()
+    cached = _cache.get(rubric.digest)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+    with _lock:
+        cached = _cache.get(rubric.digest)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        series = TimeSeries(rubric, store.history(), cached[1] if cached else None)
+        _cache.clear()
+        _cache[rubric.digest] = (fingerprint, series)
+    return series
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score every stored vintage and show how readiness moved.")
+    parser.add_argument("--country", help="show one country's trend and changes")
+    parser.add_argument("--top", type=int, default=10, help="largest movers to list")
+    args = parser.parse_args(argv)
+
+    series = score_history(get_store())
+    print(f"{len(series.keys)} records, {len(series.countries)} countries")
+    if args.country:
+        versions, overall, _ = series.trend(args.country)
+        for version, value in zip(versions, overall):
+            print(f"  {version:<14}{value:>7.3f}")
+        for row in series.changes(args.country):
+            print(f"  {row['Previous']} -> {row['As of']}: {row['Overall Δ']:+.3f}  {row['Changed metrics']}")
+    else:
+        for row in series.movers(args.top):
+            print(f"  {row['Country'][:30]:<32}{row['As of']:<14}{row['Overall']:>7.3f}{row['Δ']:>+8.3f}")
+
+
+if __name__ == "__main__":
+    main()